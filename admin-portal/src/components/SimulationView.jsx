@@ -1,9 +1,15 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Play, Square, FastForward, Activity, Wifi, Cpu, Database, Clock, AlertTriangle, CheckCircle, ShieldAlert } from 'lucide-react';
 import { Card, SectionHeader } from './SharedComponents';
 
 const ML_API = 'http://localhost:5000/api';
 
+// Playback is fetched in windows so huge datasets never sit in memory at once
+const PAGE_SIZE = 1000;
+const PREFETCH_AT = 200;   // Fetch the next window when this many rows remain
+const KEEP_BEHIND = 50;    // Rows kept behind the cursor when trimming the buffer
+const SIM_COLUMNS = ['timestamp', 'voltage', 'current'];
+
 const SimulationView = () => {
   // --- Resources ---
   const [models, setModels] = useState([]);
@@ -19,8 +25,14 @@ const SimulationView = () => {
   const [playbackSpeed, setPlaybackSpeed] = useState(1); 
 
   // --- Simulation State ---
+  // simulationData holds rows [windowStart, windowStart + simulationData.length)
   const [simulationData, setSimulationData] = useState([]);
+  const [windowStart, setWindowStart] = useState(0);
+  const [totalRows, setTotalRows] = useState(0);
+  const [nextOffset, setNextOffset] = useState(null);
   const [currentIndex, setCurrentIndex] = useState(0);
+  const isFetchingPage = useRef(false);
+  const pageGeneration = useRef(0); // Bumped on Stop / Load so pages still in flight are dropped
   const [isPlaying, setIsPlaying] = useState(false);
   const [logs, setLogs] = useState([]); 
   
@@ -43,23 +55,43 @@ const SimulationView = () => {
   }, []);
 
   // 2. Load Simulation
+  const fetchPage = async (offset) => {
+    const res = await fetch(`${ML_API}/simulate`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+          model_path: selectedModel.id,
+          dataset: selectedDataset.id,
+          label_col: "label",
+          offset: offset,
+          limit: PAGE_SIZE,
+          columns: SIM_COLUMNS
+      })
+    });
+    return res.json();
+  };
+
+  // Fetch the first window of a run; returns null if a newer Stop / Load superseded it
+  const loadFirstPage = async () => {
+    const generation = pageGeneration.current;
+    const data = await fetchPage(0);
+    if (generation !== pageGeneration.current) return null;
+    if (data.status === 'success') {
+        setSimulationData(data.data);
+        setWindowStart(0);
+        setTotalRows(data.total);
+        setNextOffset(data.next_offset);
+    }
+    return data;
+  };
+
   const loadSimulation = async () => {
     if (!selectedModel || !selectedDataset) return;
-    stopSimulation(); 
+    resetPlayback();
     try {
-      const res = await fetch(`${ML_API}/simulate`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-            model_path: selectedModel.id,
-            dataset: selectedDataset.id,
-            label_col: "label" 
-        })
-      });
-      const data = await res.json();
-      if (data.status === 'success') {
-          setSimulationData(data.data);
-          alert(`Ready! Loaded ${data.data.length} logs.`);
+      const data = await loadFirstPage();
+      if (data?.status === 'success') {
+          alert(`Ready! ${data.total} logs available.`);
       }
     } catch (err) {
         console.error("Load Error:", err);
@@ -67,15 +99,38 @@ const SimulationView = () => {
     }
   };
 
+  // 2b. Fetch the next window ahead of the cursor and drop rows already played
+  useEffect(() => {
+    const remaining = windowStart + simulationData.length - currentIndex;
+    if (nextOffset === null || remaining > PREFETCH_AT || isFetchingPage.current) return;
+
+    const generation = pageGeneration.current;
+    isFetchingPage.current = true;
+    fetchPage(nextOffset)
+      .then(data => {
+        if (generation !== pageGeneration.current || data.status !== 'success') return;
+        const dropCount = Math.max(0, currentIndex - KEEP_BEHIND - windowStart);
+        setSimulationData(prev => [...prev.slice(dropCount), ...data.data]);
+        setWindowStart(prev => prev + dropCount);
+        setNextOffset(data.next_offset);
+      })
+      .catch(err => console.warn("Page fetch error:", err))
+      .finally(() => {
+        if (generation === pageGeneration.current) isFetchingPage.current = false;
+      });
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [currentIndex, nextOffset]);
+
   // 3. The "Game Loop"
   useEffect(() => {
     let timer;
     if (isPlaying && simulationData.length > 0) {
-        const currentRow = simulationData[currentIndex];
-        const nextRow = simulationData[currentIndex + 1];
+        const currentRow = simulationData[currentIndex - windowStart];
+        const nextRow = simulationData[currentIndex + 1 - windowStart];
 
         if (!nextRow) {
-            setIsPlaying(false);
+            // Only stop at the real end; otherwise wait for the next window to arrive
+            if (nextOffset === null) setIsPlaying(false);
             return;
         }
 
@@ -97,13 +152,13 @@ const SimulationView = () => {
         }, adjustedDelay);
     }
     return () => clearTimeout(timer);
-  }, [isPlaying, currentIndex, simulationData, playbackSpeed]);
+  }, [isPlaying, currentIndex, simulationData, windowStart, nextOffset, playbackSpeed]);
 
   // 4. The "Renderer"
   useEffect(() => {
     if (simulationData.length === 0) return;
     
-    const row = simulationData[currentIndex];
+    const row = simulationData[currentIndex - windowStart];
     if (!row) return;
 
 // A. Logic & Stats
@@ -176,16 +231,33 @@ const SimulationView = () => {
         }));
     }
 
-  }, [currentIndex, isPlaying, simulationData, ledIp, targetSection]);
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [currentIndex, isPlaying, ledIp, targetSection]);
 
-  const stopSimulation = () => {
+  const resetPlayback = () => {
+      pageGeneration.current += 1;
+      isFetchingPage.current = false;
       setIsPlaying(false);
       setCurrentIndex(0);
+      setNextOffset(null);
       setLogs([]);
       setStats({ safe: 0, attacks: 0, correct: 0, missedAttacks: 0, totalProcessed: 0 });
       fetch(`http://${ledIp}:8000/off`, { method: 'POST' }).catch(() => {});
   };
 
+  const stopSimulation = () => {
+      const resumeAt = nextOffset;
+      resetPlayback();
+      // Rewind to row 0: keep the window if it still starts there, otherwise refetch it
+      if (windowStart === 0 && simulationData.length > 0) {
+          setNextOffset(resumeAt);
+          return;
+      }
+      setSimulationData([]);
+      setWindowStart(0);
+      if (totalRows > 0) loadFirstPage().catch(err => console.warn("Page fetch error:", err));
+  };
+
   const accuracy = stats.totalProcessed > 0 
     ? ((stats.correct / stats.totalProcessed) * 100).toFixed(1) 
     : "100.0";
@@ -339,7 +411,7 @@ const SimulationView = () => {
                      Live Traffic Feed
                  </h3>
                  <span className="text-xs text-slate-500 font-mono">
-                     {currentIndex + 1} / {simulationData.length}
+                     {currentIndex + 1} / {totalRows}
                  </span>
              </div>
              
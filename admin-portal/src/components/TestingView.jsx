@@ -17,8 +17,9 @@ const TestingView = () => {
   const [showResults, setShowResults] = useState(false);
   const [resultData, setResultData] = useState({ report: '', images: [] });
   const [error, setError] = useState(null);
+  const [jobId, setJobId] = useState(null);
 
-  const pollInterval = useRef(null);
+  const eventSource = useRef(null);
 
   // 1. Fetch available resources on load
   useEffect(() => {
@@ -48,25 +49,46 @@ const TestingView = () => {
     fetchData();
   }, []);
 
-  // 2. Polling Logic
+  // 2. Event Stream: wait for our test job to finish (pushed by the backend)
   useEffect(() => {
-      if (isTesting) {
-          pollInterval.current = setInterval(checkResults, 2000);
-      }
-      return () => clearInterval(pollInterval.current);
-  }, [isTesting]);
+      if (!isTesting || !jobId) return;
+
+      const source = new EventSource(`${API_BASE}/events?types=job`);
+      eventSource.current = source;
+
+      const onJob = (job) => {
+          if (job.id !== jobId) return;
+          if (job.status === 'done') loadResults();
+          else if (job.status === 'failed' || job.status === 'cancelled') {
+              source.close();
+              setIsTesting(false);
+              setError(job.error || `Testing ${job.status}`);
+          }
+      };
+
+      // The job may have finished before the stream connected
+      source.onopen = async () => {
+          try {
+              const res = await fetch(`${API_BASE}/jobs/${jobId}`);
+              if (res.ok) onJob(await res.json());
+          } catch (err) { console.warn("Job status error", err); }
+      };
+      source.addEventListener('job', (e) => onJob(JSON.parse(e.data)));
+
+      return () => source.close();
+  }, [isTesting, jobId]);
 
-  const checkResults = async () => {
+  const loadResults = async () => {
       try {
           const res = await fetch(`${API_BASE}/results/test_latest`);
           const data = await res.json();
           if (data.status === 'ready') {
-              clearInterval(pollInterval.current);
+              eventSource.current?.close();
               setIsTesting(false);
               setResultData({ report: data.report, images: data.images });
               setShowResults(true);
           }
-      } catch (err) { console.warn("Polling error", err); }
+      } catch (err) { console.warn("Results error", err); }
   };
 
   const handleTest = async () => {
@@ -74,6 +96,7 @@ const TestingView = () => {
     setIsTesting(true);
     setShowResults(false);
     setError(null);
+    setJobId(null);
 
     try {
         const response = await fetch(`${API_BASE}/test`, {
@@ -86,6 +109,8 @@ const TestingView = () => {
             })
         });
         if (!response.ok) throw new Error("Testing failed to start");
+        const data = await response.json();
+        setJobId(data.job_id);
     } catch (err) {
         setError(err.message);
         setIsTesting(false);
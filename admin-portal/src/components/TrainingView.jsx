@@ -29,9 +29,11 @@ const TrainingView = () => {
   const [showResults, setShowResults] = useState(false);
   const [resultData, setResultData] = useState({ report: '', images: [] });
   const [error, setError] = useState(null);
+  const [jobId, setJobId] = useState(null);
+  const [progress, setProgress] = useState(null); // Latest per-round metrics from the backend
   
-  // Polling Ref
-  const pollInterval = useRef(null);
+  // Event stream Ref
+  const eventSource = useRef(null);
 
   // 1. Fetch available Datasets and Models on load
   useEffect(() => {
@@ -74,22 +76,49 @@ const TrainingView = () => {
     fetchData();
   }, []);
 
-  // 2. Polling Logic: Check for results every 2 seconds when processing
+  // 2. Event Stream: the backend pushes progress and completion for our job (no polling)
   useEffect(() => {
-    if (isProcessing) {
-      pollInterval.current = setInterval(checkResults, 2000);
-    }
-    return () => clearInterval(pollInterval.current);
-  }, [isProcessing]);
+    if (!isProcessing || !jobId) return;
+
+    const source = new EventSource(`${API_BASE}/events?types=job,progress,results`);
+    eventSource.current = source;
 
-  const checkResults = async () => {
+    const onJob = (job) => {
+      if (job.id !== jobId) return;
+      if (job.status === 'done') loadResults();
+      else if (job.status === 'failed' || job.status === 'cancelled') {
+        source.close();
+        setIsProcessing(false);
+        setError(job.error || `Training ${job.status}`);
+      }
+    };
+
+    // The job may have finished before the stream connected
+    source.onopen = async () => {
+      try {
+        const res = await fetch(`${API_BASE}/jobs/${jobId}`);
+        if (res.ok) onJob(await res.json());
+      } catch (err) {
+        console.warn("Job status error:", err);
+      }
+    };
+    source.addEventListener('job', (e) => onJob(JSON.parse(e.data)));
+    source.addEventListener('progress', (e) => {
+      const job = JSON.parse(e.data);
+      if (job.id === jobId) setProgress(job.progress);
+    });
+    // EventSource reconnects on its own after network errors
+
+    return () => source.close();
+  }, [isProcessing, jobId]);
+
+  const loadResults = async () => {
     try {
       const res = await fetch(`${API_BASE}/results/latest`);
       const data = await res.json();
       
       if (data.status === 'ready') {
-        // Stop Polling
-        clearInterval(pollInterval.current);
+        eventSource.current?.close();
         setIsProcessing(false);
         setResultData({
             report: data.report,
@@ -98,8 +127,7 @@ const TrainingView = () => {
         setShowResults(true);
       }
     } catch (err) {
-      console.warn("Polling error:", err);
-      // Don't stop polling on transient network errors
+      console.warn("Results error:", err);
     }
   };
 
@@ -110,6 +138,8 @@ const TrainingView = () => {
     setIsProcessing(true);
     setShowResults(false);
     setError(null);
+    setJobId(null);
+    setProgress(null);
 
     try {
       // Build Params based on model type
@@ -139,7 +169,9 @@ const TrainingView = () => {
 
       if (!response.ok) throw new Error(`Training failed: ${response.statusText}`);
       
-      // If success, the 'isProcessing' state triggers the polling useEffect
+      // If success, the job id opens the event stream in the useEffect above
+      const data = await response.json();
+      setJobId(data.job_id);
 
     } catch (err) {
       console.error("Training Launch Error:", err);
@@ -314,7 +346,14 @@ const TrainingView = () => {
             <div className="h-full flex flex-col items-center justify-center z-10">
               <div className="w-16 h-16 border-4 border-blue-500/30 border-t-blue-500 rounded-full animate-spin mx-auto mb-6"></div>
               <p className="text-lg text-blue-400 font-medium animate-pulse">Training Model...</p>
-              <p className="text-slate-500 text-sm mt-2">Check console for background thread status</p>
+              {progress?.round ? (
+                <p className="text-slate-500 text-sm mt-2 font-mono">
+                  Round {progress.round}/{progress.num_rounds}
+                  {Object.entries(progress.metrics || {}).map(([name, value]) => ` · ${name} ${value.toFixed(4)}`)}
+                </p>
+              ) : (
+                <p className="text-slate-500 text-sm mt-2">Waiting for the training job...</p>
+              )}
             </div>
           )}
           
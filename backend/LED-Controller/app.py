@@ -1,11 +1,38 @@
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
+from prometheus_client import Histogram, Counter, generate_latest, CONTENT_TYPE_LATEST
 # We import the instantiated 'grid' object (aliased as led_manager) from your library
-from controller.led_manager import led_manager 
+from controller.led_manager import led_manager, parse_color
 
 app = Flask(__name__)
 CORS(app)
 
+# --- Metrics (Prometheus, served at /metrics) ---
+REQUEST_LATENCY = Histogram(
+    "led_http_request_duration_seconds", "Time to handle a request (includes strip.show())",
+    ["method", "endpoint"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+REQUESTS = Counter("led_http_requests", "HTTP requests", ["method", "endpoint", "status"])
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_LATENCY.labels(request.method, endpoint).observe(time.perf_counter() - started)
+        REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Request latency per endpoint and LED show() time (led_show_duration_seconds)."""
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+
 @app.route("/", methods=["GET"])
 def read_root():
     """Health check: Lists available sections."""
@@ -53,6 +80,39 @@ def set_color():
     
     return jsonify({"status": "success", "message": message})
 
+@app.route("/set-batch", methods=["POST"])
+def set_batch():
+    """
+    Applies many section/building colors in one request, with a single strip.show().
+    Changes are applied in order, so later entries win where targets overlap.
+
+    Example Body:
+    { "changes": [
+        { "section": "downtown", "building": "hospital", "r": 255, "g": 0, "b": 0 },
+        { "section": "suburbs", "r": 255, "g": 140, "b": 0 }
+    ] }
+    """
+    data = request.json
+    changes = data.get("changes") if isinstance(data, dict) else None
+
+    # 1. Validate every change before touching the strip
+    if not isinstance(changes, list) or not changes:
+        return jsonify({"error": "Missing parameters. Requires a non-empty 'changes' list"}), 400
+    for i, change in enumerate(changes):
+        if not isinstance(change, dict) or not change.get("section") or any(change.get(c) is None for c in "rgb"):
+            return jsonify({"error": f"Change {i} requires 'section', 'r', 'g', 'b'"}), 400
+        try:
+            parse_color(change)
+        except ValueError as e:
+            return jsonify({"error": f"Change {i}: {e}"}), 400
+
+    # 2. Apply all of them with one show()
+    success, message = led_manager.apply(changes)
+    if not success:
+        return jsonify({"status": "error", "message": message}), 404
+
+    return jsonify({"status": "success", "message": message})
+
 @app.route("/off", methods=["POST"])
 def turn_off():
     """Turns all lights off."""
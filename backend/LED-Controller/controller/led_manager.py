@@ -1,6 +1,30 @@
 import board
 import neopixel
 import time
+import threading
+from contextlib import contextmanager
+from prometheus_client import Histogram
+
+# Time spent pushing the pixel buffer to the strip (exposed at /metrics)
+SHOW_SECONDS = Histogram(
+    "led_show_duration_seconds", "Duration of one strip.show() call",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+def show(strip):
+    """strip.show(), timed. Every write to the LEDs goes through here."""
+    with SHOW_SECONDS.time():
+        strip.show()
+
+def parse_color(change):
+    """Returns the change's (r, g, b) as ints, or raises ValueError unless each is 0-255."""
+    try:
+        color = tuple(int(change[c]) for c in "rgb")
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("'r', 'g', 'b' must be integers")
+    if not all(0 <= c <= 255 for c in color):
+        raise ValueError("'r', 'g', 'b' must be between 0 and 255")
+    return color
 
 # ==========================================
 # 1. BUILDING CLASS
@@ -19,11 +43,14 @@ class Building:
         self.end = start_index + led_count
         self.strip = strip_ref
         
+    def fill(self, r, g, b):
+        """Writes the color into the pixel buffer only (no show())."""
+        self.strip[self.start:self.end] = [(r, g, b)] * self.count
+
     def set_color(self, r, g, b):
         """Sets all LEDs in this specific building to a color."""
-        for i in range(self.start, self.end):
-            self.strip[i] = (r, g, b)
-        self.strip.show()
+        self.fill(r, g, b)
+        show(self.strip)
 
     def set_status(self, status):
         """Helper for GridSafe specific states."""
@@ -50,14 +77,17 @@ class Section:
     def get_building(self, name):
         return self.buildings.get(name)
 
+    def fill(self, r, g, b):
+        """Writes the color of every building into the pixel buffer only (no show())."""
+        for building in self.buildings.values():
+            building.fill(r, g, b)
+
     def set_color(self, r, g, b):
         """Sets the entire section to one color."""
-        for building in self.buildings.values():
-            # We set internal pixels directly to avoid calling show() 10 times
-            for i in range(building.start, building.end):
-                building.strip[i] = (r, g, b)
+        # Fill every building first to avoid calling show() 10 times
+        self.fill(r, g, b)
         # One show() at the end
-        list(self.buildings.values())[0].strip.show()
+        show(list(self.buildings.values())[0].strip)
 
 # ==========================================
 # 3. MAIN SYSTEM CONTROLLER
@@ -68,6 +98,10 @@ class GridSystem:
         self.strip = neopixel.NeoPixel(pin, total_leds, brightness=brightness, auto_write=False)
         self.sections = {}
         self.total_leds = total_leds
+        # Batch state, see batch(). The lock keeps concurrent requests from interleaving.
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
 
     def create_section(self, name):
         """Creates a new empty section (e.g. 'downtown')."""
@@ -82,32 +116,89 @@ class GridSystem:
         b = Building(building_name, start_index, count, self.strip)
         self.sections[section_name].add_building(b)
 
+    # --- Transactions ---
+    @contextmanager
+    def batch(self):
+        """
+        Groups color changes into one strip update:
+
+            with grid.batch():
+                grid.set_building_color("downtown", "hospital", 255, 0, 0)
+                grid.set_section_color("suburbs", 255, 140, 0)
+
+        Changes inside the block only write the pixel buffer; show() runs once
+        when the outermost block exits. Batches can be nested.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._dirty = False
+                    show(self.strip)
+
+    def apply(self, changes):
+        """
+        Applies a list of {"section", "building" (optional), "r", "g", "b"} changes
+        with a single show(). Every target and color is checked first, so an unknown
+        section or building, or an invalid color, leaves the strip untouched.
+        """
+        colors = []
+        for i, change in enumerate(changes):
+            ok, message = self._resolve(change["section"], change.get("building"))
+            if not ok: return False, message
+            try:
+                colors.append(parse_color(change))
+            except ValueError as e:
+                return False, f"Change {i}: {e}"
+
+        with self.batch():
+            for change, (r, g, b) in zip(changes, colors):
+                if change.get("building"):
+                    self.set_building_color(change["section"], change["building"], r, g, b)
+                else:
+                    self.set_section_color(change["section"], r, g, b)
+        return True, f"Applied {len(changes)} changes"
+
+    def _resolve(self, section_name, building_name=None):
+        """Returns (True, target) or (False, error message)."""
+        if section_name == "all" and not building_name: return True, None
+        sec = self.sections.get(section_name)
+        if not sec: return False, f"Section '{section_name}' not found"
+        if not building_name: return True, sec
+
+        bld = sec.get_building(building_name)
+        if not bld: return False, f"Building '{building_name}' not found in {section_name}"
+        return True, bld
+
     # --- Global Controls ---
     def wipe_off(self):
-        self.strip.fill((0, 0, 0))
-        self.strip.show()
+        with self.batch():
+            self.strip.fill((0, 0, 0))
+            self._dirty = True
 
     def set_section_color(self, section_name, r, g, b):
-        if section_name == "all":
-            self.strip.fill((r, g, b))
-            self.strip.show()
-            return True, "Set all lights"
-        
-        if section_name in self.sections:
-            self.sections[section_name].set_color(r, g, b)
-            return True, f"Set {section_name} to ({r},{g},{b})"
-        
-        return False, f"Section '{section_name}' not found"
+        ok, sec = self._resolve(section_name)
+        if not ok: return False, sec
+
+        with self.batch():
+            if section_name == "all":
+                self.strip.fill((r, g, b))
+            else:
+                sec.fill(r, g, b)
+            self._dirty = True
+        return True, "Set all lights" if section_name == "all" else f"Set {section_name} to ({r},{g},{b})"
 
     def set_building_color(self, section_name, building_name, r, g, b):
         """Target a specific building."""
-        sec = self.sections.get(section_name)
-        if not sec: return False, "Section not found"
-        
-        bld = sec.get_building(building_name)
-        if not bld: return False, "Building not found"
-        
-        bld.set_color(r, g, b)
+        ok, bld = self._resolve(section_name, building_name)
+        if not ok: return False, bld
+
+        with self.batch():
+            bld.fill(r, g, b)
+            self._dirty = True
         return True, f"Set {building_name} in {section_name}"
 
 # ==========================================
@@ -1,133 +1,668 @@
-import xgboost as xgb
-import pandas as pd
 import numpy as np
 import os
-import shutil
 import datetime
-import joblib 
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, confusion_matrix
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.linear_model import LogisticRegression, LinearRegression
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
+import json
+import dataset_cache
+import results_pointer
+from catalog import RunCatalog
+from rolling_features import RollingFeatures
+from compiled_trees import FlatEnsemble
+from render_artifacts import PLOT_DATA_FILE, REGRESSION_POINTS_FILE
+from instrumentation import StageTimer, TIMINGS_FILE
+
+# Metadata columns that are never used as model features
+IGNORE_COLS = ['dataset_id', 'log_id', 'timestamp', 'substation_id']
+MAX_SCATTER_POINTS = 50_000 # Points kept for the regression scatter plot
+PROGRESS_INTERVAL = 0.25 # Minimum seconds between per-round progress reports
+COMPILED_MAX_ROWS = int(os.environ.get("COMPILED_MAX_ROWS", 16)) # Larger batches use the native predictor
+# Saved-model test folders kept on disk. Unset (the default) keeps all of them;
+# when set, older unreferenced folders are pruned (see results_pointer.prune)
+KEEP_TEST_RESULTS = int(os.environ["KEEP_TEST_RESULTS"]) if os.environ.get("KEEP_TEST_RESULTS") else None
+WARM_START_ROUNDS = 20 # Boosting rounds added to a base XGBoost model (unless num_boost_round is given)
+WARM_START_TREES = 20  # Trees added to a base RandomForest (unless n_estimators is given)
+
+# NOTE: xgboost, pandas, sklearn and joblib are imported inside the functions that
+# use them. Importing this module (e.g. at Flask startup or in a job worker) then
+# costs milliseconds, and each code path only loads the backend it actually needs.
+
+def read_model_file(filepath):
+    """
+    Deserializes a saved model from disk.
+    Returns (model, model_type, task_type) so callers (e.g. the ModelRegistry) can cache them together.
+    """
+    if filepath.endswith('.json'):
+        import xgboost as xgb
+        model = xgb.Booster()
+        model.load_model(filepath)
+        return model, 'xgboost', infer_task_type(model, 'xgboost')
+
+    import joblib
+    model = joblib.load(filepath)
+    name = type(model).__name__
+    model_type = None
+    if 'RandomForest' in name: model_type = 'random_forest'
+    elif 'Regression' in name: model_type = 'linear'
+    return model, model_type, infer_task_type(model, model_type)
+
+def model_features(model, model_type):
+    """The RollingFeatures a saved model was trained with (None if it uses raw readings only)."""
+    if model_type == 'xgboost':
+        config = model.attr('rolling_features')
+        config = json.loads(config) if config else None
+    else:
+        config = getattr(model, 'rolling_features_', None)
+    return RollingFeatures.from_dict(config) if config else None
+
+def infer_task_type(model, model_type):
+    """Recovers the task a saved model was trained for (None if unknown)."""
+    if model_type == 'xgboost':
+        objective = json.loads(model.save_config())['learner']['objective']['name']
+        if objective.startswith('binary:'): return 'classification'
+        if objective.startswith('multi:'): return 'multiclass'
+        if objective.startswith('reg:'): return 'regression'
+        return None
+
+    classes = getattr(model, 'classes_', None)
+    if classes is None: return 'regression'
+    return 'classification' if len(classes) == 2 else 'multiclass'
+
+def compact_labels(y, task_type):
+    """Class labels in the smallest integer type that holds them (regression targets are kept as-is)."""
+    values = np.asarray(y)
+    if task_type == 'regression' or values.dtype.kind not in 'iu' or len(values) == 0: return y
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= lo and hi <= np.iinfo(dtype).max:
+            return y.astype(dtype, copy=False)
+    return y
+
+def _frame(matrix, columns, index=None):
+    """DataFrame view over a 2-D array: no copy, and .to_numpy() returns the same buffer."""
+    import pandas as pd
+    return pd.DataFrame(matrix, columns=columns, index=index, copy=False)
+
+def _progress_callback(report, num_rounds):
+    """XGBoost callback passing the latest train/eval metrics to `report` (at most every PROGRESS_INTERVAL s)."""
+    import time
+    import xgboost as xgb
+
+    class ProgressCallback(xgb.callback.TrainingCallback):
+        def __init__(self):
+            super().__init__()
+            self.last_sent = 0.0
+
+        def after_iteration(self, model, epoch, evals_log):
+            now = time.monotonic()
+            if now - self.last_sent >= PROGRESS_INTERVAL or epoch + 1 == num_rounds:
+                self.last_sent = now
+                metrics = {f"{data}-{name}": float(values[-1])
+                           for data, by_metric in evals_log.items() for name, values in by_metric.items()}
+                report({"stage": "boosting", "round": epoch + 1, "num_rounds": num_rounds, "metrics": metrics})
+            return False # Never stop training from here; early stopping is handled by xgb.train
+
+    return ProgressCallback()
 
 class XGridBoost:
-    def __init__(self, model_type='xgboost', task_type='multiclass'):
+    def __init__(self, model_type='xgboost', task_type='multiclass', nthread=None, features=None):
+        """
+        :param nthread: CPU threads the model may use (None = library default / all cores).
+                        Set by the job queue so concurrent runs don't oversubscribe cores.
+        :param features: Rolling-window features to add to the raw readings
+                         (True for defaults, or a dict, see rolling_features.py).
+        """
         self.model_type = model_type
         self.task_type = task_type
+        self.nthread = nthread
         self.model = None
         self.evals_result = {}
+        self.dataset = None # Basename of the file loaded by load_data / stream_schema
+        self.metrics = {}   # Headline metrics of the last report
+        self.progress = None # Optional callable(dict) receiving per-round XGBoost metrics
+        self.features = RollingFeatures.from_dict(features) if features else None
+        self.compiled = None # FlatEnsemble of self.model, see compile()
+        self.timer = StageTimer() # Per-stage timings, written into the next run's report
+        self.timings = None # Timing summary of the last finished run
+        self.base_model = None # (path, model) that training continues from, see load_base_model()
         
         self.base_results_dir = "test_results"
         os.makedirs(self.base_results_dir, exist_ok=True)
+        self._catalog = None
 
     def load_data(self, filepath, label_col):
-        if not filepath.endswith('.csv'): 
-            raise ValueError("File must be a .csv")
-            
-        df = pd.read_csv(filepath)
-        
-        # --- FIX: Drop metadata columns ---
-        ignore_cols = ['dataset_id', 'log_id', 'timestamp'] 
-        
-        # This list comprehension ensures we don't crash if one of these is missing
-        df = df.drop(columns=[c for c in ignore_cols if c in df.columns])
-        
+        if not filepath.endswith(('.csv', '.parquet')):
+            raise ValueError("File must be a .csv or .parquet")
+
+        # Read only the columns the model needs (served from the Parquet cache when possible)
+        columns = dataset_cache.read_columns(filepath)
+        if label_col not in columns:
+            raise ValueError(f"Label column '{label_col}' not found.")
+        feature_cols = [c for c in columns if c not in IGNORE_COLS and c != label_col]
+        self.dataset = os.path.basename(filepath)
+
+        if self.features:
+            # The stream key (substation_id) is metadata, but the windows are computed per stream
+            feature_cols += [c for c in self.features.input_columns(columns) if c not in feature_cols]
+            with self.timer.stage("read_data") as stage:
+                df = dataset_cache.read_dataset(filepath, columns=feature_cols + [label_col])
+                stage["rows"] = len(df)
+            return self.split_features(self.add_features(df), label_col)
+
+        # Raw readings go straight into one float32 matrix, without a DataFrame in between
+        with self.timer.stage("read_data") as stage:
+            matrix = dataset_cache.read_matrix(filepath, feature_cols)
+            y = dataset_cache.read_dataset(filepath, columns=[label_col])[label_col]
+            stage["rows"] = len(y)
+        return _frame(matrix, feature_cols), compact_labels(y, self.task_type)
+
+    def add_features(self, df, states=None):
+        """
+        Appends the rolling features (if this model uses any) to a DataFrame of raw readings.
+        Pass a `states` dict to continue the windows across consecutive chunks.
+        """
+        if not self.features: return df
+        with self.timer.stage("rolling_features", rows=len(df)):
+            return self.features.transform(df, states)
+
+    def split_features(self, df, label_col):
+        """
+        Splits an already-loaded DataFrame into (X, y), dropping metadata columns.
+        X is float32 over one C-contiguous matrix (XGBoost and sklearn use it without
+        another copy); class labels get the smallest integer type that fits.
+        """
         # Verify label exists
         if label_col not in df.columns:
             raise ValueError(f"Label column '{label_col}' not found.")
 
-        # X is everything remaining except the label
-        X = df.drop(columns=[label_col])
-        y = df[label_col]
+        # X is everything except the label and the metadata columns, copied once column by column
+        feature_cols = [c for c in df.columns if c not in IGNORE_COLS and c != label_col]
+        matrix = np.empty((len(df), len(feature_cols)), dtype=np.float32)
+        for j, col in enumerate(feature_cols):
+            matrix[:, j] = df[col].to_numpy()
+        X = _frame(matrix, feature_cols, index=df.index)
+        y = compact_labels(df[label_col], self.task_type)
         
         return X, y
+
+    def stream_schema(self, filepath, label_col):
+        """
+        Reads only the dataset header and returns (feature_cols, dtypes) for chunked reads.
+        Features are parsed as float32; labels as int32 (or float32 for regression).
+        """
+        if not filepath.endswith(('.csv', '.parquet')):
+            raise ValueError("File must be a .csv or .parquet")
+        if self.features:
+            raise ValueError("Rolling features are not supported with streaming training")
+
+        columns = dataset_cache.read_columns(filepath)
+        if label_col not in columns:
+            raise ValueError(f"Label column '{label_col}' not found.")
+
+        feature_cols = [c for c in columns if c not in IGNORE_COLS and c != label_col]
+        dtypes = {c: 'float32' for c in feature_cols}
+        dtypes[label_col] = 'float32' if self.task_type == 'regression' else 'int32'
+        self.dataset = os.path.basename(filepath)
+        return feature_cols, dtypes
     
+    def load_base_model(self, filepath, registry=None):
+        """
+        Makes the next train() / train_streaming() continue from a saved model instead
+        of starting from scratch: XGBoost adds boosting rounds to the booster,
+        RandomForest adds trees (warm_start). The model's type, task and rolling
+        features are adopted, so call this before load_data.
+        """
+        if registry is not None:
+            model, model_type, task_type = registry.get(filepath)
+        else:
+            model, model_type, task_type = read_model_file(filepath)
+        if model_type not in ('xgboost', 'random_forest'):
+            raise ValueError(f"Warm start is only supported for xgboost and random_forest models, not {model_type}")
+
+        self.model_type = model_type
+        if task_type: self.task_type = task_type
+        self.features = model_features(model, model_type)
+        self.base_model = (filepath, model)
+        print(f"Continuing from {filepath} (Type: {self.model_type})")
+
     def train(self, X, y, test_size=0.2, params=None):
         if params is None: params = {}
         
         # 1. Setup Run
-        run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        run_folder = os.path.join(self.base_results_dir, f"run_{run_id}")
-        os.makedirs(run_folder, exist_ok=True)
-        print(f"--- Starting Run: {run_id} ({self.model_type}) ---")
+        self._check_base_features(X.columns)
+        run_id, run_folder = self._start_run()
+        run_params = dict(params) # Trainers pop keys like num_boost_round
+        if self.base_model: run_params["base_model"] = self.base_model[0]
+
+        self._fit_and_save(X, y, test_size, params, run_id, run_folder)
+        self._save_timings(run_folder)
+        self._record_run(run_id, run_folder, 'warm_start' if self.base_model else 'train', run_params)
+        self._update_latest_folder(run_folder)
+        
+        print(f"Run complete. Results saved to {run_folder}/")
+        return run_folder
 
-        # 2. Split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+    def search(self, X, y, space, strategy='random', n_trials=20, test_size=0.2, n_jobs=None,
+               min_budget=None, max_budget=None, halving_factor=3):
+        """
+        Hyperparameter search over `space` (see param_search.py for the format).
+        strategy: 'grid', 'random' or 'halving' (successive halving).
 
-        # 3. Train based on Type
+        Trials run in parallel worker processes and share this instance's thread budget
+        (self.nthread, or all cores). The best config is retrained like a normal run,
+        and the run folder gets a search_leaderboard.json next to the usual artifacts.
+        """
+        import param_search
+        from sklearn.model_selection import train_test_split
+
+        if self.base_model:
+            raise ValueError("Hyperparameter search always trains from scratch (no base model)")
+        if strategy == 'grid':
+            candidates = param_search.grid_candidates(space)
+        elif strategy in ('random', 'halving'):
+            candidates = param_search.random_candidates(space, n_trials)
+        else:
+            raise ValueError(f"Unknown search strategy '{strategy}'")
+
+        # 1. Setup Run
+        run_id, run_folder = self._start_run()
+        print(f"Searching {len(candidates)} candidates ({strategy})...")
+
+        # 2. Split once; every trial scores on the same validation rows
+        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=test_size, random_state=42)
+        with self.timer.stage("search", rows=len(X_train)):
+            leaderboard = param_search.run_search(
+                self.model_type, self.task_type, candidates,
+                X_train.to_numpy(), y_train.to_numpy(), X_val.to_numpy(), y_val.to_numpy(),
+                strategy=strategy, total_threads=self.nthread, n_jobs=n_jobs,
+                min_budget=min_budget, max_budget=max_budget, halving_factor=halving_factor
+            )
+
+        with open(os.path.join(run_folder, "search_leaderboard.json"), "w") as f:
+            json.dump({"strategy": strategy, "model_type": self.model_type,
+                       "task_type": self.task_type, "trials": leaderboard}, f, indent=2)
+
+        # 3. Retrain the winner as a normal run in the same folder
+        best = leaderboard[0]
+        self._fit_and_save(X, y, test_size, dict(best["params"]), run_id, run_folder)
+
+        lines = ["", "-"*20, f"Hyperparameter Search ({strategy}, {len(candidates)} candidates)"]
+        for rank, trial in enumerate(leaderboard[:10], start=1):
+            lines.append(f"{rank:>2}. score={trial['score']:.4f} [{trial['status']}] {trial['params']}")
+        with open(os.path.join(run_folder, "evaluation_report.txt"), "a") as f:
+            f.write("\n".join(lines))
+
+        self._save_timings(run_folder)
+        self._record_run(run_id, run_folder, 'search', best["params"])
+        self._update_latest_folder(run_folder)
+        print(f"Search complete. Best: {best['params']} (score {best['score']:.4f})")
+        return run_folder
+
+    def cross_validate(self, X, y, params=None, n_splits=5, strategy='stratified', test_size=0.2, n_jobs=None):
+        """
+        K-fold cross-validation ('stratified', 'kfold' or 'timeseries').
+        Folds train in parallel worker processes within this instance's thread budget.
+        The model is then trained as a normal run, and per-fold + aggregate metrics
+        are added to the run's evaluation report (and cv_report.json).
+        """
+        import cross_validation
+
+        if params is None: params = {}
+        if self.base_model:
+            raise ValueError("Cross-validation always trains from scratch (no base model)")
+
+        # 1. Setup Run
+        run_id, run_folder = self._start_run()
+        print(f"Cross-validating ({strategy}, {n_splits} folds)...")
+
+        # 2. Folds
+        with self.timer.stage("cross_validation", rows=len(X)):
+            cv = cross_validation.run_cv(
+                self.model_type, self.task_type, params, X.to_numpy(), y.to_numpy(),
+                n_splits=n_splits, strategy=strategy, total_threads=self.nthread, n_jobs=n_jobs
+            )
+        with open(os.path.join(run_folder, "cv_report.json"), "w") as f:
+            json.dump(cv, f, indent=2)
+
+        # 3. Standard holdout run in the same folder
+        self._fit_and_save(X, y, test_size, dict(params), run_id, run_folder)
+
+        lines = ["", "-"*20, f"Cross-Validation ({strategy}, {n_splits} folds)"]
+        for fold in cv["folds"]:
+            metrics = ", ".join(f"{k}={v:.4f}" for k, v in fold["metrics"].items())
+            lines.append(f"Fold {fold['fold']}: {metrics} ({fold['val_rows']} rows)")
+        for name, agg in cv["aggregate"].items():
+            lines.append(f"Mean {name}: {agg['mean']:.4f} (+/- {agg['std']:.4f})")
+        with open(os.path.join(run_folder, "evaluation_report.txt"), "a") as f:
+            f.write("\n".join(lines))
+
+        self._save_timings(run_folder)
+        self._record_run(run_id, run_folder, 'cv', params, extra_metrics={"cv": cv["aggregate"]})
+        self._update_latest_folder(run_folder)
+        print(f"Cross-validation complete. Results saved to {run_folder}/")
+        return run_folder
+
+    def fit(self, X_train, y_train, X_val=None, y_val=None, params=None):
+        """
+        Fits the model in memory only: no run folder, report or catalog entry
+        (used by search trials and CV folds). XGBoost evaluates, and stops early,
+        on X_val / y_val; the other models ignore them. Returns self.
+        """
+        params = dict(params or {}) # Trainers pop keys like num_boost_round
         if self.model_type == 'xgboost':
-            self._train_xgboost(X_train, y_train, X_test, y_test, y, params)
+            if X_val is None:
+                raise ValueError("XGBoost needs validation rows (X_val, y_val) for early stopping")
+            self._train_xgboost(np.asarray(X_train), np.asarray(y_train), None, X_val, y_val, params)
         elif self.model_type == 'random_forest':
             self._train_rf(X_train, y_train, params)
         elif self.model_type == 'linear':
             self._train_linear(X_train, y_train, params)
+        return self
+
+    def _fit_and_save(self, X, y, test_size, params, run_id, run_folder):
+        from sklearn.model_selection import train_test_split
+
+        # 2. Split row indices only (same rows as splitting X itself); the data is gathered per use
+        with self.timer.stage("split", rows=len(X)):
+            train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=test_size, random_state=42)
+        matrix = np.ascontiguousarray(X.to_numpy(dtype=np.float32)) # No copy for load_data's X
+        labels, columns = np.asarray(y), list(X.columns)
+        X_test, y_test = _frame(matrix[test_idx], columns), labels[test_idx]
+
+        # 3. Train based on Type
+        if self.model_type == 'xgboost':
+            self._train_xgboost(matrix, labels, train_idx, X_test, y_test, params)
+        elif self.model_type == 'random_forest':
+            with self.timer.stage("fit", rows=len(train_idx)):
+                self._train_rf(_frame(matrix[train_idx], columns), labels[train_idx], params)
+        elif self.model_type == 'linear':
+            with self.timer.stage("fit", rows=len(train_idx)):
+                self._train_linear(_frame(matrix[train_idx], columns), labels[train_idx], params)
         
         # 4. Save Artifacts
         self._save_report(X_test, y_test, run_folder)
         if self.model_type == 'xgboost':
             self._save_training_plot(run_folder)
         self._save_model_file(run_folder, run_id)
+
+    def train_streaming(self, filepath, label_col, test_size=0.2, params=None,
+                        chunksize=100_000, external_memory=False):
+        """
+        Out-of-core training: reads the CSV in chunks and feeds XGBoost through a
+        DataIter, so the full dataset is never materialized as a DataFrame.
+
+        By default chunks are quantized into a QuantileDMatrix (~1 byte per value).
+        With external_memory=True the quantized pages are cached to disk as well.
+        """
+        if self.model_type != 'xgboost':
+            raise ValueError("Streaming training is only supported for model_type='xgboost'")
+        if params is None: params = {}
+        import xgboost as xgb
+        from dataset_iter import DatasetChunkIter
+
+        feature_cols, dtypes = self.stream_schema(filepath, label_col)
+        self._check_base_features(feature_cols)
+
+        # 1. Setup Run
+        run_id, run_folder = self._start_run()
+
+        # 2. Build chunked train/test matrices
+        cache_prefix = None
+        if external_memory:
+            cache_prefix = os.path.join(run_folder, "xgb_cache")
+
+        def make_iter(subset):
+            prefix = f"{cache_prefix}_{subset}" if cache_prefix else None
+            return DatasetChunkIter(filepath, label_col, feature_cols, dtypes, subset,
+                                test_size=test_size, chunksize=chunksize, cache_prefix=prefix)
+
+        # (CSV parsing happens inside the iterators, so it is part of this stage)
+        with self.timer.stage("dmatrix") as stage:
+            if external_memory:
+                dtrain = xgb.ExtMemQuantileDMatrix(make_iter('train'))
+                dtest = xgb.ExtMemQuantileDMatrix(make_iter('test'), ref=dtrain)
+            else:
+                dtrain = xgb.QuantileDMatrix(make_iter('train'))
+                dtest = xgb.QuantileDMatrix(make_iter('test'), ref=dtrain)
+            stage["rows"] = dtrain.num_row() + dtest.num_row()
+
+        y_test = dtest.get_label()
+        num_class = None
+        if self.task_type == 'multiclass':
+            num_class = int(max(dtrain.get_label().max(), y_test.max())) + 1
+
+        # 3. Train
+        run_params = dict(params)
+        if self.base_model: run_params["base_model"] = self.base_model[0]
+        xgb_params, num_rounds = self._xgb_params(params, num_class)
+        self._boost(xgb_params, dtrain, dtest, num_rounds)
+
+        # 4. Save Artifacts (labels + predictions only, no feature matrix)
+        with self.timer.stage("predict", rows=len(y_test)):
+            preds = self._threshold(self.model.predict(dtest))
+        if self.task_type != 'regression':
+            y_test = y_test.astype(int)
+        self._write_report(y_test, preds, feature_cols, run_folder)
+        self._save_training_plot(run_folder)
+        self._save_model_file(run_folder, run_id)
+        self._save_timings(run_folder)
+        self._record_run(run_id, run_folder, 'streaming', run_params)
         self._update_latest_folder(run_folder)
-        
+
+        if cache_prefix:
+            for f in os.listdir(run_folder):
+                if f.startswith("xgb_cache"): os.remove(os.path.join(run_folder, f))
+
         print(f"Run complete. Results saved to {run_folder}/")
+        return run_folder
 
-    def evaluate_saved_model(self, model_path, data_path, label_col):
+    def evaluate_saved_model(self, model_path, data_path, label_col, registry=None, chunksize=None):
         """
-        Loads a model from disk, tests it on data_path, and saves results to 'latest_test'.
+        Loads a model from disk, tests it on data_path, and saves results to a new test folder
+        and points 'latest_test' at it.
+        If a ModelRegistry is given, the model is served from its cache when possible.
+        With a chunksize the dataset is scored chunk by chunk and never loaded as a whole
+        (see _save_report_chunked).
         """
-        # 1. Load Data
-        X, y = self.load_data(data_path, label_col)
-        
-        # 2. Load Model
-        self.load_model(model_path)
+        # 1. Load Model (first: it decides which rolling features the data needs)
+        with self.timer.stage("load_model"):
+            self.load_model(model_path, registry=registry)
+
+        # 2. Load Data (the chunked path reads it while scoring)
+        if not chunksize:
+            X, y = self.load_data(data_path, label_col)
         
         # 3. Create Output Folder
-        test_run_dir = os.path.join(self.base_results_dir, "latest_test")
-        if os.path.exists(test_run_dir): shutil.rmtree(test_run_dir)
+        test_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        test_run_dir = os.path.join(self.base_results_dir, f"test_{test_id}")
         os.makedirs(test_run_dir, exist_ok=True)
         
         print(f"--- Evaluating Saved Model: {os.path.basename(model_path)} ---")
         
         # 4. Generate Reports
-        self._save_report(X, y, test_run_dir)
+        if chunksize:
+            self._save_report_chunked(data_path, label_col, test_run_dir, chunksize)
+        else:
+            self._save_report(X, y, test_run_dir)
+        self._save_timings(test_run_dir)
+
+        # 5. Publish (the previous report stays readable until the pointer swaps)
+        results_pointer.publish(self.base_results_dir, "latest_test", test_run_dir)
+        if KEEP_TEST_RESULTS is not None:
+            results_pointer.prune(self.base_results_dir, "test_", KEEP_TEST_RESULTS, protect=test_run_dir)
         
         print(f"Test complete. Results saved to {test_run_dir}")
+        return test_run_dir
+
+    def evaluate_models(self, model_paths, data_path, label_col, registry=None, n_jobs=None):
+        """
+        Scores several saved models on one dataset in a single pass (see batch_eval.py).
+        Each model is read once, here, and handed to a scoring worker as it is; the data
+        is loaded once per distinct rolling-feature config (once in total for raw-feature
+        models) and shared with the workers. The leaderboard (accuracy / F1 / RMSE and
+        inference throughput per model, ranked within each task type) is written to a
+        new eval_<id> folder, which is returned.
+        """
+        import time
+        import batch_eval
 
-    def _train_xgboost(self, X_train, y_train, X_test, y_test, y_full, custom_params):
+        # 1. Load every model once and group them by the rolling features their data needs
+        groups, failed = {}, []
+        with self.timer.stage("load_models"):
+            for path in model_paths:
+                start = time.perf_counter()
+                try:
+                    loaded = registry.get(path) if registry is not None else read_model_file(path)
+                except Exception as e:
+                    failed.append({"model_path": path, "model_type": None, "task_type": None,
+                                   "status": "failed", "error": f"{type(e).__name__}: {e}"})
+                    continue
+                features = model_features(loaded[0], loaded[1])
+                key = json.dumps(features.to_dict(), sort_keys=True) if features else None
+                groups.setdefault(key, []).append((path, loaded, round(time.perf_counter() - start, 4)))
+
+        # 2. Load the data once per group (the loaded models go to the workers as they are)
+        tasks, rows = [], 0
+        own_features = self.features
+        try:
+            for key, models in groups.items():
+                self.features = RollingFeatures.from_dict(json.loads(key)) if key else None
+                X, y = self.load_data(data_path, label_col)
+                matrix, labels, columns = X.to_numpy(), y.to_numpy(), list(X.columns)
+                tasks += [(path, loaded, load_s, matrix, labels, columns) for path, loaded, load_s in models]
+                rows = len(labels)
+        finally:
+            self.features = own_features
+
+        # 3. Score every model in parallel
+        eval_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        eval_dir = os.path.join(self.base_results_dir, f"eval_{eval_id}")
+        os.makedirs(eval_dir, exist_ok=True)
+        print(f"--- Evaluating {len(model_paths)} models on {os.path.basename(data_path)} ---")
+        with self.timer.stage("score", rows=rows * len(tasks)):
+            leaderboard = batch_eval.run_batch(tasks, total_threads=self.nthread, n_jobs=n_jobs, failed=failed)
+
+        # 4. Save the leaderboard
+        with open(os.path.join(eval_dir, batch_eval.LEADERBOARD_FILE), "w") as f:
+            json.dump({
+                "eval_id": eval_id,
+                "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+                "dataset": os.path.basename(data_path),
+                "label_col": label_col,
+                "rows": int(rows),
+                "models": leaderboard
+            }, f, indent=2)
+
+        lines = [f"Batch Evaluation: {os.path.basename(data_path)} ({rows} rows, {len(model_paths)} models)"]
+        task_type = False
+        for r in leaderboard:
+            if r["status"] != "ok":
+                if task_type is not None:
+                    task_type = None
+                    lines += ["", "-"*20, "Failed"]
+                lines.append(f" - {os.path.basename(r['model_path'])} {r['error']}")
+                continue
+            if r["task_type"] != task_type:
+                # Scores are only comparable within a task type, so each one gets its own ranking
+                task_type = r["task_type"]
+                lines += ["", "-"*20, task_type.capitalize()]
+            metrics = ", ".join(f"{k}={v:.4f}" for k, v in r["metrics"].items())
+            lines.append(f"{r['rank']:>2}. {os.path.basename(r['model_path'])} ({r['model_type']}) "
+                         f"{metrics}, {r['rows_per_s']:,} rows/s")
+        with open(os.path.join(eval_dir, "evaluation_report.txt"), "w") as f:
+            f.write("\n".join(lines))
+        self._save_timings(eval_dir)
+
+        print(f"Evaluation complete. Results saved to {eval_dir}")
+        return eval_dir
+
+    def _start_run(self):
+        base_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_id, suffix = base_id, 1
+        # Concurrent runs can start in the same second; makedirs is atomic, so retry with a suffix
+        while True:
+            run_folder = os.path.join(self.base_results_dir, f"run_{run_id}")
+            try:
+                os.makedirs(run_folder)
+                break
+            except FileExistsError:
+                suffix += 1
+                run_id = f"{base_id}_{suffix}"
+        print(f"--- Starting Run: {run_id} ({self.model_type}) ---")
+        return run_id, run_folder
+
+    def _xgb_params(self, custom_params, num_class):
         xgb_params = {
             'max_depth': 6, 
             'eta': 0.3, 
             'verbosity': 0, 
             'seed': 42
         }
+        if self.nthread: xgb_params['nthread'] = self.nthread
         
-        num_rounds = custom_params.pop('num_boost_round', 100)
+        num_rounds = custom_params.pop('num_boost_round', WARM_START_ROUNDS if self.base_model else 100)
         xgb_params.update(custom_params)
 
+        if self.base_model and num_class is not None:
+            # The added trees must predict the same classes as the base booster's
+            config = json.loads(self.base_model[1].save_config())
+            base_classes = int(config['learner']['learner_model_param']['num_class'])
+            if num_class > base_classes:
+                raise ValueError(f"Data has {num_class} classes, the base model only {base_classes}")
+            num_class = base_classes
+
         if self.task_type == 'regression':
             xgb_params.update({'objective': 'reg:squarederror', 'eval_metric': 'rmse'})
         elif self.task_type == 'classification':
             xgb_params.update({'objective': 'binary:logistic', 'eval_metric': 'logloss'})
         elif self.task_type == 'multiclass':
-            xgb_params.update({'objective': 'multi:softmax', 'eval_metric': 'mlogloss', 'num_class': y_full.nunique()})
+            xgb_params.update({'objective': 'multi:softmax', 'eval_metric': 'mlogloss', 'num_class': num_class})
 
-        dtrain = xgb.DMatrix(X_train, label=y_train)
-        dtest = xgb.DMatrix(X_test, label=y_test)
-        
-        self.model = xgb.train(
-            xgb_params, dtrain, num_boost_round=num_rounds,
-            evals=[(dtrain, 'train'), (dtest, 'eval')],
-            early_stopping_rounds=10, verbose_eval=False,
-            evals_result=self.evals_result
-        )
+        return xgb_params, num_rounds
+
+    def _train_xgboost(self, matrix, labels, train_idx, X_test, y_test, custom_params):
+        """Boosts on the rows train_idx of matrix (an array; all rows if None), evaluating on X_test / y_test."""
+        import xgboost as xgb
+        from dataset_iter import ArrayBatchIter
+        xgb_params, num_rounds = self._xgb_params(custom_params, len(np.union1d(labels, y_test)))
+
+        columns = list(X_test.columns) if hasattr(X_test, 'columns') else None
+        test_matrix = np.asarray(X_test)
+        n_train = len(matrix) if train_idx is None else len(train_idx)
+        with self.timer.stage("dmatrix", rows=n_train + len(X_test)):
+            if xgb_params.get('tree_method', 'hist') in ('hist', 'auto'):
+                # Quantized (~1 byte per value) straight from batches of the training rows,
+                # so they are never gathered into a full float copy
+                bins = {'max_bin': xgb_params['max_bin']} if 'max_bin' in xgb_params else {}
+                if train_idx is None:
+                    dtrain = xgb.QuantileDMatrix(matrix, label=labels, feature_names=columns, **bins)
+                else:
+                    dtrain = xgb.QuantileDMatrix(ArrayBatchIter(matrix, labels, train_idx, columns), **bins)
+                dtest = xgb.QuantileDMatrix(test_matrix, label=y_test, feature_names=columns, ref=dtrain, **bins)
+            else:
+                rows = slice(None) if train_idx is None else train_idx
+                dtrain = xgb.DMatrix(matrix[rows], label=labels[rows], feature_names=columns)
+                dtest = xgb.DMatrix(test_matrix, label=y_test, feature_names=columns)
+        self._boost(xgb_params, dtrain, dtest, num_rounds)
+
+    def _boost(self, xgb_params, dtrain, dtest, num_rounds):
+        import xgboost as xgb
+        callbacks = [_progress_callback(self.progress, num_rounds)] if self.progress else None
+        # With a base model, xgb.train boosts on a copy of it (the registry's booster stays untouched)
+        base = self.base_model[1] if self.base_model else None
+        with self.timer.stage("boost", rows=dtrain.num_row()):
+            self.model = xgb.train(
+                xgb_params, dtrain, num_boost_round=num_rounds,
+                evals=[(dtrain, 'train'), (dtest, 'eval')],
+                early_stopping_rounds=10, verbose_eval=False,
+                evals_result=self.evals_result, callbacks=callbacks, xgb_model=base
+            )
 
     def _train_rf(self, X_train, y_train, custom_params):
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        if self.base_model:
+            return self._grow_rf(X_train, y_train, custom_params)
         print("Training Random Forest...")
         rf_params = {'n_estimators': 100, 'random_state': 42, 'max_depth': None}
+        if self.nthread: rf_params['n_jobs'] = self.nthread
         rf_params.update(custom_params)
 
         if self.task_type == 'regression':
@@ -136,7 +671,24 @@ class XGridBoost:
             self.model = RandomForestClassifier(**rf_params)
         self.model.fit(X_train, y_train)
 
+    def _grow_rf(self, X_train, y_train, custom_params):
+        """Warm start: fits `n_estimators` new trees on this data and adds them to the base forest."""
+        import copy
+        base = self.base_model[1]
+        if self.task_type != 'regression' and set(np.unique(y_train)) != set(base.classes_.tolist()):
+            # sklearn would silently re-map the classes and misalign the existing trees
+            raise ValueError(f"Warm start needs the base model's classes {base.classes_.tolist()} in the data")
+
+        added = int(custom_params.pop('n_estimators', WARM_START_TREES))
+        print(f"Adding {added} trees to a Random Forest of {len(base.estimators_)}...")
+        self.model = copy.deepcopy(base) # Registry models are shared: never grow them in place
+        self.model.set_params(warm_start=True, n_estimators=len(base.estimators_) + added, **custom_params)
+        if self.nthread: self.model.set_params(n_jobs=self.nthread)
+        self.model.fit(X_train, y_train)
+        self.model.set_params(warm_start=False)
+
     def _train_linear(self, X_train, y_train, custom_params):
+        from sklearn.linear_model import LogisticRegression, LinearRegression
         print("Training Linear Model...")
         lr_params = {'max_iter': 1000}
         lr_params.update(custom_params)
@@ -152,130 +704,313 @@ class XGridBoost:
     def predict(self, X):
         if self.model is None: raise Exception("Model not trained.")
         if self.model_type == 'xgboost':
-            dinput = xgb.DMatrix(X)
-            preds = self.model.predict(dinput)
-            if self.task_type == 'classification':
-                return [1 if p > 0.5 else 0 for p in preds]
-            return preds
+            # inplace_predict scores the array/DataFrame directly, without building a DMatrix
+            return self._threshold(self.model.inplace_predict(X))
         else:
             return self.model.predict(X)
 
-    def load_model(self, filepath):
-        if filepath.endswith('.json'):
-            self.model = xgb.Booster()
-            self.model.load_model(filepath)
-            self.model_type = 'xgboost'
+    def predict_rows(self, rows):
+        """
+        Fast path for a raw (n, features) float matrix already in feature_names() order,
+        e.g. micro-batched readings from /api/predict.
+        """
+        if self.model is None: raise Exception("Model not trained.")
+        if self.compiled is not None and len(rows) <= COMPILED_MAX_ROWS:
+            preds = self.compiled.predict(rows)
+            return self._threshold(preds) if self.model_type == 'xgboost' else preds
+        if self.model_type != 'xgboost':
+            return self._predict_sklearn_rows(rows)
+        return self.predict(rows)
+
+    def _predict_sklearn_rows(self, rows):
+        if hasattr(self.model, 'feature_names_in_'):
+            # sklearn models fitted on DataFrames expect named columns
+            import pandas as pd
+            rows = pd.DataFrame(rows, columns=self.model.feature_names_in_)
+        return self.model.predict(rows)
+
+    def compile(self, verify=True):
+        """
+        Flattens the trees of an XGBoost / RandomForest model into a FlatEnsemble
+        (see compiled_trees.py), which predict_rows then uses for small batches.
+        With verify=True the kernel is first checked against the native predictor,
+        and a ValueError is raised if they disagree. Returns the verification report.
+        """
+        if self.model is None: raise Exception("Model not trained.")
+        flat = FlatEnsemble.from_model(self.model, self.model_type)
+        report = None
+        if verify:
+            if self.model_type == 'xgboost':
+                report = flat.verify(self.model.inplace_predict, with_nan=True)
+            else:
+                report = flat.verify(self._predict_sklearn_rows, with_nan=False)
+            if not report["ok"]:
+                raise ValueError(f"Compiled model disagrees with the native predictor: {report}")
+        self.compiled = flat
+        return report
+
+    def feature_names(self):
+        if self.model_type == 'xgboost':
+            return list(self.model.feature_names or [])
+        return list(getattr(self.model, 'feature_names_in_', []))
+
+    def _threshold(self, preds):
+        if self.task_type == 'classification':
+            return (np.asarray(preds) > 0.5).astype(int)
+        return preds
+
+    def load_model(self, filepath, registry=None):
+        """
+        Loads a saved model. With a ModelRegistry the deserialized model is shared
+        across instances, so callers must treat self.model as read-only.
+        """
+        if registry is not None:
+            model, model_type, task_type = registry.get(filepath)
         else:
-            self.model = joblib.load(filepath)
-            name = type(self.model).__name__
-            if 'RandomForest' in name: self.model_type = 'random_forest'
-            elif 'Regression' in name: self.model_type = 'linear'
+            model, model_type, task_type = read_model_file(filepath)
+
+        self.use_model(model, model_type, task_type)
         print(f"Model loaded from {filepath} (Type: {self.model_type})")
 
+    def use_model(self, model, model_type, task_type=None):
+        """Attaches an already-loaded model (e.g. from the registry) and the task it was trained for."""
+        self.model = model
+        if model_type: self.model_type = model_type
+        if task_type: self.task_type = task_type
+        self.features = model_features(model, self.model_type)
+        self.compiled = None
+
     # --- Helpers (Now properly indented) ---
     def _save_report(self, X, y, folder_path):
-        preds = self.predict(X)
+        with self.timer.stage("predict", rows=len(X)):
+            preds = self.predict(X)
+        self._write_report(y, preds, list(X.columns), folder_path)
+
+    def _save_report_chunked(self, data_path, label_col, folder_path, chunksize):
+        """
+        Same report as _save_report, but the dataset is read, predicted and scored one
+        chunk at a time: the metrics are accumulated incrementally (see streaming_metrics.py),
+        so memory is bounded by the chunk size, not the dataset. Metric snapshots are
+        sent to self.progress while the chunks are scored.
+        """
+        import time
+        from streaming_metrics import MetricsAccumulator
+
+        columns = dataset_cache.read_columns(data_path)
+        if label_col not in columns:
+            raise ValueError(f"Label column '{label_col}' not found.")
+        read_cols = [c for c in columns if c not in IGNORE_COLS and c != label_col]
+        if self.features:
+            read_cols += [c for c in self.features.input_columns(columns) if c not in read_cols]
+        self.dataset = os.path.basename(data_path)
+
+        total = dataset_cache.count_rows(data_path)
+        metrics = MetricsAccumulator(self.task_type)
+        states = {} if self.features else None # Rolling windows continue across chunks
+        points, rng = [], np.random.default_rng(42) # Regression scatter sample
+        last_sent = 0.0
+
+        with self.timer.stage("predict_chunks", rows=total):
+            for chunk in dataset_cache.iter_chunks(data_path, read_cols + [label_col], chunksize):
+                if self.features: chunk = self.features.transform(chunk, states)
+                X, y = self.split_features(chunk, label_col)
+                preds = np.asarray(self.predict(X))
+                metrics.update(y, preds)
+
+                if metrics.regression:
+                    keep = min(len(y), -(-MAX_SCATTER_POINTS * len(y) // max(total, 1)))
+                    idx = rng.choice(len(y), keep, replace=False)
+                    points.append((np.asarray(y, dtype=float)[idx], preds[idx].astype(float)))
+
+                now = time.monotonic()
+                if self.progress and (now - last_sent >= PROGRESS_INTERVAL or metrics.rows >= total):
+                    last_sent = now
+                    self.progress({"stage": "evaluating", "rows": metrics.rows, "total_rows": total,
+                                   "metrics": metrics.snapshot()})
+        if not metrics.rows:
+            raise ValueError("Dataset is empty")
+
+        lines = [f"Model: {self.model_type}", f"Task: {self.task_type}", "-"*20] + metrics.report_lines()
+        snapshot = metrics.snapshot()
+        with self.timer.stage("plot_data"):
+            if metrics.regression:
+                self.metrics = {"rmse": snapshot["rmse"]}
+                if points:
+                    self._save_regression_scatter(np.concatenate([p[0] for p in points]),
+                                                  np.concatenate([p[1] for p in points]), folder_path)
+            else:
+                self.metrics = {"accuracy": snapshot["accuracy"]}
+                self._update_plot_data(folder_path, "confusion_matrix", snapshot["confusion_matrix"])
+            self._save_feature_importance(self.feature_names() or read_cols, folder_path)
+
+        with open(os.path.join(folder_path, "evaluation_report.txt"), "w") as f:
+            f.write("\n".join(lines))
+
+    def _write_report(self, y, preds, feature_names, folder_path):
+        from sklearn.metrics import accuracy_score, classification_report, mean_squared_error
         report_path = os.path.join(folder_path, "evaluation_report.txt")
         
         lines = [f"Model: {self.model_type}", f"Task: {self.task_type}", "-"*20]
         
         # --- CLASSIFICATION REPORTING ---
         if self.task_type in ['classification', 'multiclass']:
-            acc = accuracy_score(y, preds)
-            lines.append(f"Accuracy: {acc:.4f}")
-            lines.append("\nClassification Report:")
-            lines.append(classification_report(y, preds))
+            with self.timer.stage("report", rows=len(y)):
+                acc = accuracy_score(y, preds)
+                self.metrics = {"accuracy": float(acc)}
+                lines.append(f"Accuracy: {acc:.4f}")
+                lines.append("\nClassification Report:")
+                lines.append(classification_report(y, preds))
             
-            self._save_confusion_matrix(y, preds, folder_path)
-            self._save_feature_importance(X, folder_path)
+            with self.timer.stage("plot_data"):
+                self._save_confusion_matrix(y, preds, folder_path)
+                self._save_feature_importance(feature_names, folder_path)
 
         # --- REGRESSION REPORTING ---
         else:
-            rmse = np.sqrt(mean_squared_error(y, preds))
-            lines.append(f"RMSE: {rmse:.4f}")
+            with self.timer.stage("report", rows=len(y)):
+                rmse = np.sqrt(mean_squared_error(y, preds))
+                self.metrics = {"rmse": float(rmse)}
+                lines.append(f"RMSE: {rmse:.4f}")
             
-            self._save_regression_scatter(y, preds, folder_path)
-            self._save_feature_importance(X, folder_path)
+            with self.timer.stage("plot_data"):
+                self._save_regression_scatter(y, preds, folder_path)
+                self._save_feature_importance(feature_names, folder_path)
 
         with open(report_path, "w") as f:
             f.write("\n".join(lines))
 
+    # --- Plot data ---
+    # Plots are not drawn here: the hot path only stores the numbers behind them
+    # (plot_data.json / regression_points.npz). render_artifacts.py draws the PNGs
+    # on demand in a separate process the first time the portal requests them.
+    def _update_plot_data(self, folder_path, key, value):
+        path = os.path.join(folder_path, PLOT_DATA_FILE)
+        data = {}
+        if os.path.exists(path):
+            with open(path) as f: data = json.load(f)
+        data[key] = value
+        data["model_type"] = self.model_type
+        with open(path, "w") as f:
+            json.dump(data, f)
+
     def _save_confusion_matrix(self, y_true, y_pred, folder_path):
-        cm = confusion_matrix(y_true, y_pred)
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
-        plt.title(f'Confusion Matrix ({self.model_type})')
-        plt.ylabel('Actual')
-        plt.xlabel('Predicted')
-        plt.savefig(os.path.join(folder_path, "confusion_matrix.png"))
-        plt.close()
+        from sklearn.metrics import confusion_matrix
+        labels = np.unique(np.concatenate([np.asarray(y_true), np.asarray(y_pred)]))
+        cm = confusion_matrix(y_true, y_pred, labels=labels)
+        self._update_plot_data(folder_path, "confusion_matrix", {
+            "labels": labels.tolist(),
+            "matrix": cm.tolist()
+        })
 
     def _save_training_plot(self, folder_path):
         results = self.evals_result
         if not results: return
-        epochs = len(results['train'][list(results['train'].keys())[0]])
-        x_axis = range(0, epochs)
-        fig, ax = plt.subplots()
-        ax.plot(x_axis, results['train'][list(results['train'].keys())[0]], label='Train')
-        ax.plot(x_axis, results['eval'][list(results['eval'].keys())[0]], label='Test')
-        ax.legend()
-        plt.title('Training Loss')
-        plt.savefig(os.path.join(folder_path, "training_loss_curve.png"))
-        plt.close()
+        metric = list(results['train'].keys())[0]
+        self._update_plot_data(folder_path, "training_curve", {
+            "metric": metric,
+            "train": [float(v) for v in results['train'][metric]],
+            "eval": [float(v) for v in results['eval'][list(results['eval'].keys())[0]]]
+        })
 
     def _save_model_file(self, folder_path, run_id):
+        # The feature config travels inside the model file, so serving computes the same features
+        if self.features:
+            config = self.features.to_dict()
+            if self.model_type == 'xgboost':
+                self.model.set_attr(rolling_features=json.dumps(config))
+            else:
+                self.model.rolling_features_ = config
+
+        with self.timer.stage("save_model"):
+            if self.model_type == 'xgboost':
+                model_path = os.path.join(folder_path, f"model_{run_id}.json")
+                self.model.save_model(model_path)
+            else:
+                import joblib
+                model_path = os.path.join(folder_path, f"model_{run_id}.pkl")
+                joblib.dump(self.model, model_path)
+
+        try:
+            self.catalog().record_model(run_id, model_path, self.model_type, folder_path)
+        except Exception as e:
+            print(f"Could not update run catalog: {e}")
+
+    def catalog(self):
+        """The run catalog for this results dir (see catalog.py)."""
+        if self._catalog is None:
+            self._catalog = RunCatalog(self.base_results_dir)
+        return self._catalog
+
+    def _record_run(self, run_id, run_folder, kind, params, extra_metrics=None):
+        # The catalog is an index: a failure to update it must not fail the run itself
+        metrics = dict(self.metrics, **(extra_metrics or {}))
+        if self.timings: metrics["peak_rss_mb"] = self.timings["peak_rss_mb"]
+        try:
+            self.catalog().record_run(
+                run_id, run_folder, self.model_type, self.task_type, kind=kind,
+                dataset=self.dataset, params=params, metrics=metrics
+            )
+        except Exception as e:
+            print(f"Could not update run catalog: {e}")
+
+    def _check_base_features(self, feature_names):
+        if not self.base_model: return
+        model = self.base_model[1]
         if self.model_type == 'xgboost':
-            self.model.save_model(os.path.join(folder_path, f"model_{run_id}.json"))
+            expected = model.feature_names
         else:
-            joblib.dump(self.model, os.path.join(folder_path, f"model_{run_id}.pkl"))
+            expected = getattr(model, 'feature_names_in_', None)
+        if expected is not None and list(expected) != list(feature_names):
+            raise ValueError(f"Dataset features {list(feature_names)} do not match the base model's {list(expected)}")
+
+    def _save_timings(self, folder_path):
+        # Must run before the folder is published: published folders are never modified
+        self.timings = self.timer.summary()
+        with open(os.path.join(folder_path, TIMINGS_FILE), "w") as f:
+            json.dump(self.timings, f, indent=2)
+        with open(os.path.join(folder_path, "evaluation_report.txt"), "a") as f:
+            f.write("\n".join(self.timer.report_lines()))
+        self.timer.reset() # The next run on this instance starts from scratch
 
     def _update_latest_folder(self, source_folder):
-        latest_dir = os.path.join(self.base_results_dir, "latest")
-        if os.path.exists(latest_dir): shutil.rmtree(latest_dir)
-        shutil.copytree(source_folder, latest_dir)
+        # Run folders are never modified after publishing, so "latest" is just a pointer to one
+        results_pointer.publish(self.base_results_dir, "latest", source_folder)
 
-    def _save_feature_importance(self, X, folder_path):
+    def _save_feature_importance(self, feature_names, folder_path):
         try:
-            plt.figure(figsize=(10, 6))
-            
             if self.model_type == 'xgboost':
-                xgb.plot_importance(self.model, max_num_features=10, height=0.5)
-                plt.title("XGBoost Feature Importance")
+                scores = self.model.get_score(importance_type='weight')
+                names, values = list(scores.keys()), np.array(list(scores.values()), dtype=float)
+                title, xlabel = "XGBoost Feature Importance", "F score"
             
             elif self.model_type == 'random_forest':
-                importances = self.model.feature_importances_
-                indices = np.argsort(importances)[::-1][:10]
-                plt.barh(range(len(indices)), importances[indices], align='center')
-                plt.yticks(range(len(indices)), [X.columns[i] for i in indices])
-                plt.xlabel("Relative Importance")
-                plt.title("Random Forest Feature Importance")
-                plt.gca().invert_yaxis()
+                names, values = list(feature_names), self.model.feature_importances_
+                title, xlabel = "Random Forest Feature Importance", "Relative Importance"
 
             elif self.model_type == 'linear':
-                if hasattr(self.model, 'coef_'):
-                    coefs = self.model.coef_
-                    if coefs.ndim > 1: coefs = coefs[0]
-                    indices = np.argsort(np.abs(coefs))[::-1][:10]
-                    plt.barh(range(len(indices)), coefs[indices], align='center')
-                    plt.yticks(range(len(indices)), [X.columns[i] for i in indices])
-                    plt.title("Linear Model Coefficients (Top 10)")
-                    plt.gca().invert_yaxis()
-
-            plt.tight_layout()
-            plt.savefig(os.path.join(folder_path, "feature_importance.png"))
-            plt.close()
+                if not hasattr(self.model, 'coef_'): return
+                coefs = self.model.coef_
+                if coefs.ndim > 1: coefs = coefs[0]
+                names, values = list(feature_names), coefs
+                title, xlabel = "Linear Model Coefficients (Top 10)", "Coefficient"
+            else:
+                return
+
+            indices = np.argsort(np.abs(values))[::-1][:10]
+            self._update_plot_data(folder_path, "feature_importance", {
+                "title": title,
+                "xlabel": xlabel,
+                "names": [names[i] for i in indices],
+                "values": [float(values[i]) for i in indices]
+            })
         except Exception as e:
             print(f"Could not save feature importance: {e}")
 
     def _save_regression_scatter(self, y_true, y_pred, folder_path):
-        plt.figure(figsize=(8, 8))
-        plt.scatter(y_true, y_pred, alpha=0.5)
-        min_val = min(min(y_true), min(y_pred))
-        max_val = max(max(y_true), max(y_pred))
-        plt.plot([min_val, max_val], [min_val, max_val], color='red', linestyle='--')
-        plt.xlabel('Actual Values')
-        plt.ylabel('Predicted Values')
-        plt.title('Actual vs Predicted')
-        plt.grid(True)
-        plt.savefig(os.path.join(folder_path, "regression_scatter.png"))
-        plt.close()
\ No newline at end of file
+        # Cap the stored points; a scatter of millions of dots is unreadable anyway
+        y_true, y_pred = np.asarray(y_true, dtype=float), np.asarray(y_pred, dtype=float)
+        if len(y_true) > MAX_SCATTER_POINTS:
+            idx = np.random.default_rng(42).choice(len(y_true), MAX_SCATTER_POINTS, replace=False)
+            y_true, y_pred = y_true[idx], y_pred[idx]
+        np.savez_compressed(os.path.join(folder_path, REGRESSION_POINTS_FILE), y_true=y_true, y_pred=y_pred)
+        self._update_plot_data(folder_path, "regression", {"points_file": REGRESSION_POINTS_FILE})
@@ -1,80 +1,180 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
+import sys
+import copy
+import json
+import time
 import threading
-import pandas as pd
-from XGridBoost import XGridBoost
-from generate_logs import generate_multiclass_data
+from collections import OrderedDict
+import dataset_cache
+import render_artifacts
+import metrics
+import results_pointer
+import batch_eval
+from XGridBoost import XGridBoost, read_model_file, model_features, IGNORE_COLS
+from generate_logs import generate_multiclass_data, generate_scenario_data
+from tasks import DATASETS_DIR, run_training_task, run_generation_task, run_testing_task, run_evaluation_task
+from model_registry import ModelRegistry
+from catalog import RunCatalog, FILTER_COLUMNS as CATALOG_FILTERS
+from job_queue import JobQueue, QueueFullError
+from notifications import EventBroker
+from micro_batcher import MicroBatcher, BatcherClosedError
+from stream_sessions import SessionManager, BackpressureError
+from rolling_features import RollingFeatures, OnlineRollingFeatures
+from streaming_metrics import MetricsAccumulator
+from compiled_trees import UnsupportedModelError
 
 app = Flask(__name__)
 CORS(app)  # Allow React to talk to Flask
+metrics.instrument(app) # Per-endpoint latency + GET /metrics (see metrics.py)
 
-# Configuration
-DATASETS_DIR = "datasets"
+# Configuration (DATASETS_DIR lives in tasks.py, shared with the job workers)
 os.makedirs(DATASETS_DIR, exist_ok=True)
+SIMULATE_CHUNK_ROWS = 10_000 # Rows per predict/serialize step when streaming /api/simulate
+SIMULATE_STATE_ENTRIES = 64  # Rolling-feature states kept for /api/simulate 'next_offset' cursors
+COMPILED_PREDICT = os.environ.get("COMPILED_PREDICT", "1") == "1" # Flattened-tree kernel for small batches
+
+# Index of training runs and model files (see catalog.py)
+run_catalog = RunCatalog("test_results")
+
+# Shared cache of deserialized models (see model_registry.py). A model's batcher and
+# compiled kernel are dropped with it, so they stay bounded by the same LRU.
+model_registry = ModelRegistry(loader=read_model_file, on_evict=lambda key: release_model(key))
+
+def compile_model_file(filepath):
+    """Loader for compiled_registry: the verified FlatEnsemble of a model, or None to use the native predictor."""
+    bot = XGridBoost()
+    bot.use_model(*model_registry.get(filepath))
+    try:
+        bot.compile(verify=True)
+    except (UnsupportedModelError, ValueError) as e:
+        print(f"Using the native predictor for {filepath}: {e}")
+    return bot.compiled
+
+# Flattened tree ensembles for /api/predict and /api/stream (see compiled_trees.py)
+compiled_registry = ModelRegistry(loader=compile_model_file)
+
+# Push channel for job progress and finished results (see notifications.py)
+events = EventBroker()
+
+def on_job_event(event_type, job):
+    events.publish(event_type, job)
+    if event_type == "job" and job["status"] in ("done", "failed", "cancelled"):
+        metrics.observe_job(job)
+    # Tell result views which report to (re)load, so they never have to poll for it
+    if event_type == "job" and job["status"] == "done" and job["kind"] in ("train", "test", "evaluate"):
+        result = job["result"] or {}
+        events.publish("results", {
+            "which": {"train": "latest", "test": "test_latest", "evaluate": "evaluation"}[job["kind"]],
+            "job_id": job["id"],
+            "folder": result.get("run_folder") or result.get("test_folder") or result.get("eval_folder")
+        })
+
+# Bounded scheduler for /api/train and /api/test (see job_queue.py; job targets are in tasks.py)
+job_queue = JobQueue(on_event=on_job_event)
+
+# One micro-batcher per model for /api/predict (see micro_batcher.py)
+predict_batchers = {}
+predict_batchers_lock = threading.Lock()
+
+# Live telemetry streams (see stream_sessions.py)
+stream_sessions = SessionManager()
+
+# Rolling-feature state at the end of recent /api/simulate pages: (model, dataset, offset) -> states
+simulate_states = OrderedDict()
+simulate_states_lock = threading.Lock()
+
+# ---------------------------------------------------------
+# HELPER: Model Listing
+# ---------------------------------------------------------
+def catalog_model_entry(run):
+    """Shapes a catalog row like the old os.walk listing, plus the run metadata."""
+    path = run["model_path"]
+    return {
+        "id": path, # We use the full path as the ID
+        "name": f"{os.path.basename(run['run_folder'] or '')} - {os.path.basename(path)}",
+        "type": "XGBoost" if path.endswith(".json") else "Scikit-Learn",
+        "run_id": run["run_id"],
+        "created_at": run["created_at"],
+        "kind": run["kind"],
+        "model_type": run["model_type"],
+        "task_type": run["task_type"],
+        "dataset": run["dataset"],
+        "params": run["params"],
+        "metrics": run["metrics"],
+        "missing": run["missing"] # Model file is gone; DELETE /api/models/missing drops the entry
+    }
 
 # ---------------------------------------------------------
-# HELPER: Background Training Thread
+# HELPER: Online Scoring
 # ---------------------------------------------------------
-def run_training_task(filename, label_col, model_type, task_type, params):
+def get_predict_batcher(model_path):
     """
-    Runs the EasyModel training in a separate thread.
+    Returns the shared MicroBatcher for a model. The model itself is fetched from
+    the registry on every batch, so re-saving the file is picked up automatically.
     """
+    key = os.path.abspath(model_path)
+    with predict_batchers_lock:
+        batcher = predict_batchers.get(key)
+        if batcher is None:
+            scorer = {"loaded": None}
+            def load():
+                # The scorer is rebuilt only when the registry hands out a different model
+                loaded = model_registry.get(key)
+                if loaded is not scorer["loaded"]:
+                    bot = XGridBoost()
+                    bot.use_model(*loaded)
+                    if COMPILED_PREDICT:
+                        bot.compiled = compiled_registry.get(key)
+                    scorer.update(loaded=loaded, bot=bot, n_features=len(bot.feature_names()))
+                return scorer
+            batcher = predict_batchers[key] = MicroBatcher(
+                lambda rows: load()["bot"].predict_rows(rows), n_features=lambda: load()["n_features"]
+            )
+        return batcher
+
+def submit_rows(model_path, rows):
+    """Queues rows on the model's batcher; retries once if an eviction closed it in between."""
     try:
-        print(f"--- Background Task Started: {model_type} on {filename} ---")
-        
-        # 1. Initialize the library with the user's choices
-        bot = XGridBoost(model_type=model_type, task_type=task_type)
-        
-        # 2. Construct full path
-        filepath = os.path.join(DATASETS_DIR, filename)
+        return get_predict_batcher(model_path).submit(rows)
+    except BatcherClosedError:
+        return get_predict_batcher(model_path).submit(rows)
 
-        # 3. Load Data
-        # We wrap this in try/except to catch CSV errors early
-        try:
-            X, y = bot.load_data(filepath, label_col)
-        except Exception as e:
-            print(f"Data Load Error: {e}")
-            return
-
-        # 4. Train
-        # The library handles the logic for different model types internally
-        bot.train(X, y, params=params)
-        
-        print(f"--- Background Task Complete: Results in /latest ---")
-        
-    except Exception as e:
-        print(f"CRITICAL WORKER ERROR: {e}")
+def release_model(key):
+    """on_evict hook of model_registry: stops the model's batcher thread and drops its compiled kernel."""
+    with predict_batchers_lock:
+        batcher = predict_batchers.pop(key, None)
+    if batcher is not None:
+        batcher.close()
+    compiled_registry.evict(key)
 
-def find_saved_models(base_dir="test_results"):
-    models = []
-    if not os.path.exists(base_dir): return models
-    
-    # Walk through run folders to find .json (XGB) or .pkl (RF/Linear) files
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            if file.endswith(".json") or file.endswith(".pkl"):
-                full_path = os.path.join(root, file)
-                # Create a friendly name
-                folder_name = os.path.basename(root)
-                models.append({
-                    "id": full_path, # We use the full path as the ID
-                    "name": f"{folder_name} - {file}",
-                    "type": "XGBoost" if file.endswith(".json") else "Scikit-Learn"
-                })
-    return models
+def conditional_results(payload, folder):
+    """
+    JSON response tagged with an ETag of the published result folder. Clients that
+    send it back in If-None-Match get an empty 304 until a new result is published.
+    """
+    response = jsonify(payload)
+    if folder:
+        report_path = os.path.join(folder, "evaluation_report.txt")
+        mtime = os.stat(report_path).st_mtime_ns if os.path.exists(report_path) else 0
+        response.set_etag(f"{os.path.basename(folder)}-{mtime}")
+    return response.make_conditional(request)
 
-# ---------------------------------------------------------
-# BACKGROUND WORKER: Test
-# ---------------------------------------------------------
-def run_testing_task(model_path, dataset_file, label_col):
+def send_rendered_image(folder, filename):
+    """Serves a result image, rendering it in the render process on first request."""
     try:
-        # We don't need model_type here, the load_model method detects it
-        bot = XGridBoost() 
-        data_path = os.path.join(DATASETS_DIR, dataset_file)
-        bot.evaluate_saved_model(model_path, data_path, label_col)
+        render_artifacts.ensure_image(folder, filename)
     except Exception as e:
-        print(f"TESTING ERROR: {e}")
+        return jsonify({"error": f"Could not render {filename}: {e}"}), 500
+    return send_from_directory(folder, filename)
+
+def readings_to_rows(readings, feature_names):
+    """Turns [{'voltage': .., 'current': .., ...}, ...] into a matrix in model feature order."""
+    missing = [f for f in feature_names if f not in readings[0]]
+    if missing:
+        raise ValueError(f"Readings are missing features: {missing}")
+    return [[float(r[f]) for f in feature_names] for r in readings]
 
 # ---------------------------------------------------------
 # ENDPOINTS
@@ -93,9 +193,9 @@ def get_options():
 
 @app.route('/api/datasets', methods=['GET'])
 def get_datasets():
-    """Scans the /datasets folder and returns CSV files."""
+    """Scans the /datasets folder and returns CSV (and Parquet) files."""
     try:
-        files = [f for f in os.listdir(DATASETS_DIR) if f.endswith('.csv')]
+        files = [f for f in os.listdir(DATASETS_DIR) if f.endswith(('.csv', '.parquet'))]
         return jsonify({"datasets": files})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -113,6 +213,13 @@ def train_model():
     model_type = data.get('model_type', 'xgboost')
     task_type = data.get('task_type', 'multiclass')
     params = data.get('params', {}) # e.g. {'max_depth': 4, 'n_estimators': 50}
+    streaming = bool(data.get('streaming', False)) # Chunked, out-of-core ingestion
+    external_memory = bool(data.get('external_memory', False)) # Streaming only: quantized pages cached on disk
+    search = data.get('search') # e.g. {'strategy': 'halving', 'space': {'max_depth': [3, 6, 9]}}
+    cv = data.get('cv') # e.g. {'n_splits': 5, 'strategy': 'timeseries'}
+    chunksize = int(data.get('chunksize', 100_000))
+    rolling = data.get('rolling_features') # true, or e.g. {'windows': [5, 20], 'ewm_spans': [10]}
+    base_model = data.get('base_model') # Path of a saved model to continue training from
 
     # Basic Validation
     if not filename or not label_col:
@@ -121,21 +228,68 @@ def train_model():
     if not os.path.exists(os.path.join(DATASETS_DIR, filename)):
         return jsonify({"error": "Dataset not found"}), 404
 
-    # Run training in background thread
-    thread = threading.Thread(
-        target=run_training_task, 
-        args=(filename, label_col, model_type, task_type, params)
-    )
-    thread.start()
+    if streaming and model_type != 'xgboost':
+        return jsonify({"error": "Streaming training is only supported for xgboost"}), 400
+
+    if external_memory and not streaming:
+        return jsonify({"error": "'external_memory' requires 'streaming'"}), 400
+
+    if (search or cv) and streaming:
+        return jsonify({"error": "Search and cross-validation are not supported with streaming"}), 400
+
+    if search and cv:
+        return jsonify({"error": "Choose either 'search' or 'cv'"}), 400
+
+    if rolling and streaming:
+        return jsonify({"error": "Rolling features are not supported with streaming"}), 400
+    if rolling:
+        try:
+            rolling = RollingFeatures.from_dict(rolling).to_dict()
+        except (ValueError, TypeError, AttributeError) as e:
+            return jsonify({"error": f"Invalid 'rolling_features': {e}"}), 400
+
+    if base_model:
+        if search or cv:
+            return jsonify({"error": "Search and cross-validation always train from scratch (no 'base_model')"}), 400
+        if not os.path.exists(base_model):
+            return jsonify({"error": "Base model not found"}), 404
+        # The base model decides the model type, task and rolling features
+        base, model_type, base_task = model_registry.get(base_model)
+        if model_type not in ('xgboost', 'random_forest'):
+            return jsonify({"error": f"Warm start is only supported for xgboost and random_forest, not {model_type}"}), 400
+        task_type = base_task or task_type
+        features = model_features(base, model_type)
+        rolling = features.to_dict() if features else None
+        if streaming and (model_type != 'xgboost' or rolling):
+            return jsonify({"error": "Streaming warm start needs an xgboost base model without rolling features"}), 400
+
+    config = {
+        "model": model_type,
+        "task": task_type,
+        "file": filename,
+        "streaming": streaming,
+        "external_memory": external_memory,
+        "search": (search or {}).get('strategy'),
+        "cv": (cv or {}).get('strategy', 'stratified') if cv else None,
+        "rolling_features": rolling or None,
+        "base_model": base_model
+    }
+
+    # Queue training as a background job (runs in a worker process)
+    try:
+        job = job_queue.submit("train", run_training_task, {
+            "filename": filename, "label_col": label_col, "model_type": model_type,
+            "task_type": task_type, "params": params, "streaming": streaming, "chunksize": chunksize,
+            "external_memory": external_memory, "search": search, "cv": cv, "rolling_features": rolling or None, "base_model": base_model
+        }, config=config)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
 
     return jsonify({
         "message": "Training started.",
         "status": "processing",
-        "config": {
-            "model": model_type,
-            "task": task_type,
-            "file": filename
-        }
+        "job_id": job.id,
+        "config": config
     })
 
 @app.route('/api/results/latest', methods=['GET'])
@@ -143,14 +297,14 @@ def get_latest_results():
     """
     Returns the text report AND a list of available image filenames.
     """
-    latest_dir = os.path.join("test_results", "latest")
+    latest_dir = results_pointer.resolve("test_results", "latest")
     response = {
         "status": "pending", 
         "report": "No results available.", 
         "images": [] 
     }
     
-    if os.path.exists(latest_dir):
+    if latest_dir:
         # 1. Read Report
         report_path = os.path.join(latest_dir, "evaluation_report.txt")
         if os.path.exists(report_path):
@@ -158,12 +312,11 @@ def get_latest_results():
                 response["report"] = f.read()
             response["status"] = "ready"
         
-        # 2. Scan for Images (.png)
-        # This will find 'confusion_matrix.png', 'training_loss_curve.png', etc.
-        image_files = [f for f in os.listdir(latest_dir) if f.endswith('.png')]
-        response["images"] = image_files
+        # 2. List Images (.png)
+        # Includes plots not rendered yet: they are drawn when first requested
+        response["images"] = render_artifacts.available_images(latest_dir)
         
-    return jsonify(response)
+    return conditional_results(response, latest_dir)
 
 @app.route('/api/results/latest/image/<filename>', methods=['GET'])
 def get_image(filename):
@@ -171,13 +324,109 @@ def get_image(filename):
     Serves the actual image file (png) to the frontend.
     """
     # We use os.getcwd() to ensure we have the absolute path to the project root
-    latest_dir = os.path.join(os.getcwd(), "test_results", "latest")
-    return send_from_directory(latest_dir, filename)
+    latest_dir = results_pointer.resolve(os.path.join(os.getcwd(), "test_results"), "latest")
+    if not latest_dir: return jsonify({"error": "No results available"}), 404
+    return send_rendered_image(latest_dir, filename)
 
 @app.route('/api/models', methods=['GET'])
 def get_trained_models():
-    """Returns list of saved models found in test_results/"""
-    return jsonify({"models": find_saved_models()})
+    """
+    Lists saved models from the run catalog (no filesystem walk).
+    Query params: model_type, task_type, dataset, kind (filters), sort (created_at |
+    accuracy | rmse | model_type | dataset), order (asc | desc), limit, cursor.
+    Without a limit every model is returned; with one, pass the returned
+    next_cursor to get the following page.
+    """
+    args = request.args
+    run_catalog.backfill() # One-time import of runs that predate the catalog
+    try:
+        runs, next_cursor = run_catalog.query(
+            filters={col: args.get(col) for col in CATALOG_FILTERS},
+            sort=args.get('sort', 'created_at'),
+            order=args.get('order', 'desc'),
+            limit=args.get('limit', type=int),
+            cursor=args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    models = [catalog_model_entry(r) for r in runs]
+    return jsonify({"models": models, "next_cursor": next_cursor})
+
+@app.route('/api/models/missing', methods=['DELETE'])
+def prune_missing_models():
+    """Removes catalog entries whose model file was deleted (listed with "missing": true)."""
+    removed = run_catalog.prune_missing()
+    for run in removed:
+        model_registry.evict(run["model_path"])
+        compiled_registry.evict(run["model_path"])
+    return jsonify({"status": "success", "removed": [r["run_id"] for r in removed]})
+
+@app.route('/api/models/cache', methods=['GET'])
+def get_model_cache():
+    """Returns hit/miss counters and the models currently held in memory."""
+    return jsonify(model_registry.stats())
+
+@app.route('/api/models/cache', methods=['DELETE'])
+def clear_model_cache():
+    """
+    Evicts cached models.
+    Optional Body: { "model_path": "..." } to evict a single model.
+    """
+    data = request.get_json(silent=True) or {}
+    model_path = data.get('model_path')
+    if model_path:
+        evicted = model_registry.evict(model_path)
+        compiled_registry.evict(model_path)
+        return jsonify({"status": "success", "evicted": 1 if evicted else 0})
+
+    count = model_registry.stats()["entries"]
+    model_registry.clear()
+    compiled_registry.clear()
+    return jsonify({"status": "success", "evicted": count})
+
+@app.route('/api/models/compile', methods=['POST'])
+def compile_model():
+    """
+    Verification mode for the flattened-tree kernel: compiles a model, checks it
+    against the native predictor and compares single-row latency.
+    Example Body: { "model_path": "..." }
+    """
+    data = request.get_json(silent=True) or {}
+    model_path = data.get('model_path')
+    if not model_path:
+        return jsonify({"error": "Missing 'model_path'"}), 400
+    if not os.path.exists(model_path):
+        return jsonify({"error": "Model not found"}), 404
+
+    bot = XGridBoost()
+    bot.load_model(model_path, registry=model_registry)
+    try:
+        report = bot.compile(verify=True)
+    except UnsupportedModelError as e:
+        return jsonify({"status": "unsupported", "error": str(e)}), 400
+    except ValueError as e:
+        return jsonify({"status": "mismatch", "error": str(e)}), 409
+
+    compiled = bot.compiled
+    row = [[0.0] * max(len(bot.feature_names()), compiled.n_features)]
+    def time_us(fn, repeat=200):
+        start = time.perf_counter()
+        for _ in range(repeat): fn(row)
+        return round((time.perf_counter() - start) / repeat * 1e6, 1)
+
+    latency = {"compiled_us": time_us(bot.predict_rows)}
+    bot.compiled = None
+    latency["native_us"] = time_us(bot.predict_rows)
+    return jsonify({
+        "status": "ok",
+        "verification": report,
+        "single_row_latency": latency,
+        "trees": len(compiled.roots),
+        "nodes": len(compiled.child),
+        "depth": compiled.depth,
+        "enabled": COMPILED_PREDICT
+    })
 
 @app.route('/api/test', methods=['POST'])
 def test_model():
@@ -185,73 +434,411 @@ def test_model():
     model_path = data.get('model_path')
     dataset = data.get('dataset')
     label_col = data.get('label_col', 'label') # Default to 'label'
+    # Score the dataset in chunks of this many rows instead of loading it whole (for large files)
+    chunksize = int(data['chunksize']) if data.get('chunksize') else None
     
     if not model_path or not dataset:
         return jsonify({"error": "Missing model_path or dataset"}), 400
         
-    thread = threading.Thread(
-        target=run_testing_task,
-        args=(model_path, dataset, label_col)
-    )
-    thread.start()
+    try:
+        job = job_queue.submit("test", run_testing_task, {
+            "model_path": model_path, "dataset_file": dataset, "label_col": label_col, "chunksize": chunksize
+        }, config={"model_path": model_path, "file": dataset, "chunksize": chunksize})
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
     
-    return jsonify({"status": "processing", "message": "Testing started"})
+    return jsonify({"status": "processing", "message": "Testing started", "job_id": job.id})
+
+@app.route('/api/evaluate', methods=['POST'])
+def evaluate_models():
+    """Scores several saved models on one dataset (loaded once) and ranks them, see batch_eval.py."""
+    data = request.json
+    model_paths = data.get('model_paths')
+    dataset = data.get('dataset')
+    label_col = data.get('label_col', 'label')
+
+    if not isinstance(model_paths, list) or not model_paths or not dataset:
+        return jsonify({"error": "Missing model_paths (a non-empty list) or dataset"}), 400
+    missing = [p for p in model_paths if not os.path.exists(p)]
+    if missing:
+        return jsonify({"error": f"Models not found: {missing}"}), 404
+    if not os.path.exists(os.path.join(DATASETS_DIR, dataset)):
+        return jsonify({"error": f"Dataset '{dataset}' not found"}), 404
+
+    try:
+        job = job_queue.submit("evaluate", run_evaluation_task, {
+            "model_paths": model_paths, "dataset_file": dataset, "label_col": label_col
+        }, config={"model_paths": model_paths, "file": dataset})
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({"status": "processing", "message": "Evaluation started", "job_id": job.id})
+
+@app.route('/api/evaluations', methods=['GET'])
+def list_evaluations():
+    """Past batch evaluations, newest first, with their best model per task type."""
+    evaluations = []
+    for name in sorted(os.listdir("test_results"), reverse=True):
+        path = os.path.join("test_results", name, batch_eval.LEADERBOARD_FILE)
+        if not name.startswith("eval_") or not os.path.exists(path): continue
+        with open(path) as f:
+            board = json.load(f)
+        evaluations.append({
+            "eval_id": board["eval_id"],
+            "created_at": board["created_at"],
+            "dataset": board["dataset"],
+            "rows": board["rows"],
+            "models": len(board["models"]),
+            "best": {m["task_type"]: m for m in board["models"] if m.get("rank") == 1}
+        })
+    return jsonify(evaluations)
+
+@app.route('/api/evaluations/<eval_id>', methods=['GET'])
+def get_evaluation(eval_id):
+    path = os.path.join("test_results", f"eval_{os.path.basename(eval_id)}", batch_eval.LEADERBOARD_FILE)
+    if not os.path.exists(path):
+        return jsonify({"error": "Evaluation not found"}), 404
+    with open(path) as f:
+        return jsonify(json.load(f))
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """
+    Low-latency scoring. Concurrent requests for the same model are coalesced
+    into micro-batches and scored with one vectorized call.
+
+    Example Body:
+    { "model_path": "...", "readings": [{"voltage": 121.0, "current": 15.2, "temperature": 40.1}] }
+    A single { "reading": {...} } is also accepted.
+    """
+    start = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    model_path = data.get('model_path')
+    readings = data.get('readings') or ([data['reading']] if data.get('reading') else None)
+
+    if not model_path or not readings:
+        return jsonify({"error": "Missing 'model_path' or 'readings'"}), 400
+    if not os.path.exists(model_path):
+        return jsonify({"error": "Model not found"}), 404
+
+    try:
+        bot = XGridBoost()
+        bot.use_model(*model_registry.get(model_path))
+        rows = readings_to_rows(readings, bot.feature_names())
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        preds = submit_rows(model_path, rows).result(timeout=30)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "predictions": preds.tolist(),
+        "count": len(rows),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+
+@app.route('/api/predict/stats', methods=['GET'])
+def predict_stats():
+    """Batch counters per model, useful for tuning the latency budget."""
+    with predict_batchers_lock:
+        return jsonify({path: b.stats() for path, b in predict_batchers.items()})
+
+@app.route('/api/stream', methods=['POST'])
+def open_stream():
+    """
+    Opens a live scoring session for a model.
+    Push readings to /api/stream/<id>/readings and read predictions from
+    the Server-Sent Events channel at /api/stream/<id>/events.
+    """
+    data = request.get_json(silent=True) or {}
+    model_path = data.get('model_path')
+    if not model_path:
+        return jsonify({"error": "Missing 'model_path'"}), 400
+    if not os.path.exists(model_path):
+        return jsonify({"error": "Model not found"}), 404
+
+    _, _, task_type = model_registry.get(model_path)
+    session = stream_sessions.create(model_path, lambda rows: submit_rows(model_path, rows), task_type=task_type)
+    return jsonify({"session_id": session.id, "max_pending": session.max_pending})
+
+@app.route('/api/stream', methods=['GET'])
+def list_streams():
+    return jsonify({"sessions": stream_sessions.list()})
+
+@app.route('/api/stream/<session_id>/readings', methods=['POST'])
+def push_stream_readings(session_id):
+    """
+    Example Body:
+    { "id": "msg-42", "readings": [{"voltage": 121.0, "current": 15.2, "temperature": 40.1}] }
+    For models trained with rolling features, send readings in time order; add
+    "substation_id" when one session carries several substations.
+    When every reading has a "label" (e.g. replaying a labelled log), the session
+    keeps running metrics: see /api/stream/<id>/metrics and the 'metrics' events.
+    Returns 202 with the message sequence number, or 429 when the client is not
+    reading predictions fast enough (backpressure).
+    """
+    session = stream_sessions.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    readings = data.get('readings') or ([data['reading']] if data.get('reading') else None)
+    if not readings:
+        return jsonify({"error": "Missing 'readings'"}), 400
+
+    labels = [r['label'] for r in readings] if all('label' in r for r in readings) else None
+
+    try:
+        bot = XGridBoost()
+        bot.use_model(*model_registry.get(session.model_path))
+        if bot.features:
+            # Rolling features are kept per substation_id for the lifetime of the session
+            if session.features is None:
+                session.features = OnlineRollingFeatures(bot.features)
+            readings = [session.features.update(r) for r in readings]
+        rows = readings_to_rows(readings, bot.feature_names())
+        seq = session.push(rows, message_id=data.get('id'), labels=labels)
+    except BackpressureError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "1"}
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"status": "accepted", "seq": seq}), 202
+
+@app.route('/api/stream/<session_id>/events', methods=['GET'])
+def stream_events(session_id):
+    """SSE channel: one 'prediction' event per pushed message, with its latency."""
+    session = stream_sessions.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(session.events()), mimetype='text/event-stream', headers=headers)
+
+@app.route('/api/stream/<session_id>/metrics', methods=['GET'])
+def get_stream_metrics(session_id):
+    """Running accuracy, confusion matrix, per-class and sliding-window metrics of a labelled stream."""
+    session = stream_sessions.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"session_id": session.id, "metrics": session.metrics()})
+
+@app.route('/api/stream/<session_id>', methods=['GET'])
+def get_stream(session_id):
+    session = stream_sessions.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify(session.stats())
+
+@app.route('/api/stream/<session_id>', methods=['DELETE'])
+def close_stream(session_id):
+    if not stream_sessions.close(session_id):
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"status": "success", "message": "Session closed"})
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Lists known jobs. Optional filters: ?status=running&kind=train"""
+    jobs = job_queue.list(status=request.args.get('status'), kind=request.args.get('kind'))
+    return jsonify({"jobs": jobs, "queue": job_queue.stats()})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancels a queued job or terminates a running one."""
+    success, message = job_queue.cancel(job_id)
+    if not success:
+        return jsonify({"status": "error", "message": message}), 404 if message == "Job not found" else 409
+    return jsonify({"status": "success", "message": message})
+
+@app.route('/api/events', methods=['GET'])
+def stream_job_events():
+    """
+    SSE channel for background work. Event types:
+      job      - a job was queued / started / finished (payload = the job, as in /api/jobs)
+      progress - a running job reported progress, e.g. per-round XGBoost metrics
+      results  - a train/test job published new results ('which': latest | test_latest)
+    Optional ?types=job,results limits the stream. Reconnecting clients send
+    Last-Event-ID (browsers do this automatically) to receive what they missed.
+    """
+    types = set(filter(None, request.args.get('types', '').split(','))) or None
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(events.subscribe(last_id, types)), mimetype='text/event-stream', headers=headers)
 
 @app.route('/api/results/test_latest', methods=['GET'])
 def get_test_results():
     """Specific endpoint for fetching TEST results (distinct from training results)"""
-    latest_dir = os.path.join("test_results", "latest_test")
+    latest_dir = results_pointer.resolve("test_results", "latest_test")
     response = {"status": "pending", "report": "", "images": []}
     
-    if os.path.exists(latest_dir):
+    if latest_dir:
         report_path = os.path.join(latest_dir, "evaluation_report.txt")
         if os.path.exists(report_path):
             with open(report_path, 'r') as f:
                 response["report"] = f.read()
             
-            # Find images
-            response["images"] = [f for f in os.listdir(latest_dir) if f.endswith('.png')]
+            # Find images (rendered lazily on first request)
+            response["images"] = render_artifacts.available_images(latest_dir)
             response["status"] = "ready"
             
-    return jsonify(response)
+    return conditional_results(response, latest_dir)
 
 @app.route('/api/results/test_latest/image/<filename>', methods=['GET'])
 def get_test_image(filename):
     """Serves images from the latest_test folder"""
-    latest_dir = os.path.join(os.getcwd(), "test_results", "latest_test")
-    return send_from_directory(latest_dir, filename)
+    latest_dir = results_pointer.resolve(os.path.join(os.getcwd(), "test_results"), "latest_test")
+    if not latest_dir: return jsonify({"error": "No results available"}), 404
+    return send_rendered_image(latest_dir, filename)
 
 @app.route('/api/generate', methods=['POST'])
 def generate_data():
     try:
         data = request.json
-        
-        total_samples = int(data.get('total_samples', 3000))
-        
-        # New: Expecting specific percents, e.g. {"fdi": 10, "dos": 5}
-        fdi_percent = float(data.get('fdi_percent', 0))
-        dos_percent = float(data.get('dos_percent', 0))
-        
-        # Convert to ratios (0.1, 0.05)
-        attack_ratios = {
-            'fdi': fdi_percent / 100.0,
-            'dos': dos_percent / 100.0
+        mode = data.get('mode', 'samples') # 'samples' (i.i.d. rows) or 'scenario' (substation time series)
+
+        options = {
+            "chunk_size": data.get('chunk_size'),      # Rows per chunk (bounds memory)
+            "n_jobs": data.get('n_jobs'),              # Worker processes
+            "fmt": data.get('format', 'csv'),          # 'csv' or 'parquet'
+            "seed": int(data.get('seed', 42))
         }
-        
-        result = generate_multiclass_data(
-            total_samples=total_samples, 
-            attack_ratios=attack_ratios
-        )
+
+        if mode == 'scenario':
+            # e.g. {"n_substations": 1000, "n_timesteps": 1440, "episode_rates": {"fdi": 0.5},
+            #       "episode_durations": {"dos": [5, 30]}}
+            options.update({
+                "n_substations": int(data.get('n_substations', 100)),
+                "n_timesteps": int(data.get('n_timesteps', 1440)),
+                "interval_seconds": int(data.get('interval_seconds', 60)),
+                "episode_rates": data.get('episode_rates'),
+                "episode_durations": {k: tuple(v) for k, v in (data.get('episode_durations') or {}).items()}
+            })
+            total_samples = options["n_substations"] * options["n_timesteps"]
+        else:
+            total_samples = int(data.get('total_samples', 3000))
+            
+            # New: Expecting specific percents, e.g. {"fdi": 10, "dos": 5}
+            fdi_percent = float(data.get('fdi_percent', 0))
+            dos_percent = float(data.get('dos_percent', 0))
+            
+            # Convert to ratios (0.1, 0.05)
+            options["total_samples"] = total_samples
+            options["attack_ratios"] = {
+                'fdi': fdi_percent / 100.0,
+                'dos': dos_percent / 100.0
+            }
+
+        # Large datasets can be generated as a background job instead of inside the request
+        if data.get('background'):
+            try:
+                job = job_queue.submit("generate", run_generation_task, dict(options, mode=mode),
+                                       config={"mode": mode, "total_samples": total_samples, "format": options["fmt"]})
+            except QueueFullError as e:
+                return jsonify({"error": str(e)}), 429
+            return jsonify({"status": "processing", "job_id": job.id})
+
+        if mode == 'scenario':
+            result = generate_scenario_data(**options)
+        else:
+            result = generate_multiclass_data(**options)
         
         return jsonify({"status": "success", "details": result})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
+def _simulation_records(bot, df, label_col, columns=None, states=None, metrics=None):
+    """
+    Predicts on a loaded window and builds the playback rows straight from
+    the column arrays (no per-row DataFrame access).
+    `states` carries rolling-feature windows from the preceding rows (see _feature_states).
+    `metrics` (a MetricsAccumulator) is updated with the window's labels and predictions.
+    """
+    # bot.split_features handles dropping 'timestamp' automatically so the model doesn't crash
+    X, y = bot.split_features(bot.add_features(df, states), label_col)
+    preds = bot.predict(X)
+    if metrics is not None: metrics.update(y, preds)
+
+    out = {}
+    for col in (columns or df.columns):
+        if col not in df.columns: continue
+        values = df[col]
+        # Ensure timestamp is string-formatted for JSON (avoids serialization errors)
+        if col == 'timestamp': values = values.astype(str)
+        out[col] = values.tolist()
+
+    out['predicted'] = preds.tolist() if hasattr(preds, 'tolist') else list(preds)
+    # Standardize the label column name for the frontend
+    out['actual'] = y.tolist()
+
+    keys = list(out.keys())
+    return [dict(zip(keys, row)) for row in zip(*out.values())]
+
+def _state_source(model_path, data_path):
+    # File versions are part of the key, so re-saving the model or dataset misses old states
+    paths = (os.path.abspath(model_path), os.path.abspath(data_path))
+    return tuple((p, os.stat(p).st_mtime_ns) for p in paths)
+
+def _feature_states(bot, model_path, data_path, offset, all_cols):
+    """
+    Rolling-feature state after the first `offset` rows, so a page that starts
+    mid-dataset gets the same features as a full pass. None for raw-feature models.
+    Resumes from the closest state remembered at or before `offset` (the previous
+    page's next_offset, see _remember_states), so paging through a dataset
+    featurizes each row once instead of re-reading every row before each page.
+    """
+    if not bot.features: return None
+    source, start, states = _state_source(model_path, data_path), 0, {}
+    with simulate_states_lock:
+        cached = [key for key in simulate_states if key[0] == source and key[1] <= offset]
+        if cached:
+            key = max(cached, key=lambda k: k[1])
+            simulate_states.move_to_end(key)
+            # Copied: the stored state may be resumed by other requests too
+            start, states = key[1], copy.deepcopy(simulate_states[key])
+
+    input_cols = bot.features.input_columns(all_cols)
+    for chunk_start in range(start, offset, SIMULATE_CHUNK_ROWS):
+        chunk = dataset_cache.read_rows(data_path, chunk_start, min(SIMULATE_CHUNK_ROWS, offset - chunk_start), input_cols)
+        bot.add_features(chunk, states)
+    return states
+
+def _remember_states(model_path, data_path, offset, states):
+    """Keeps the rolling-feature state at `offset` (a page's next_offset) for the request that resumes there."""
+    if states is None or offset is None: return
+    with simulate_states_lock:
+        key = (_state_source(model_path, data_path), offset)
+        simulate_states[key] = states
+        simulate_states.move_to_end(key)
+        while len(simulate_states) > SIMULATE_STATE_ENTRIES:
+            simulate_states.popitem(last=False)
+
 @app.route('/api/simulate', methods=['POST'])
 def simulate_model():
     """
     Runs a model against a dataset and returns row-by-row predictions
     for the frontend to 'playback'.
+
+    Optional Body fields:
+      offset / limit - return one window of rows plus a 'next_offset' cursor
+      columns        - only include these dataset columns (predicted/actual are always sent)
+      format         - 'ndjson' streams one JSON row per line, chunk by chunk
+      metrics        - true to add running metrics (see streaming_metrics.py): the JSON
+                       response gets a 'metrics' snapshot of the returned rows, the
+                       ndjson stream a {"metrics": ...} line after every chunk
     """
     try:
         data = request.json
@@ -261,45 +848,62 @@ def simulate_model():
         if not model_path or not dataset:
             return jsonify({"error": "Missing params"}), 400
 
-        # 1. Load Model
+        # 1. Load Model (cached across requests by the registry)
         bot = XGridBoost()
-        bot.load_model(model_path)
+        bot.load_model(model_path, registry=model_registry)
         
         # 2. Get Data Paths
         data_path = os.path.join(DATASETS_DIR, dataset)
         label_col = data.get('label_col', 'label')
+        offset = max(int(data.get('offset', 0)), 0)
+        limit = data.get('limit')
+        columns = data.get('columns')
+        fmt = data.get('format', 'json')
+        metrics = MetricsAccumulator(bot.task_type) if data.get('metrics') else None
 
-        # 3. Generate Predictions (Using the clean, training-ready data)
-        # bot.load_data handles dropping 'timestamp' automatically so the model doesn't crash
-        X, y = bot.load_data(data_path, label_col) 
-        preds = bot.predict(X)
-        
-        # 4. Prepare Response Data (Need to recover timestamps!)
-        # We read the raw file again because 'X' has stripped the metadata columns.
-        # We want the frontend to receive the full context (timestamps, IDs, etc.)
-        df_full = pd.read_csv(data_path)
-        
-        # Append the prediction results to the full dataframe
-        df_full['predicted'] = preds
-        
-        # Standardize the label column name for the frontend
-        if label_col in df_full.columns:
-            df_full['actual'] = df_full[label_col]
-        else:
-            df_full['actual'] = 0 # Fallback if label is missing
+        # 3. Column projection: the model still needs its features and the label
+        all_cols = dataset_cache.read_columns(data_path)
+        read_cols = None
+        if columns:
+            needed = set(columns) | {c for c in all_cols if c not in IGNORE_COLS}
+            if bot.features: needed |= set(bot.features.input_columns(all_cols))
+            read_cols = [c for c in all_cols if c in needed]
 
-        # Ensure timestamp is string-formatted for JSON (avoids serialization errors)
-        if 'timestamp' in df_full.columns:
-            df_full['timestamp'] = df_full['timestamp'].astype(str)
+        total = dataset_cache.count_rows(data_path)
+        end = total if limit is None else min(offset + int(limit), total)
+        next_offset = end if end < total else None
+        states = _feature_states(bot, model_path, data_path, offset, all_cols)
 
-        # 5. Convert to JSON
-        # We limit to 2000 rows by default to prevent crashing the browser if the file is huge
-        #if len(df_full) > 2000:
-        #    df_full = df_full.head(2000)
+        # 4a. Streaming mode: predict and serialize one chunk at a time
+        if fmt == 'ndjson':
+            def generate():
+                for start in range(offset, end, SIMULATE_CHUNK_ROWS):
+                    window = dataset_cache.read_rows(data_path, start, min(SIMULATE_CHUNK_ROWS, end - start), read_cols)
+                    for record in _simulation_records(bot, window, label_col, columns, states, metrics):
+                        yield json.dumps(record) + "\n"
+                    if metrics is not None:
+                        yield json.dumps({"metrics": metrics.snapshot()}) + "\n"
+                _remember_states(model_path, data_path, next_offset, states)
 
-        result_json = df_full.to_dict(orient='records')
-        
-        return jsonify({"status": "success", "data": result_json})
+            headers = {"X-Total-Rows": str(total), "X-Next-Offset": "" if next_offset is None else str(next_offset)}
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=headers)
+
+        # 4b. Paged JSON mode (the whole dataset when no limit is given)
+        if limit is None and offset == 0:
+            window = dataset_cache.read_dataset(data_path, read_cols)
+        else:
+            window = dataset_cache.read_rows(data_path, offset, end - offset, read_cols)
+
+        response = {
+            "status": "success",
+            "data": _simulation_records(bot, window, label_col, columns, states, metrics),
+            "offset": offset,
+            "next_offset": next_offset,
+            "total": total
+        }
+        if metrics is not None: response["metrics"] = metrics.snapshot()
+        _remember_states(model_path, data_path, next_offset, states)
+        return jsonify(response)
 
     except Exception as e:
         print(f"Simulation Error: {e}")
@@ -307,4 +911,8 @@ def simulate_model():
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    # Spawned job workers re-import the parent's __main__ module before running their
+    # target. Point it at tasks.py so they don't rebuild the Flask app, registries and
+    # batchers of this module in every worker.
+    sys.modules['__main__'] = sys.modules['tasks']
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import time
+import numpy as np
+
+# joblib (via param_search) is imported on first use: app.py imports this module at startup
+LEADERBOARD_FILE = "leaderboard.json"
+UNKNOWN_TASK = "unknown" # task_type reported for models whose objective is not recognised
+
+def _score_model(model_path, loaded, load_s, X, y, columns, nthread):
+    """
+    Scores one model, already loaded by the parent, in a worker process on the shared rows.
+    A model that cannot be scored is reported as 'failed' instead of failing the batch.
+    """
+    # Imported here so the worker process resolves them by module name
+    import pandas as pd
+    from XGridBoost import XGridBoost
+    from param_search import score_predictions
+
+    model, model_type, task_type = loaded
+    # Models of an unrecognised task are ranked as a group of their own
+    result = {"model_path": model_path, "model_type": model_type, "task_type": task_type or UNKNOWN_TASK,
+              "rows": int(len(y)), "load_s": load_s}
+    try:
+        # The worker unpickled its own copy of the model, so it can be pinned to the worker's threads
+        if model_type == 'xgboost':
+            model.set_param({'nthread': nthread})
+        elif hasattr(model, 'n_jobs'):
+            model.n_jobs = nthread
+        bot = XGridBoost(model_type=model_type, nthread=nthread)
+        bot.use_model(model, model_type, task_type)
+
+        names = bot.feature_names() or columns
+        missing = [n for n in names if n not in columns]
+        if missing:
+            raise ValueError(f"Dataset is missing features: {missing}")
+        # X arrives memory-mapped and read-only; only a model with another column order needs a copy
+        data = X if names == columns else X[:, [columns.index(n) for n in names]]
+
+        start = time.perf_counter()
+        preds = np.asarray(bot.predict(pd.DataFrame(data, columns=names, copy=False)))
+        predict_s = time.perf_counter() - start
+
+        # Unrecognised objectives (count:, survival:, rank:, ...) all predict a number, so RMSE scores them
+        score, metrics = score_predictions(bot.task_type if task_type else 'regression', y, preds)
+        result.update(
+            status="ok", score=score, metrics=metrics, predict_s=round(predict_s, 4),
+            rows_per_s=round(len(y) / predict_s) if predict_s else None
+        )
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    return result
+
+def run_batch(tasks, total_threads=None, n_jobs=None, failed=()):
+    """
+    Scores loaded models in parallel worker processes and returns the leaderboard:
+    models ranked within their task_type (best first), failed models last.
+
+    `tasks` is a list of (model_path, (model, model_type, task_type), load_s, X, y, columns).
+    Models that need the same features pass the same X / y arrays: joblib memory-maps
+    them once and every worker reads them, so the dataset is neither reloaded nor
+    pickled per model. `failed` holds the results of models that could not be loaded.
+    Scores are "higher is better" (accuracy, or -RMSE for regression models), and
+    only comparable between models of the same task_type.
+    """
+    from joblib import Parallel, delayed
+    from param_search import thread_split
+
+    total_threads = total_threads or os.cpu_count() or 1
+    parallel, per_model = thread_split(len(tasks), total_threads, n_jobs)
+
+    results = Parallel(n_jobs=parallel, max_nbytes='1M', mmap_mode='r')(
+        delayed(_score_model)(path, loaded, load_s, X, y, columns, per_model)
+        for path, loaded, load_s, X, y, columns in tasks
+    ) if tasks else []
+
+    ok = [r for r in results if r["status"] == "ok"]
+    leaderboard = []
+    for task_type in sorted({r["task_type"] for r in ok}):
+        ranked = sorted((r for r in ok if r["task_type"] == task_type), key=lambda r: r["score"], reverse=True)
+        for rank, r in enumerate(ranked, start=1):
+            r["rank"] = rank
+        leaderboard += ranked
+    for r in [r for r in results if r["status"] != "ok"] + list(failed):
+        r["rank"] = None
+        leaderboard.append(r)
+    return leaderboard
@@ -0,0 +1,235 @@
+"""
+Benchmark suite for the ML backend: data generation, loading, training,
+prediction, /api/simulate and artifact rendering, at several dataset sizes.
+
+Everything runs in a scratch directory (datasets/ and test_results/ are created
+there), so the real results folder is never touched. Results are written as JSON
+together with machine info. With --baseline, each benchmark is compared with a
+previous results file, and the run fails if one got slower than --threshold.
+
+Usage:
+  python bench.py [--sizes 10000,100000] [--repeat 3] [--output bench_results.json]
+                  [--baseline old.json] [--threshold 0.25]
+                  [--models xgboost,random_forest,linear] [--tasks multiclass,classification,regression]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+
+MODEL_TYPES = ['xgboost', 'random_forest', 'linear']
+TASK_TYPES = ['multiclass', 'classification', 'regression']
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+NOISE_FLOOR_S = 0.002 # Differences below this are never reported as regressions
+
+def measure(fn, repeat=3, warmup=1):
+    """Runs fn() warmup + repeat times; returns timing stats in seconds."""
+    for _ in range(warmup): fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "repeat": repeat}
+
+def machine_info():
+    info = {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count()
+    }
+    try:
+        info["memory_gb"] = round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3, 1)
+    except (ValueError, OSError, AttributeError):
+        pass
+    for lib in ('numpy', 'pandas', 'xgboost', 'sklearn', 'pyarrow', 'flask'):
+        try:
+            info[lib] = __import__(lib).__version__
+        except ImportError:
+            info[lib] = None
+    return info
+
+class Suite:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def run(self, name, fn, rows=None, repeat=None, warmup=1):
+        stats = measure(fn, repeat or self.repeat, warmup)
+        if rows:
+            stats["rows"] = rows
+            stats["rows_per_s"] = round(rows / stats["median_s"]) if stats["median_s"] else None
+        self.results[name] = stats
+        extra = f"{stats['rows_per_s']:>14,} rows/s" if rows else ""
+        print(f"{name:<52}{stats['median_s'] * 1000:>12.2f} ms{extra}")
+        return stats
+
+# ---------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------
+def task_target(y, task_type):
+    """The generated labels are 0/1/2; derive a target for each task type."""
+    if task_type == 'classification': return (y > 0).astype(int)
+    if task_type == 'regression': return y.astype(float)
+    return y
+
+def bench_size(suite, n, models, tasks):
+    import numpy as np
+    import render_artifacts
+    from XGridBoost import XGridBoost
+    from generate_logs import generate_multiclass_data
+
+    # 1. Generation (one run: every call writes a new file)
+    result = {}
+    def generate():
+        result.update(generate_multiclass_data(total_samples=n, attack_ratios={'fdi': 0.1, 'dos': 0.1}, seed=42))
+    suite.run(f"generate/{n}", generate, rows=n, repeat=1, warmup=0)
+    filename = result["filename"]
+    path = os.path.join("datasets", filename)
+
+    # 2. Loading (the first call also builds the Parquet cache)
+    suite.run(f"load_data/{n}", lambda: XGridBoost().load_data(path, 'label'), rows=n)
+    X, y = XGridBoost().load_data(path, 'label')
+
+    # 3. Training, for every model/task combination
+    folders = {}
+    for model_type in models:
+        for task_type in tasks:
+            bot = XGridBoost(model_type=model_type, task_type=task_type)
+            target = task_target(y, task_type)
+            def train():
+                folders[(model_type, task_type)] = bot.train(X, target)
+            suite.run(f"train/{model_type}/{task_type}/{n}", train, rows=n, repeat=1, warmup=0)
+
+    # 4. Prediction at growing batch sizes (rows are tiled past the dataset size)
+    task_type = 'multiclass' if 'multiclass' in tasks else tasks[0]
+    for model_type in models:
+        bot = XGridBoost()
+        bot.load_model(_model_file(folders[(model_type, task_type)]))
+        matrix = X.to_numpy(dtype=np.float32)
+        for batch in BATCH_SIZES:
+            rows = np.resize(matrix, (batch, matrix.shape[1]))
+            frame = X.iloc[np.arange(batch) % len(X)]
+            repeat = max(3, min(200, 10_000 // batch))
+            suite.run(f"predict/{model_type}/batch={batch}", lambda: bot.predict(frame), rows=batch, repeat=repeat)
+            suite.run(f"predict_rows/{model_type}/batch={batch}", lambda: bot.predict_rows(rows), rows=batch, repeat=repeat)
+        try:
+            bot.compile(verify=True)
+        except Exception as e:
+            print(f"  ({model_type} cannot be compiled: {e})")
+            continue
+        for batch in (1, 10, 100):
+            rows = np.resize(matrix, (batch, matrix.shape[1]))
+            suite.run(f"predict_compiled/{model_type}/batch={batch}", lambda: bot.predict_rows(rows),
+                      rows=batch, repeat=200)
+
+    # 5. /api/simulate end-to-end through the Flask test client
+    model_type = 'xgboost' if 'xgboost' in models else models[0]
+    model_path = _model_file(folders[(model_type, task_type)])
+    import app as flask_app
+    client = flask_app.app.test_client()
+    body = {"model_path": model_path, "dataset": filename, "label_col": "label"}
+    def simulate(**extra):
+        response = client.post('/api/simulate', json=dict(body, **extra))
+        response.get_data() # Drain streamed responses
+        assert response.status_code == 200, response.get_json()
+    suite.run(f"simulate/json/{n}", simulate, rows=n)
+    suite.run(f"simulate/ndjson/{n}", lambda: simulate(format='ndjson'), rows=n)
+    suite.run(f"simulate/page=1000/{n}", lambda: simulate(offset=n // 2, limit=1000), rows=min(1000, n))
+
+    # 6. Artifact rendering (each image from scratch, in this process)
+    for (model_type, task_type), folder in sorted(folders.items()):
+        for image in render_artifacts.available_images(folder):
+            def render():
+                if os.path.exists(os.path.join(folder, image)): os.remove(os.path.join(folder, image))
+                render_artifacts.render(folder, image)
+            suite.run(f"render/{model_type}/{task_type}/{image}/{n}", render)
+
+def _model_file(folder):
+    return next(os.path.join(folder, f) for f in os.listdir(folder) if f.startswith("model_"))
+
+# ---------------------------------------------------------
+# BASELINE COMPARISON
+# ---------------------------------------------------------
+def compare(results, baseline, threshold):
+    """Prints current vs baseline medians. Returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<52}{'baseline ms':>13}{'now ms':>11}{'change':>9}")
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old: continue
+        before, now = old["median_s"], stats["median_s"]
+        change = (now - before) / before if before else 0.0
+        flag = ""
+        if change > threshold and now - before > NOISE_FLOOR_S:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<52}{before * 1000:>13.2f}{now * 1000:>11.2f}{change:>+9.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated dataset sizes (rows)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (median is reported)")
+    parser.add_argument("--models", default=",".join(MODEL_TYPES))
+    parser.add_argument("--tasks", default=",".join(TASK_TYPES))
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    args = parser.parse_args()
+
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s]
+    models = [m for m in args.models.split(",") if m]
+    tasks = [t for t in args.tasks.split(",") if t]
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    # The backend uses paths relative to the working directory: run in a scratch one
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    scratch = tempfile.mkdtemp(prefix="gridsafe-bench-")
+    cwd = os.getcwd()
+    os.chdir(scratch)
+
+    suite = Suite(args.repeat)
+    started = time.time()
+    try:
+        for n in sizes:
+            print(f"\n=== {n:,} rows ===")
+            bench_size(suite, n, models, tasks)
+    finally:
+        os.chdir(cwd)
+        if args.keep: print(f"\nScratch directory kept at {scratch}")
+        else: shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+        "duration_s": round(time.time() - started, 1),
+        "machine": machine_info(),
+        "config": {"sizes": sizes, "repeat": args.repeat, "models": models, "tasks": tasks},
+        "results": suite.results
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        regressions = compare(suite.results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAILED: {len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
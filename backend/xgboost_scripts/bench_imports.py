@@ -0,0 +1,80 @@
+"""
+Import-time benchmark for the ML backend.
+
+Each module is imported in a fresh interpreter (so nothing is already cached)
+and the median wall time is reported. The run fails if a module exceeds its
+budget or pulls in one of the heavy libraries at import time, which keeps
+Flask startup and job worker spawn fast.
+
+Usage: python bench_imports.py [--repeat 5] [--scale 1.0]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Heavy libraries that must only load when a code path needs them
+HEAVY_MODULES = ['xgboost', 'pandas', 'sklearn', 'joblib', 'matplotlib', 'seaborn', 'pyarrow']
+
+# Module -> import budget in milliseconds (generous, to tolerate slow machines)
+BUDGETS_MS = {
+    'dataset_cache': 150,
+    'render_artifacts': 150,
+    'generate_logs': 400,
+    'XGridBoost': 400,
+    'app': 1500
+}
+
+_PROBE = """
+import sys, time, json
+sys.path.insert(0, {here!r})
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def time_import(module, repeat=5):
+    """
+    Returns (median_ms, heavy modules loaded) for a cold import of `module`.
+    The probe runs in a scratch directory, so whatever a module creates on import
+    (app.py makes datasets/ and test_results/) never lands in the checkout.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = _PROBE.format(here=here, module=module, heavy=HEAVY_MODULES)
+    samples, loaded = [], []
+    with tempfile.TemporaryDirectory(prefix="bench_imports_") as scratch:
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", probe], cwd=scratch, capture_output=True, text=True, check=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            samples.append(result["ms"])
+            loaded = result["loaded"]
+    return statistics.median(samples), loaded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (e.g. 2 on slow CI)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<18}{'median ms':>12}{'budget ms':>12}  heavy imports")
+    for module, budget in BUDGETS_MS.items():
+        ms, loaded = time_import(module, args.repeat)
+        budget *= args.scale
+        print(f"{module:<18}{ms:>12.1f}{budget:>12.0f}  {', '.join(loaded) or '-'}")
+        if ms > budget:
+            failures.append(f"{module} took {ms:.0f} ms (budget {budget:.0f} ms)")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} at import time")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll modules within budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import base64
+import sqlite3
+import datetime
+
+CATALOG_FILE = "catalog.db"
+MAX_PAGE_SIZE = 1000 # Upper bound for an explicit `limit` (no limit returns every row)
+
+# Columns /api/models may sort on (each has an index, so keyset pages are O(log n))
+SORT_COLUMNS = ['created_at', 'accuracy', 'rmse', 'model_type', 'dataset']
+FILTER_COLUMNS = ['model_type', 'task_type', 'dataset', 'kind']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    created_at  TEXT NOT NULL,
+    kind        TEXT,
+    model_type  TEXT,
+    task_type   TEXT,
+    dataset     TEXT,
+    params      TEXT,
+    metrics     TEXT,
+    accuracy    REAL,
+    rmse        REAL,
+    run_folder  TEXT,
+    model_path  TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_accuracy ON runs (accuracy, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_rmse ON runs (rmse, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_model_type ON runs (model_type, created_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_task_type ON runs (task_type, created_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs (dataset, created_at, run_id);
+"""
+
+class RunCatalog:
+    """
+    SQLite index of training runs and their model files, kept in the results dir.
+
+    XGridBoost writes a row when a run finishes, so listing models never has to
+    walk test_results/. Every call opens its own short-lived connection, which
+    keeps the catalog safe to use from Flask threads and job worker processes.
+    """
+    def __init__(self, base_dir="test_results"):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, CATALOG_FILE)
+        os.makedirs(base_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL") # Readers don't block the writer (and vice versa)
+        return conn
+
+    # ---------------------------------------------------------
+    # WRITE
+    # ---------------------------------------------------------
+    def record_run(self, run_id, run_folder, model_type, task_type, kind='train', dataset=None,
+                   params=None, metrics=None, created_at=None):
+        """Inserts or updates a run. Fields passed as None keep their stored value."""
+        metrics = metrics or {}
+        row = {
+            "run_id": run_id,
+            "created_at": created_at or datetime.datetime.now().isoformat(timespec='seconds'),
+            "kind": kind,
+            "model_type": model_type,
+            "task_type": task_type,
+            "dataset": dataset,
+            "params": json.dumps(params) if params is not None else None,
+            "metrics": json.dumps(metrics) if metrics else None,
+            "accuracy": metrics.get("accuracy"),
+            "rmse": metrics.get("rmse"),
+            "run_folder": run_folder
+        }
+        updates = ", ".join(f"{k} = COALESCE(excluded.{k}, runs.{k})" for k in row if k not in ("run_id", "created_at"))
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))}) "
+                f"ON CONFLICT(run_id) DO UPDATE SET {updates}",
+                list(row.values())
+            )
+
+    def record_model(self, run_id, model_path, model_type=None, run_folder=None):
+        """Registers the model file of a run (creating a bare entry if the run is not recorded yet)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (run_id, created_at, model_type, run_folder, model_path) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET model_path = excluded.model_path, "
+                "model_type = COALESCE(runs.model_type, excluded.model_type), "
+                "run_folder = COALESCE(runs.run_folder, excluded.run_folder)",
+                (run_id, datetime.datetime.now().isoformat(timespec='seconds'), model_type,
+                 run_folder or os.path.dirname(model_path), model_path)
+            )
+
+    def delete(self, run_id):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,)).rowcount > 0
+
+    def prune_missing(self):
+        """Deletes runs whose model file no longer exists. Returns the removed rows."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM runs WHERE model_path IS NOT NULL").fetchall()
+        stale = [r for r in rows if not os.path.exists(r["model_path"])]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM runs WHERE run_id = ?", [(r["run_id"],) for r in stale])
+        return [_row_to_dict(r) for r in stale]
+
+    # ---------------------------------------------------------
+    # READ
+    # ---------------------------------------------------------
+    def get(self, run_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def query(self, filters=None, sort='created_at', order='desc', limit=None,
+              cursor=None, with_model=True):
+        """
+        Returns (rows, next_cursor). Without a limit every matching row is returned.
+        Pagination is keyset-based: the cursor encodes the (sort value, run_id) of the
+        last row, so every page is an index seek rather than an OFFSET scan. Runs without
+        a value for the sort column are left out.
+        With with_model=True only runs with a model file are listed, each flagged
+        `missing` if that file is gone (e.g. deleted by hand). Reads never modify the
+        catalog: prune_missing() removes such runs.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort}'. Choose from {SORT_COLUMNS}")
+        desc = str(order).lower() != 'asc'
+        if limit is not None:
+            limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        where, args = [f"{sort} IS NOT NULL"], []
+        for col, value in (filters or {}).items():
+            if col not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter by '{col}'. Choose from {FILTER_COLUMNS}")
+            if value is None: continue
+            where.append(f"{col} = ?")
+            args.append(value)
+        if with_model:
+            where.append("model_path IS NOT NULL")
+        if cursor:
+            last_value, last_id = _decode_cursor(cursor)
+            where.append(f"({sort}, run_id) {'<' if desc else '>'} (?, ?)")
+            args += [last_value, last_id]
+
+        direction = "DESC" if desc else "ASC"
+        sql = (f"SELECT * FROM runs WHERE {' AND '.join(where)} "
+               f"ORDER BY {sort} {direction}, run_id {direction}")
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit + 1)
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][sort], rows[-1]["run_id"])
+        runs = [_row_to_dict(r) for r in rows]
+        if with_model:
+            for run in runs:
+                run["missing"] = not os.path.exists(run["model_path"])
+        return runs, next_cursor
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    # ---------------------------------------------------------
+    # BACKFILL (runs created before the catalog existed)
+    # ---------------------------------------------------------
+    def backfill(self, force=False):
+        """
+        Indexes existing run folders once. Returns the number of runs added.
+        Later calls are a single meta lookup unless force=True.
+        """
+        with self._connect() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'backfilled'").fetchone()
+        if done and not force: return 0
+
+        added = 0
+        for name in sorted(os.listdir(self.base_dir)):
+            folder = os.path.join(self.base_dir, name)
+            if not name.startswith("run_") or not os.path.isdir(folder): continue
+            run_id = name[len("run_"):]
+            if self.get(run_id) and not force: continue
+
+            models = [f for f in os.listdir(folder) if f.startswith("model_") and f.endswith((".json", ".pkl"))]
+            if not models: continue
+            model_path = os.path.join(folder, models[0])
+            info = _parse_report(os.path.join(folder, "evaluation_report.txt"))
+            self.record_run(
+                run_id, folder,
+                model_type=info.get("model_type") or ("xgboost" if model_path.endswith(".json") else None),
+                task_type=info.get("task_type"),
+                kind="backfill",
+                metrics=info.get("metrics"),
+                created_at=datetime.datetime.fromtimestamp(os.path.getmtime(model_path)).isoformat(timespec='seconds')
+            )
+            self.record_model(run_id, model_path)
+            added += 1
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled', ?)",
+                         (datetime.datetime.now().isoformat(timespec='seconds'),))
+        return added
+
+# --- Helpers ---
+def _row_to_dict(row):
+    d = dict(row)
+    for key in ("params", "metrics"):
+        d[key] = json.loads(d[key]) if d[key] else None
+    return d
+
+def _encode_cursor(value, run_id):
+    return base64.urlsafe_b64encode(json.dumps([value, run_id]).encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        value, run_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, run_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _parse_report(path):
+    """Pulls model/task/metrics out of an evaluation_report.txt written by XGridBoost."""
+    if not os.path.exists(path): return {}
+    with open(path) as f:
+        text = f.read()
+    info, metrics = {}, {}
+    m = re.search(r"^Model: (\S+)", text, re.M)
+    if m: info["model_type"] = m.group(1)
+    m = re.search(r"^Task: (\S+)", text, re.M)
+    if m: info["task_type"] = m.group(1)
+    m = re.search(r"^Accuracy: ([\d.]+)", text, re.M)
+    if m: metrics["accuracy"] = float(m.group(1))
+    m = re.search(r"^RMSE: ([\d.]+)", text, re.M)
+    if m: metrics["rmse"] = float(m.group(1))
+    info["metrics"] = metrics
+    return info
@@ -0,0 +1,250 @@
+import json
+import numpy as np
+
+# Objectives the flat kernel can reproduce, by how the summed margin becomes a prediction
+_FLOAT32_MAX = np.finfo(np.float32).max
+
+_IDENTITY = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror')
+_SIGMOID = ('binary:logistic', 'reg:logistic')
+_SOFTMAX = ('multi:softmax', 'multi:softprob')
+
+class UnsupportedModelError(Exception):
+    pass
+
+class FlatEnsemble:
+    """
+    A tree ensemble flattened into NumPy arrays, for scoring small batches without
+    the booster/sklearn call overhead.
+
+    All trees share one node table (feature, threshold, child, default_left, value),
+    laid out level by level so the right child always follows the left one. Leaves
+    point to themselves, so evaluation is `depth` rounds of gathers over an
+    (n_rows, n_trees) index matrix, with no per-tree Python loop. Splits are
+    normalized to `x < threshold` on float32 inputs (XGBoost's rule; sklearn's
+    `x <= t` is converted exactly), and NaN follows default_left.
+    """
+    def __init__(self, feature, threshold, child, default_left, value, roots, depth,
+                 tree_group, n_groups, output, base_margin=None, classes=None, n_features=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child           # Left child id (right = child + 1); leaves hold their own id
+        self.default_left = default_left
+        self.value = value           # (n_nodes, n_outputs) leaf values
+        self.roots = roots
+        self.depth = depth
+        self.tree_group = tree_group # Output group each tree adds to (XGBoost multiclass)
+        self.n_groups = n_groups
+        self.output = output         # 'identity' | 'sigmoid' | 'softmax' | 'softprob' | 'rf_classifier' | 'rf_regressor'
+        self.base_margin = base_margin
+        self.classes = classes
+        # The model's input width: trailing columns may never be split on, so the
+        # highest split index is only a fallback when the model does not record it
+        if n_features is None:
+            n_features = int(feature.max()) + 1 if len(feature) else 0
+        self.n_features = int(n_features)
+        # (trees, groups) 0/1 matrix: summing leaf values per group becomes one matmul
+        self._group_matrix = (tree_group[:, None] == np.arange(n_groups)[None, :]).astype(np.float64)
+
+    # ---------------------------------------------------------
+    # EXPORT
+    # ---------------------------------------------------------
+    @classmethod
+    def from_model(cls, model, model_type):
+        if model_type == 'xgboost': return cls.from_xgboost(model)
+        if model_type == 'random_forest': return cls.from_random_forest(model)
+        raise UnsupportedModelError(f"Cannot compile '{model_type}' models")
+
+    @classmethod
+    def from_xgboost(cls, booster):
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+        objective = learner['objective']['name']
+        booster_cfg = learner['gradient_booster']
+        if booster_cfg['name'] != 'gbtree':
+            raise UnsupportedModelError(f"Only gbtree boosters can be compiled (got {booster_cfg['name']})")
+        if objective not in _IDENTITY + _SIGMOID + _SOFTMAX:
+            raise UnsupportedModelError(f"Objective '{objective}' is not supported")
+
+        model = booster_cfg['model']
+        tables = []
+        for tree in model['trees']:
+            if tree.get('categories_nodes') or int(tree['tree_param'].get('size_leaf_vector', 1)) > 1:
+                raise UnsupportedModelError("Categorical splits and vector leaves are not supported")
+            left = np.asarray(tree['left_children'], dtype=np.int64)
+            cond = np.asarray(tree['split_conditions'], dtype=np.float32)
+            tables.append({
+                "feature": np.asarray(tree['split_indices'], dtype=np.int64),
+                "threshold": cond,
+                "left": left,
+                "right": np.asarray(tree['right_children'], dtype=np.int64),
+                "default_left": np.asarray(tree['default_left'], dtype=bool),
+                "value": np.where(left == -1, cond, 0).astype(np.float64)[:, None] # Leaves keep their weight in split_conditions
+            })
+
+        n_groups = max(int(learner['learner_model_param'].get('num_class', 0)), 1)
+        base = _parse_base_score(learner['learner_model_param']['base_score'], n_groups)
+        if objective in _SIGMOID:
+            base = np.log(base / (1 - base)) # base_score is stored as a probability
+        output = {'multi:softmax': 'softmax', 'multi:softprob': 'softprob'}.get(
+            objective, 'sigmoid' if objective in _SIGMOID else 'identity')
+
+        return cls(*_merge(tables), tree_group=np.asarray(model['tree_info'], dtype=np.int64),
+                   n_groups=n_groups, output=output, base_margin=base, n_features=booster.num_features())
+
+    @classmethod
+    def from_random_forest(cls, forest):
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise UnsupportedModelError("Multi-output forests are not supported")
+        is_classifier = hasattr(forest, 'classes_')
+
+        tables = []
+        for est in forest.estimators_:
+            t = est.tree_
+            left = t.children_left.astype(np.int64)
+            value = t.value[:, 0, :].astype(np.float64)
+            if is_classifier: # Per-tree predict_proba is the normalized leaf distribution
+                value = value / np.maximum(value.sum(axis=1, keepdims=True), 1e-300)
+            missing_left = getattr(t, 'missing_go_to_left', None)
+            tables.append({
+                "feature": np.maximum(t.feature, 0).astype(np.int64),
+                "threshold": _le_to_lt(t.threshold),
+                "left": left,
+                "right": t.children_right.astype(np.int64),
+                "default_left": (np.asarray(missing_left, dtype=bool) if missing_left is not None
+                                 else np.zeros(len(left), dtype=bool)),
+                "value": value
+            })
+
+        output = 'rf_classifier' if is_classifier else 'rf_regressor'
+        return cls(*_merge(tables), tree_group=np.zeros(len(tables), dtype=np.int64), n_groups=1,
+                   output=output, classes=forest.classes_ if is_classifier else None,
+                   n_features=getattr(forest, 'n_features_in_', None))
+
+    # ---------------------------------------------------------
+    # INFERENCE
+    # ---------------------------------------------------------
+    def leaves(self, X):
+        """(n_rows, n_trees) leaf node ids."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] < self.n_features:
+            raise ValueError(f"Expected rows with {self.n_features} features, got shape {X.shape}")
+        X = np.minimum(X, _FLOAT32_MAX) # +inf must not compare past a leaf's +inf threshold
+        flat = X.ravel()
+        row_start = (np.arange(len(X)) * X.shape[1])[:, None]
+        is_nan = np.isnan(flat) if np.isnan(flat).any() else None
+
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            cell = row_start + self.feature[node]
+            go_right = ~(flat[cell] < self.threshold[node])
+            if is_nan is not None:
+                go_right &= ~(is_nan[cell] & self.default_left[node])
+            node = self.child[node] + go_right # Right child is stored right after the left one
+        return node
+
+    def predict_raw(self, X):
+        """XGBoost: (n, groups) margins. Random forest: (n, outputs) averaged leaf values."""
+        leaves = self.leaves(X)
+        if self.output.startswith('rf_'):
+            return self.value[leaves].mean(axis=1) # (n, trees, outputs) -> (n, outputs)
+        return self.value[leaves, 0] @ self._group_matrix + self.base_margin
+
+    def predict(self, X):
+        """Same output as the native predictor (XGBoost inplace_predict / sklearn predict)."""
+        raw = self.predict_raw(X)
+        if self.output == 'identity': return raw[:, 0]
+        if self.output == 'sigmoid': return 1.0 / (1.0 + np.exp(-raw[:, 0]))
+        if self.output == 'softmax': return raw.argmax(axis=1).astype(np.float32)
+        if self.output == 'softprob':
+            e = np.exp(raw - raw.max(axis=1, keepdims=True))
+            return e / e.sum(axis=1, keepdims=True)
+        if self.output == 'rf_classifier': return self.classes[raw.argmax(axis=1)]
+        return raw[:, 0]
+
+    # ---------------------------------------------------------
+    # VERIFICATION
+    # ---------------------------------------------------------
+    def verify(self, native_predict, n_rows=512, with_nan=True, rtol=1e-4, atol=1e-5, seed=0):
+        """
+        Compares predict() with `native_predict` on synthetic rows that sit on, just
+        below and around the split thresholds (plus NaNs, if the native model takes them).
+        Returns a report dict; report["ok"] is False on any mismatch.
+        """
+        X = self._probe_rows(n_rows, with_nan, np.random.default_rng(seed))
+        ours = np.asarray(self.predict(X))
+        theirs = np.asarray(native_predict(X))
+        if ours.dtype.kind in 'fc' and theirs.dtype.kind in 'fc':
+            bad = ~np.isclose(ours, theirs.reshape(ours.shape), rtol=rtol, atol=atol)
+            max_diff = float(np.max(np.abs(ours - theirs.reshape(ours.shape)))) if ours.size else 0.0
+        else:
+            bad = ours != theirs.reshape(ours.shape)
+            max_diff = None
+        bad = bad.reshape(len(X), -1).any(axis=1)
+        return {"ok": not bad.any(), "rows": len(X), "mismatches": int(bad.sum()), "max_abs_diff": max_diff}
+
+    def _probe_rows(self, n_rows, with_nan, rng):
+        internal = self.child != np.arange(len(self.child))
+        X = rng.normal(size=(n_rows, self.n_features)).astype(np.float32)
+        for f in range(self.n_features):
+            thresholds = self.threshold[internal & (self.feature == f)]
+            if not len(thresholds): continue
+            picks = rng.choice(thresholds, n_rows)
+            mode = rng.integers(0, 4, n_rows) # 0: on a threshold, 1: one ulp below, 2-3: nearby
+            nearby = picks + rng.normal(scale=max(float(np.ptp(thresholds)), 1e-3), size=n_rows)
+            X[:, f] = np.select([mode == 0, mode == 1],
+                                [picks, np.nextafter(picks, np.float32(-np.inf))], nearby)
+        if with_nan:
+            X[rng.random(X.shape) < 0.05] = np.nan
+        return X
+
+# --- Helpers ---
+def _merge(tables):
+    """Concatenates per-tree node tables (re-laid out by _level_order) into one."""
+    parts = {k: [] for k in ("feature", "threshold", "child", "default_left", "value")}
+    roots, offset, depth = [], 0, 0
+    for t in tables:
+        order, child, tree_depth = _level_order(t["left"], t["right"])
+        leaf = child == np.arange(len(order))
+        parts["feature"].append(np.where(leaf, 0, t["feature"][order]))
+        # A leaf always "goes left" to itself: x < +inf, and NaN takes the default (left) branch
+        parts["threshold"].append(np.where(leaf, np.inf, t["threshold"][order]))
+        parts["default_left"].append(leaf | t["default_left"][order])
+        parts["child"].append(child + offset)
+        parts["value"].append(t["value"][order])
+        roots.append(offset)
+        offset += len(order)
+        depth = max(depth, tree_depth)
+    merged = {k: np.concatenate(v) for k, v in parts.items()}
+    return (merged["feature"].astype(np.int32), merged["threshold"].astype(np.float32),
+            merged["child"].astype(np.int32), merged["default_left"], merged["value"],
+            np.asarray(roots, dtype=np.int32), depth)
+
+def _level_order(left, right):
+    """
+    Breadth-first node order in which siblings are adjacent. Returns (old ids in new
+    order, new left-child ids with leaves pointing to themselves, depth).
+    Nodes unreachable from the root (e.g. pruned ones) are dropped.
+    """
+    levels, level = [np.array([0])], np.array([0])
+    while True:
+        level = level[left[level] != -1]
+        if not len(level): break
+        level = np.column_stack([left[level], right[level]]).ravel()
+        levels.append(level)
+    order = np.concatenate(levels)
+    new_id = np.empty(len(left), dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+    is_leaf = left[order] == -1
+    child = np.where(is_leaf, np.arange(len(order)), new_id[np.where(is_leaf, 0, left[order])])
+    return order, child, len(levels) - 1
+
+def _le_to_lt(threshold):
+    """sklearn sends float32(x) <= t (float64) left; returns t32 so that x < t32 is the same test."""
+    t = np.asarray(threshold, dtype=np.float64)
+    t32 = t.astype(np.float32)
+    t32 = np.where(t32.astype(np.float64) > t, np.nextafter(t32, np.float32(-np.inf)), t32) # Largest float32 <= t
+    return np.nextafter(t32, np.float32(np.inf))
+
+def _parse_base_score(value, n_groups):
+    # Stored as a string: "5E-1" in older models, "[5E-1]" / "[a,b,c]" in newer ones
+    values = [float(v) for v in str(value).strip('[]').split(',') if v.strip()]
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (n_groups,)).copy()
@@ -0,0 +1,74 @@
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold, KFold, TimeSeriesSplit
+
+from param_search import fit_and_score, thread_split
+
+def make_folds(y, n_splits=5, strategy='stratified', task_type='multiclass', seed=42):
+    """
+    Returns a list of (train_idx, val_idx) index arrays.
+    'timeseries' assumes rows are in chronological order (as written by generate_logs)
+    and always validates on rows that come after the training rows.
+    """
+    if strategy == 'timeseries':
+        splitter = TimeSeriesSplit(n_splits=n_splits)
+    elif strategy == 'stratified' and task_type != 'regression':
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    elif strategy in ('stratified', 'kfold'):
+        # Stratifying a continuous target makes no sense; fall back to plain shuffled k-fold
+        splitter = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    else:
+        raise ValueError(f"Unknown CV strategy '{strategy}'")
+
+    return list(splitter.split(np.zeros(len(y)), y))
+
+def _run_fold(fold, model_type, task_type, params, X, y, train_idx, val_idx, nthread):
+    # X and y arrive memory-mapped and read-only; fancy indexing copies only this fold's rows
+    start = time.time()
+    score, metrics, curve, best_iteration = fit_and_score(
+        model_type, task_type, params, X[train_idx], y[train_idx], X[val_idx], y[val_idx], nthread
+    )
+    return {
+        "fold": fold,
+        "train_rows": int(len(train_idx)),
+        "val_rows": int(len(val_idx)),
+        "metrics": metrics,
+        "best_iteration": best_iteration,
+        "rounds_trained": len(curve) if curve else None,
+        "seconds": round(time.time() - start, 3)
+    }
+
+def run_cv(model_type, task_type, params, X, y, n_splits=5, strategy='stratified',
+           total_threads=None, n_jobs=None):
+    """
+    Trains one model per fold in parallel worker processes and returns
+    {"folds": [...], "aggregate": {metric: {"mean", "std"}}}.
+
+    The full X / y are shared with every worker through a read-only memory map
+    instead of being pickled per fold. Folds split `total_threads` between them,
+    so a CV job inside the job queue stays within its own thread budget.
+    """
+    total_threads = total_threads or os.cpu_count() or 1
+    folds = make_folds(y, n_splits, strategy, task_type)
+    parallel, per_fold = thread_split(len(folds), total_threads, n_jobs)
+
+    results = Parallel(n_jobs=parallel, max_nbytes='1M', mmap_mode='r')(
+        delayed(_run_fold)(i, model_type, task_type, params, X, y, train_idx, val_idx, per_fold)
+        for i, (train_idx, val_idx) in enumerate(folds)
+    )
+
+    aggregate = {}
+    for name in results[0]["metrics"]:
+        values = np.array([r["metrics"][name] for r in results])
+        aggregate[name] = {"mean": float(values.mean()), "std": float(values.std())}
+
+    return {
+        "strategy": strategy,
+        "n_splits": n_splits,
+        "parallel_folds": parallel,
+        "threads_per_fold": per_fold,
+        "folds": results,
+        "aggregate": aggregate
+    }
@@ -0,0 +1,213 @@
+import os
+import re
+import glob
+import threading
+import importlib.util
+
+# pyarrow is optional: without it every read falls back to parsing the CSV.
+# pyarrow and pandas are imported on first use, so importing this module stays cheap.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+CACHE_DIRNAME = ".cache"
+# Small row groups let windowed reads (read_rows) touch only a slice of the file
+ROW_GROUP_SIZE = 65_536
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+# ---------------------------------------------------------
+# CACHE PATHS
+# ---------------------------------------------------------
+def cache_path(csv_path):
+    """
+    Returns the Parquet path for a CSV. The file size and mtime are part of the
+    name, so editing or regenerating the CSV automatically misses the old cache.
+    """
+    stat = os.stat(csv_path)
+    folder = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIRNAME)
+    name = os.path.basename(csv_path)
+    return os.path.join(folder, f"{name}.{stat.st_size}_{stat.st_mtime_ns}.parquet")
+
+def _stale_caches(csv_path, current):
+    folder = os.path.dirname(current)
+    pattern = os.path.join(folder, glob.escape(os.path.basename(csv_path)) + ".*.parquet")
+    return [p for p in glob.glob(pattern) if p != current]
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+# ---------------------------------------------------------
+# BUILD
+# ---------------------------------------------------------
+def ensure_cache(csv_path):
+    """
+    Converts the CSV to Parquet on first use and returns the cache path.
+    Returns None if pyarrow is not installed.
+    Parquet datasets (e.g. from generate_logs with fmt='parquet') are their own cache.
+    """
+    if csv_path.endswith('.parquet'): return csv_path
+    if not HAS_PYARROW: return None
+
+    target = cache_path(csv_path)
+    if os.path.exists(target): return target
+
+    with _lock_for(target):
+        if os.path.exists(target): return target
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        import pyarrow as pa
+
+        # Write to a temp file and rename so readers never see a partial cache
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        column_types = {}
+        while True:
+            try:
+                _convert_streaming(csv_path, tmp, column_types)
+                break
+            except pa.ArrowInvalid as e:
+                # Type inference on the first block was wrong (e.g. int column gains floats later):
+                # stream it again with that column read as float64
+                try:
+                    column_types = _widen_types(csv_path, column_types, e)
+                except pa.ArrowInvalid:
+                    try: os.remove(tmp)
+                    except OSError: pass
+                    raise
+        os.replace(tmp, target)
+
+        for old in _stale_caches(csv_path, target):
+            try: os.remove(old)
+            except OSError: pass
+    return target
+
+def _convert_streaming(csv_path, out_path, column_types=None):
+    """CSV -> Parquet one block at a time (bounded memory for files larger than RAM)."""
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    convert = pa_csv.ConvertOptions(column_types=column_types) if column_types else None
+    reader = pa_csv.open_csv(csv_path, convert_options=convert)
+    with pq.ParquetWriter(out_path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
+
+def _widen_types(csv_path, column_types, error):
+    """
+    column_types plus float64 for the integer column a conversion error names (every
+    integer column if it names none). Re-raises the error when nothing is left to widen.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    schema = pa_csv.open_csv(csv_path).schema # Infers from the first block only
+    match = re.search(r"CSV column #(\d+)", str(error))
+    fields = [schema.field(int(match.group(1)))] if match else list(schema)
+    widen = {f.name: pa.float64() for f in fields
+             if pa.types.is_integer(f.type) and f.name not in column_types}
+    if not widen: raise error
+    return {**column_types, **widen}
+
+def adopt_cache(csv_path, parquet_path):
+    """
+    Moves a Parquet file written alongside a CSV (e.g. by the chunked log generator)
+    into the cache slot for that CSV, so the first training/simulate run skips the
+    conversion step. Call it after the CSV is complete: its size and mtime key the cache.
+    """
+    target = cache_path(csv_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(parquet_path, target)
+    return target
+
+# ---------------------------------------------------------
+# READ
+# ---------------------------------------------------------
+def read_columns(csv_path):
+    """Column names, read from the Parquet footer (or the CSV header as a fallback)."""
+    parquet = ensure_cache(csv_path)
+    if parquet:
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(parquet).names)
+    import pandas as pd
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+def read_dataset(csv_path, columns=None):
+    """
+    Loads a dataset as a DataFrame, reading only the requested columns.
+    Parquet files are memory-mapped, so repeated loads avoid re-parsing text.
+    """
+    parquet = ensure_cache(csv_path)
+    if parquet:
+        import pyarrow.parquet as pq
+        table = pq.read_table(parquet, columns=columns, memory_map=True)
+        return table.to_pandas()
+    import pandas as pd
+    return pd.read_csv(csv_path, usecols=columns)
+
+def read_matrix(csv_path, columns, dtype='float32'):
+    """
+    Reads columns straight into one C-contiguous (rows, len(columns)) array of dtype.
+    With Parquet the file is decoded one column at a time, so besides the result only
+    a single column is ever held in memory (no DataFrame is built).
+    """
+    import numpy as np
+    parquet = ensure_cache(csv_path)
+    if parquet:
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(parquet, memory_map=True)
+        matrix = np.empty((pf.metadata.num_rows, len(columns)), dtype=dtype)
+        for j, col in enumerate(columns):
+            matrix[:, j] = pf.read(columns=[col]).column(0).to_numpy()
+        return matrix
+    import pandas as pd
+    frame = pd.read_csv(csv_path, usecols=columns, dtype=dtype)
+    return np.ascontiguousarray(frame[columns].to_numpy())
+
+def count_rows(csv_path):
+    """Total number of rows (free with Parquet: it's in the footer metadata)."""
+    parquet = ensure_cache(csv_path)
+    if parquet:
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(parquet).metadata.num_rows
+    with open(csv_path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+def read_rows(csv_path, offset, limit, columns=None):
+    """
+    Returns rows [offset, offset + limit) without loading the rest of the file.
+    With Parquet only the row groups overlapping the window are decoded.
+    """
+    parquet = ensure_cache(csv_path)
+    if not parquet:
+        import pandas as pd
+        return pd.read_csv(csv_path, usecols=columns, skiprows=range(1, offset + 1), nrows=limit)
+
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(parquet, memory_map=True)
+    groups, first_row, start = [], None, 0
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if start + n > offset and start < offset + limit:
+            groups.append(i)
+            if first_row is None: first_row = start
+        start += n
+
+    if not groups:
+        return pf.schema_arrow.empty_table().select(columns or pf.schema_arrow.names).to_pandas()
+
+    table = pf.read_row_groups(groups, columns=columns)
+    return table.slice(offset - first_row, limit).to_pandas()
+
+def iter_chunks(csv_path, columns, chunksize=100_000, dtypes=None):
+    """Yields DataFrames of at most `chunksize` rows with only the requested columns."""
+    parquet = ensure_cache(csv_path)
+    if parquet:
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(parquet, memory_map=True)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            yield chunk.astype(dtypes) if dtypes else chunk
+        return
+
+    import pandas as pd
+    with pd.read_csv(csv_path, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
@@ -0,0 +1,84 @@
+import numpy as np
+import xgboost as xgb
+import dataset_cache
+
+BATCH_ROWS = 100_000 # Rows gathered per ArrayBatchIter batch
+
+class DatasetChunkIter(xgb.DataIter):
+    """
+    Streams a dataset into XGBoost chunk by chunk so it never has to fit in memory.
+    Chunks come from the Parquet cache when available, else straight from the CSV.
+
+    Each chunk is split into train/test with a mask seeded by (seed, chunk_index),
+    so the train and test iterators see complementary rows on every pass.
+    """
+    def __init__(self, filepath, label_col, feature_cols, dtypes, subset, test_size=0.2,
+                 chunksize=100_000, seed=42, cache_prefix=None):
+        self.filepath = filepath
+        self.label_col = label_col
+        self.feature_cols = feature_cols
+        self.dtypes = dtypes
+        self.subset = subset # 'train' or 'test'
+        self.test_size = test_size
+        self.chunksize = chunksize
+        self.seed = seed
+        self._reader = None
+        self._chunk_idx = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _open(self):
+        return dataset_cache.iter_chunks(
+            self.filepath,
+            self.feature_cols + [self.label_col],
+            chunksize=self.chunksize,
+            dtypes=self.dtypes
+        )
+
+    def next(self, input_data):
+        if self._reader is None:
+            self._reader = self._open()
+        try:
+            chunk = next(self._reader)
+        except StopIteration:
+            return False
+
+        rng = np.random.default_rng([self.seed, self._chunk_idx])
+        self._chunk_idx += 1
+        is_test = rng.random(len(chunk)) < self.test_size
+        mask = is_test if self.subset == 'test' else ~is_test
+
+        X = chunk[self.feature_cols].to_numpy()[mask]
+        y = chunk[self.label_col].to_numpy()[mask]
+        input_data(data=X, label=y, feature_names=self.feature_cols)
+        return True
+
+    def reset(self):
+        if self._reader is not None:
+            self._reader.close() # Generator close releases the underlying file
+        self._reader = None
+        self._chunk_idx = 0
+
+class ArrayBatchIter(xgb.DataIter):
+    """
+    Feeds the rows `index` of an in-memory matrix to XGBoost in batches of
+    BATCH_ROWS, so a train/test split never gathers a full copy of its rows.
+    """
+    def __init__(self, matrix, labels, index, feature_names, batch_rows=BATCH_ROWS):
+        self.matrix = matrix
+        self.labels = labels
+        self.index = index
+        self.feature_names = feature_names
+        self.batch_rows = batch_rows
+        self._pos = 0
+        super().__init__()
+
+    def next(self, input_data):
+        if self._pos >= len(self.index):
+            return False
+        rows = self.index[self._pos:self._pos + self.batch_rows]
+        self._pos += len(rows)
+        input_data(data=self.matrix[rows], label=self.labels[rows], feature_names=self.feature_names)
+        return True
+
+    def reset(self):
+        self._pos = 0
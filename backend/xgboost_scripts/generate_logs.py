@@ -1,23 +1,49 @@
-import pandas as pd
 import numpy as np
 import os
 import datetime
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import dataset_cache
 
 OUTPUT_FOLDER = "datasets"
+DEFAULT_CHUNK_SIZE = 1_000_000 # Rows generated (and held in memory) per chunk
+MIN_CHUNK_SIZE = 100
+COLUMNS = ['timestamp', 'voltage', 'current', 'temperature', 'label']
 
-def generate_multiclass_data(total_samples=3000, attack_ratios=None):
+# Per-class feature distributions: label -> (mean, std) for voltage, current, temperature
+CLASS_PROFILES = {
+    0: ((120, 2), (15, 2), (40, 5)),   # Normal
+    1: ((150, 10), (15, 2), (40, 5)),  # FDI Attack
+    2: ((100, 5), (40, 5), (85, 5))    # DoS Attack
+}
+ATTACK_LABELS = {'fdi': 1, 'dos': 2}
+
+# Scenario engine defaults (see generate_scenario_data)
+SCENARIO_COLUMNS = ['timestamp', 'substation_id', 'voltage', 'current', 'temperature', 'label']
+DEFAULT_EPISODE_RATES = {'fdi': 0.5, 'dos': 0.2}              # Episodes per substation per 1000 timesteps
+DEFAULT_EPISODE_DURATIONS = {'fdi': (10, 60), 'dos': (5, 30)} # Min/max timesteps per episode
+
+def generate_multiclass_data(total_samples=3000, attack_ratios=None, chunk_size=None, n_jobs=1,
+                             fmt='csv', seed=42):
     """
     :param total_samples: Total rows to generate (master limit)
     :param attack_ratios: Dict of ratios per attack type.
+    :param chunk_size: Rows per chunk (default 1M). Peak memory is bounded by
+                       ~2 * n_jobs chunks, whatever total_samples is.
+    :param n_jobs: Worker processes generating chunks in parallel.
+    :param fmt: 'csv' (CSV plus its Parquet cache) or 'parquet' (Parquet only).
+    :param seed: Chunk i draws from SeedSequence(seed).spawn(n_chunks)[i], so the output
+                 is reproducible for a given (seed, chunk_size) and independent of n_jobs.
+                 The global NumPy RNG is never touched, so concurrent calls are safe.
     """
     if attack_ratios is None: attack_ratios = {'fdi': 0.0, 'dos': 0.0}
-    
-    np.random.seed(42)
-    
+    _check_format(fmt)
+
     # 1. Calculate specific counts based on Total Samples
     counts = {}
     total_malicious = 0
-    
+
     for attack, ratio in attack_ratios.items():
         count = int(total_samples * ratio)
         counts[attack] = count
@@ -29,83 +55,345 @@ def generate_multiclass_data(total_samples=3000, attack_ratios=None):
         print("Warning: Attack percentages exceed 100%. Adjusting.")
         n_normal = 0
 
-    print(f"--- Generating: {n_normal} Normal | Attacks: {counts} ---")
+    class_counts = {0: n_normal}
+    for attack, count in counts.items():
+        if attack in ATTACK_LABELS and count > 0:
+            class_counts[ATTACK_LABELS[attack]] = count
+    total_rows = sum(class_counts.values())
 
-    dfs = []
-
-    # 2. GENERATE NORMAL
-    if n_normal > 0:
-        df_normal = pd.DataFrame({
-            'voltage': np.random.normal(120, 2, n_normal),
-            'current': np.random.normal(15, 2, n_normal),
-            'temperature': np.random.normal(40, 5, n_normal),
-            'label': 0 
-        })
-        dfs.append(df_normal)
-
-    # 3. GENERATE ATTACKS
-    # FDI Attack (Label 1)
-    if counts.get('fdi', 0) > 0:
-        n = counts['fdi']
-        df_fdi = pd.DataFrame({
-            'voltage': np.random.normal(150, 10, n), 
-            'current': np.random.normal(15, 2, n),   
-            'temperature': np.random.normal(40, 5, n),
-            'label': 1 
-        })
-        dfs.append(df_fdi)
-
-    # DoS Attack (Label 2)
-    if counts.get('dos', 0) > 0:
-        n = counts['dos']
-        df_dos = pd.DataFrame({
-            'voltage': np.random.normal(100, 5, n),  
-            'current': np.random.normal(40, 5, n),   
-            'temperature': np.random.normal(85, 5, n), 
-            'label': 2 
-        })
-        dfs.append(df_dos)
-
-    # 4. COMBINE & SIMULATE TIME
-    if not dfs:
+    if total_rows == 0:
         return {"error": "No data generated"}
 
-    df_final = pd.concat(dfs)
-    
-    # Randomize the rows so attacks are mixed in with normal traffic
-    df_final = df_final.sample(frac=1).reset_index(drop=True)
+    print(f"--- Generating: {n_normal} Normal | Attacks: {counts} ---")
 
-    # --- TIMESTAMP LOGIC ---
-    # Start 'now' and increment by 1 second for every subsequent row
-    start_time = datetime.datetime.now()
-    time_deltas = pd.to_timedelta(np.arange(len(df_final)), unit='s')
-    
-    # Assign the timestamp column
-    df_final['timestamp'] = start_time + time_deltas
+    # 2. PLAN CHUNKS
+    chunk_size = max(int(chunk_size or DEFAULT_CHUNK_SIZE), MIN_CHUNK_SIZE)
+    n_jobs = max(1, int(n_jobs or 1))
+    bounds = [(start, min(start + chunk_size, total_rows)) for start in range(0, total_rows, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
 
-    # Reorder columns: timestamp first, then features, then label
-    cols = ['timestamp', 'voltage', 'current', 'temperature', 'label']
-    df_final = df_final[cols]
+    # Timestamps: start 'now' and increment by 1 second for every subsequent row
+    start_time = np.datetime64(datetime.datetime.now(), 'us')
+
+    tasks = [
+        (start, _chunk_class_counts(class_counts, total_rows, start, end), seeds[i], start_time, fmt == 'csv')
+        for i, (start, end) in enumerate(bounds)
+    ]
+
+    # 3. GENERATE & SAVE (chunks are written in order as they complete)
+    file_path, _ = _write_dataset(_generate_chunk, tasks, n_jobs, fmt, "grid_data", COLUMNS)
 
-    # 5. SAVE
-    if not os.path.exists(OUTPUT_FOLDER): os.makedirs(OUTPUT_FOLDER)
-    
-    # Use simple timestamp for filename
-    file_ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"grid_data_{file_ts}.csv"
-    file_path = os.path.join(OUTPUT_FOLDER, filename)
-    
-    df_final.to_csv(file_path, index=False)
-    
     return {
-        "filename": filename,
-        "total_samples": len(df_final),
+        "filename": os.path.basename(file_path),
+        "total_samples": total_rows,
         "breakdown": {
             "normal": n_normal,
             **counts
-        }
+        },
+        "chunks": len(bounds),
+        "format": fmt,
+        "seed": seed
+    }
+
+# ---------------------------------------------------------
+# CHUNK GENERATION (runs inside worker processes)
+# ---------------------------------------------------------
+def _chunk_class_counts(class_counts, total_rows, start, end):
+    """
+    Rows of each class in [start, end). Every class gets its proportional share of
+    each chunk (floor differences telescope to the exact totals); the largest class
+    takes the rounding remainder, so chunk counts always add up to the chunk length.
+    """
+    largest = max(class_counts, key=class_counts.get)
+    out = {}
+    for label, n in class_counts.items():
+        if label == largest: continue
+        out[label] = (n * end) // total_rows - (n * start) // total_rows
+    out[largest] = (end - start) - sum(out.values())
+    return out
+
+def _generate_chunk(start, chunk_counts, seed_seq, start_time, as_csv):
+    """Builds one shuffled chunk as column arrays (plus its CSV rows when writing CSV)."""
+    rng = np.random.default_rng(seed_seq)
+
+    # Randomize the rows so attacks are mixed in with normal traffic
+    labels = np.repeat(list(chunk_counts.keys()), list(chunk_counts.values())).astype(np.int64)
+    labels = rng.permutation(labels)
+    n = len(labels)
+
+    chunk = {'timestamp': start_time + np.arange(start, start + n).astype('timedelta64[s]')}
+    for i, col in enumerate(['voltage', 'current', 'temperature']):
+        mean = np.array([CLASS_PROFILES[l][i][0] for l in range(len(CLASS_PROFILES))], dtype=float)
+        std = np.array([CLASS_PROFILES[l][i][1] for l in range(len(CLASS_PROFILES))], dtype=float)
+        chunk[col] = mean[labels] + std[labels] * rng.standard_normal(n)
+    chunk['label'] = labels
+
+    csv_bytes = None
+    if as_csv:
+        csv_bytes = _format_csv(chunk, COLUMNS)
+    return chunk, csv_bytes
+
+def _format_csv(chunk, columns):
+    """CSV rows (no header) for one chunk. Formatting dominates generation time, so it runs in the worker."""
+    if dataset_cache.HAS_PYARROW:
+        # Arrow's writer is several times faster than DataFrame.to_csv and prints the same values
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        out = pa.BufferOutputStream()
+        pa_csv.write_csv(pa.table({col: chunk[col] for col in columns}), out,
+                         pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+        return out.getvalue().to_pybytes()
+
+    import pandas as pd
+    return pd.DataFrame(chunk, columns=columns).to_csv(index=False, header=False).encode()
+
+def _run_chunks(worker, tasks, n_jobs):
+    """Yields worker(*task) results in order, keeping at most 2 * n_jobs chunks in flight."""
+    if n_jobs == 1:
+        for task in tasks:
+            yield worker(*task)
+        return
+
+    # 'spawn' keeps the workers independent of the caller's threads (e.g. Flask)
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=ctx) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(worker, *task))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# ---------------------------------------------------------
+# SCENARIO ENGINE (multi-substation time series)
+# ---------------------------------------------------------
+def generate_scenario_data(n_substations=100, n_timesteps=1440, interval_seconds=60,
+                           episode_rates=None, episode_durations=None,
+                           chunk_size=None, n_jobs=1, fmt='csv', seed=42):
+    """
+    Simulates a grid of substations over time instead of i.i.d. rows.
+
+    Each substation is a time series with its own nominal voltage and base load, a
+    daily load cycle and sensor noise. FDI and DoS attacks are injected as contiguous
+    episodes: per substation and attack type the number of episodes is Poisson with
+    `episode_rates[attack]` episodes per 1000 timesteps, each lasting a uniform number
+    of timesteps in `episode_durations[attack]`. Where episodes overlap, DoS wins.
+
+    Rows are written in time order (all substations for t0, then t1, ...) in blocks of
+    ~chunk_size rows, built as (timesteps x substations) arrays, so memory stays bounded
+    by the block size. Output is reproducible for a given (seed, chunk_size).
+
+    :param interval_seconds: Time between two readings of a substation
+    """
+    _check_format(fmt)
+    rates = dict(DEFAULT_EPISODE_RATES, **(episode_rates or {}))
+    durations = dict(DEFAULT_EPISODE_DURATIONS, **(episode_durations or {}))
+    n_substations, n_timesteps = int(n_substations), int(n_timesteps)
+    if n_substations < 1 or n_timesteps < 1:
+        return {"error": "No data generated"}
+
+    plan_seed, block_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(plan_seed)
+
+    # 1. Substation profiles
+    profile = {
+        'v_nom': rng.normal(120, 1, n_substations),
+        'i_base': rng.uniform(12, 18, n_substations)
+    }
+
+    # 2. Plan attack episodes for the whole horizon (small: one entry per episode)
+    subs, starts, ends, labels, episode_counts = [], [], [], [], {}
+    for attack, label in ATTACK_LABELS.items():
+        lam = rates.get(attack, 0) * n_timesteps / 1000
+        per_sub = rng.poisson(lam, n_substations)
+        n = int(per_sub.sum())
+        low, high = durations[attack]
+        begin = rng.integers(0, n_timesteps, n)
+        subs.append(np.repeat(np.arange(n_substations), per_sub))
+        starts.append(begin)
+        ends.append(begin + rng.integers(low, high + 1, n))
+        labels.append(np.full(n, label))
+        episode_counts[attack] = n
+    episodes = tuple(np.concatenate(a) for a in (subs, starts, ends, labels))
+
+    print(f"--- Generating scenario: {n_substations} substations x {n_timesteps} steps | Episodes: {episode_counts} ---")
+
+    # 3. Plan time blocks of ~chunk_size rows
+    chunk_size = max(int(chunk_size or DEFAULT_CHUNK_SIZE), MIN_CHUNK_SIZE)
+    n_jobs = max(1, int(n_jobs or 1))
+    block_steps = max(1, chunk_size // n_substations)
+    blocks = [(t0, min(block_steps, n_timesteps - t0)) for t0 in range(0, n_timesteps, block_steps)]
+    seeds = block_seed.spawn(len(blocks))
+    start_time = np.datetime64(datetime.datetime.now(), 's')
+
+    tasks = []
+    for i, (t0, steps) in enumerate(blocks):
+        # Only ship the episodes that overlap this block to the worker
+        overlap = (episodes[1] < t0 + steps) & (episodes[2] > t0)
+        block_episodes = tuple(a[overlap] for a in episodes)
+        tasks.append((t0, steps, profile, block_episodes, seeds[i], start_time, interval_seconds, fmt == 'csv'))
+
+    # 4. GENERATE & SAVE
+    file_path, label_counts = _write_dataset(_generate_scenario_block, tasks, n_jobs, fmt,
+                                             "scenario_data", SCENARIO_COLUMNS)
+
+    return {
+        "filename": os.path.basename(file_path),
+        "total_samples": n_substations * n_timesteps,
+        "breakdown": {
+            "normal": label_counts.get(0, 0),
+            **{attack: label_counts.get(label, 0) for attack, label in ATTACK_LABELS.items()}
+        },
+        "episodes": episode_counts,
+        "substations": n_substations,
+        "timesteps": n_timesteps,
+        "chunks": len(blocks),
+        "format": fmt,
+        "seed": seed
+    }
+
+def _generate_scenario_block(t0, steps, profile, episodes, seed_seq, start_time, interval_seconds, as_csv):
+    """Builds timesteps [t0, t0 + steps) for every substation as (steps x substations) arrays."""
+    rng = np.random.default_rng(seed_seq)
+    n_sub = len(profile['v_nom'])
+    shape = (steps, n_sub)
+
+    # 1. Labels: paint episodes with a difference array + cumulative sum along time
+    labels = np.zeros(shape, dtype=np.int64)
+    subs, starts, ends, ep_labels = episodes
+    for label in sorted(set(ATTACK_LABELS.values())): # Higher labels (DoS) painted last, so they win
+        sel = ep_labels == label
+        if not sel.any(): continue
+        diff = np.zeros((steps + 1, n_sub), dtype=np.int32)
+        np.add.at(diff, (np.clip(starts[sel] - t0, 0, steps), subs[sel]), 1)
+        np.add.at(diff, (np.clip(ends[sel] - t0, 0, steps), subs[sel]), -1)
+        labels[np.cumsum(diff[:-1], axis=0) > 0] = label
+
+    # 2. Normal behaviour: daily load cycle + noise, voltage sags slightly under load
+    t = np.arange(t0, t0 + steps)[:, None]
+    cycle = np.sin(2 * np.pi * t * interval_seconds / 86_400)
+    i_base = profile['i_base'][None, :]
+    current = i_base * (1 + 0.2 * cycle) + rng.normal(0, 2, shape)
+    voltage = profile['v_nom'][None, :] - 0.1 * (current - i_base) + rng.normal(0, 2, shape)
+    temperature = 25 + current + rng.normal(0, 3, shape)
+
+    # 3. Attacks: FDI biases the reported voltage, DoS overloads the substation
+    fdi = labels == ATTACK_LABELS['fdi']
+    voltage[fdi] += rng.normal(30, 10, int(fdi.sum()))
+    dos = labels == ATTACK_LABELS['dos']
+    n_dos = int(dos.sum())
+    voltage[dos] = rng.normal(100, 5, n_dos)
+    current[dos] = rng.normal(40, 5, n_dos)
+    temperature[dos] = rng.normal(85, 5, n_dos)
+
+    # 4. Flatten time-major: row order is (t0, sub0), (t0, sub1), ..., (t1, sub0), ...
+    timestamps = start_time + (t[:, 0] * interval_seconds).astype('timedelta64[s]')
+    chunk = {
+        'timestamp': np.repeat(timestamps, n_sub),
+        'substation_id': np.tile(np.arange(n_sub, dtype=np.int32), steps),
+        'voltage': voltage.ravel(),
+        'current': current.ravel(),
+        'temperature': temperature.ravel(),
+        'label': labels.ravel()
     }
 
+    csv_bytes = None
+    if as_csv:
+        csv_bytes = _format_csv(chunk, SCENARIO_COLUMNS)
+    return chunk, csv_bytes
+
+# ---------------------------------------------------------
+# OUTPUT
+# ---------------------------------------------------------
+def _check_format(fmt):
+    if fmt not in ('csv', 'parquet'):
+        raise ValueError("fmt must be 'csv' or 'parquet'")
+    if fmt == 'parquet' and not dataset_cache.HAS_PYARROW:
+        raise ValueError("Parquet output requires pyarrow")
+
+def _write_dataset(worker, tasks, n_jobs, fmt, prefix, columns):
+    """Runs the chunk tasks and streams them to a new dataset. Returns (file_path, rows per label)."""
+    if not os.path.exists(OUTPUT_FOLDER): os.makedirs(OUTPUT_FOLDER)
+    file_path, part_path = _reserve_output(fmt, prefix)
+
+    label_counts = {}
+    writer = _ChunkWriter(file_path, part_path, fmt, columns)
+    try:
+        for result in _run_chunks(worker, tasks, n_jobs):
+            writer.write(result)
+            labels, n = np.unique(result[0]['label'], return_counts=True)
+            for label, count in zip(labels.tolist(), n.tolist()):
+                label_counts[label] = label_counts.get(label, 0) + count
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return file_path, label_counts
+
+def _reserve_output(fmt, prefix):
+    """
+    Picks a unique output name. The '.part' file is created exclusively, so two
+    concurrent calls in the same second never write to the same dataset.
+    """
+    file_ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    base, suffix = f"{prefix}_{file_ts}", 1
+    while True:
+        file_path = os.path.join(OUTPUT_FOLDER, f"{base}.{fmt}")
+        part_path = f"{file_path}.part"
+        if not os.path.exists(file_path):
+            try:
+                open(part_path, 'x').close()
+                return file_path, part_path
+            except FileExistsError:
+                pass
+        suffix += 1
+        base = f"{prefix}_{file_ts}_{suffix}"
+
+class _ChunkWriter:
+    """
+    Appends chunks to the dataset under its '.part' name and renames it on close,
+    so /api/datasets never lists a half-written file. CSV output also streams the
+    Parquet cache, so the first training run skips the conversion step.
+    """
+    def __init__(self, file_path, part_path, fmt, columns):
+        self.file_path = file_path
+        self.part_path = part_path
+        self.fmt = fmt
+        self.columns = columns
+        self.csv_file = None
+        if fmt == 'csv':
+            self.csv_file = open(part_path, 'wb')
+            self.csv_file.write((",".join(columns) + "\n").encode())
+        self.parquet_path = part_path if fmt == 'parquet' else (
+            f"{part_path}.parquet" if dataset_cache.HAS_PYARROW else None)
+        self.parquet = None
+
+    def write(self, result):
+        chunk, csv_bytes = result
+        if self.csv_file:
+            self.csv_file.write(csv_bytes)
+        if self.parquet_path:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({col: chunk[col] for col in self.columns})
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.parquet_path, table.schema)
+            self.parquet.write_table(table, row_group_size=dataset_cache.ROW_GROUP_SIZE)
+
+    def close(self):
+        if self.csv_file: self.csv_file.close()
+        if self.parquet: self.parquet.close()
+        os.replace(self.part_path, self.file_path)
+        if self.fmt == 'csv' and self.parquet:
+            dataset_cache.adopt_cache(self.file_path, self.parquet_path)
+
+    def abort(self):
+        if self.csv_file: self.csv_file.close()
+        if self.parquet: self.parquet.close()
+        for path in (self.part_path, self.parquet_path):
+            if path and os.path.exists(path): os.remove(path)
+
 if __name__ == "__main__":
     result = generate_multiclass_data(
         total_samples=5000,
@@ -114,4 +402,4 @@ if __name__ == "__main__":
             'dos': 0.15  # 15% DoS
         }
     )
-    print("Data Generation Result:", result)
\ No newline at end of file
+    print("Data Generation Result:", result)
@@ -0,0 +1,114 @@
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+TIMINGS_FILE = "timings.json"
+
+# Resetting the peak is process-global, so it is only safe where one run owns the
+# process: job workers turn it on (see job_queue.py), the threaded server leaves it off.
+_owns_process = False
+
+def claim_process():
+    """Marks this process as running a single job, which lets StageTimer reset the peak RSS."""
+    global _owns_process
+    _owns_process = True
+
+def _status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field): return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def rss_mb():
+    """Current resident memory of this process in MB (None if unknown)."""
+    return _status_mb("VmRSS:")
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, since the last reset_peak_rss() (None if unknown)."""
+    peak = _status_mb("VmHWM:")
+    if peak is not None: return peak
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def reset_peak_rss():
+    """
+    Lowers the peak to the current RSS, so the next peak_rss_mb() covers only what
+    ran in between. Linux only; returns False where the peak cannot be reset.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+class StageTimer:
+    """
+    Wall time, CPU time, throughput and peak memory per stage of a run.
+
+    CPU time is process-wide, so it includes the native threads of XGBoost and
+    sklearn: cpu_s / wall_s above 1 means the stage ran in parallel.
+
+    In a job worker (see claim_process) the peak is reset per stage: peak_rss_mb
+    is the highest RSS during the stage and peak_growth_mb how far it rose above
+    the RSS the stage started with. Elsewhere, e.g. stages run by concurrent
+    server requests, peak_rss_mb is the process-wide high-water mark and
+    peak_growth_mb the RSS at the end of the stage minus the RSS at its start.
+    """
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Times the enclosed block. Yields the stage entry, so rows can be filled in
+        once they are known: `with timer.stage("read") as s: ...; s["rows"] = n`.
+        """
+        entry = {"stage": name, "rows": rows}
+        per_stage_peak = _owns_process and reset_peak_rss()
+        before = peak_rss_mb() if per_stage_peak else rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield entry
+        entry["wall_s"] = round(time.perf_counter() - wall, 4)
+        entry["cpu_s"] = round(time.process_time() - cpu, 4)
+        entry["rows_per_s"] = round(entry["rows"] / entry["wall_s"]) if entry["rows"] and entry["wall_s"] else None
+        entry["peak_rss_mb"] = peak_rss_mb()
+        after = entry["peak_rss_mb"] if per_stage_peak else rss_mb()
+        if before is not None and after is not None:
+            entry["peak_growth_mb"] = round(after - before, 1)
+        self.stages.append(entry)
+
+    def summary(self):
+        peaks = [s["peak_rss_mb"] for s in self.stages if s["peak_rss_mb"] is not None]
+        return {
+            "stages": list(self.stages),
+            "total_wall_s": round(sum(s["wall_s"] for s in self.stages), 4),
+            "total_cpu_s": round(sum(s["cpu_s"] for s in self.stages), 4),
+            "peak_rss_mb": max(peaks) if peaks else peak_rss_mb() # Peak of the run
+        }
+
+    def report_lines(self):
+        """The summary as a text table for evaluation_report.txt."""
+        lines = ["", "-"*20, "Timings",
+                 f"{'stage':<18}{'wall s':>10}{'cpu s':>10}{'rows/s':>14}{'peak MB':>10}"]
+        for s in self.stages:
+            rate = f"{s['rows_per_s']:,}" if s['rows_per_s'] else "-"
+            peak = f"{s['peak_rss_mb']:.1f}" if s['peak_rss_mb'] is not None else "-"
+            lines.append(f"{s['stage']:<18}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{rate:>14}{peak:>10}")
+        summary = self.summary()
+        peak = f"{summary['peak_rss_mb']:.1f}" if summary['peak_rss_mb'] is not None else "-"
+        lines.append(f"{'total':<18}{summary['total_wall_s']:>10.3f}{summary['total_cpu_s']:>10.3f}{'':>14}{peak:>10}")
+        return lines
+
+    def reset(self):
+        self.stages = []
@@ -0,0 +1,267 @@
+import os
+import uuid
+import signal
+import time
+import threading
+import traceback
+import multiprocessing
+from collections import OrderedDict, deque
+from instrumentation import claim_process
+
+# Configuration (override with environment variables)
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", 2))
+MAX_QUEUED_JOBS = int(os.environ.get("MAX_QUEUED_JOBS", 32))
+MAX_FINISHED_JOBS = 200 # How many finished jobs to remember for /api/jobs
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+class QueueFullError(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind, target, kwargs, config=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind # e.g. 'train', 'test'
+        self.target = target
+        self.kwargs = kwargs
+        self.config = config or {}
+        self.status = QUEUED
+        self.error = None
+        self.result = None
+        self.nthread = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.progress = None # Latest report_progress() payload from the worker
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "config": self.config,
+            "nthread": self.nthread,
+            "error": self.error,
+            "result": self.result,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+# Set inside a worker process: (pid, pipe) that report_progress() writes to
+_progress_channel = None
+
+def report_progress(data):
+    """
+    Sends a progress update (a JSON-able dict) from a running job to the queue.
+    A no-op outside a job worker, and in processes the worker itself spawned.
+    """
+    if _progress_channel is None: return
+    pid, conn = _progress_channel
+    if pid != os.getpid(): return
+    try:
+        conn.send(("progress", data))
+    except (OSError, ValueError):
+        pass
+
+def _job_entry(conn, target, kwargs):
+    """Runs inside the worker process and reports back through the pipe."""
+    global _progress_channel
+    _progress_channel = (os.getpid(), conn)
+    # Own process group, so cancel() also stops the processes this job starts (e.g. joblib workers)
+    if hasattr(os, "setsid"): os.setsid()
+    claim_process() # The job owns this process, so stage timings may reset its peak RSS
+    try:
+        result = target(**kwargs)
+        conn.send(("ok", result))
+    except BaseException as e:
+        traceback.print_exc()
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def _terminate_group(process):
+    """SIGTERMs a worker and everything it started (its process group, see _job_entry)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No process groups here, or the worker has not called setsid() yet
+        process.terminate()
+
+class JobQueue:
+    """
+    Bounded scheduler for background work (training, testing, ...).
+
+    At most `max_concurrent` jobs run at once, each in its own worker process so
+    CPU-heavy training escapes the GIL and can be terminated on cancel. Workers
+    are spawned, not forked: a fork of the threaded web server could inherit a
+    lock held by another thread and deadlock. Job targets must therefore be
+    importable module-level functions (see tasks.py) with picklable kwargs. Every
+    running job gets an explicit thread budget (cpu_count // max_concurrent),
+    passed to the target as `nthread`, so concurrent jobs don't oversubscribe cores.
+
+    If `on_event` is given, it is called as on_event(event_type, job_dict) whenever
+    a job changes state ('job' events) or its worker reports progress ('progress').
+    """
+    def __init__(self, max_concurrent=MAX_CONCURRENT_JOBS, max_queued=MAX_QUEUED_JOBS, on_event=None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.threads_per_job = max(1, (os.cpu_count() or 1) // self.max_concurrent)
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")
+        self.on_event = on_event
+
+    # --- Public API ---
+    def submit(self, kind, target, kwargs=None, config=None):
+        """Queues target(**kwargs, nthread=N). Raises QueueFullError when the backlog is full."""
+        job = Job(kind, target, kwargs or {}, config)
+        with self._lock:
+            if len(self._pending) >= self.max_queued:
+                raise QueueFullError(f"Job queue is full ({self.max_queued} pending)")
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._prune()
+        self._emit("job", job)
+        self._dispatch()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list(self, status=None, kind=None):
+        with self._lock:
+            jobs = [j.to_dict() for j in self._jobs.values()]
+        if status: jobs = [j for j in jobs if j["status"] == status]
+        if kind: jobs = [j for j in jobs if j["kind"] == kind]
+        return jobs
+
+    def cancel(self, job_id):
+        """Cancels a queued job, or terminates a running one. Returns (ok, message)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job: return False, "Job not found"
+
+            was_queued = job.status == QUEUED
+            if was_queued:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+            elif job.status != RUNNING:
+                return False, f"Job already {job.status}"
+            else:
+                # Mark first so the monitor thread doesn't report it as failed
+                job.status = CANCELLED
+            # None while the worker is still being spawned: _spawn stops it once it is up
+            process = job.process
+
+        if was_queued:
+            self._emit("job", job) # A running job is reported by its monitor once it exits
+        elif process is not None and process.is_alive():
+            _terminate_group(process)
+        return True, "Job cancelled"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": len(self._pending),
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "threads_per_job": self.threads_per_job
+            }
+
+    # --- Scheduling ---
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            while self._pending and self._running < self.max_concurrent:
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.nthread = self.threads_per_job
+                self._running += 1 # The slot is taken now; the process is spawned below
+                started.append(job)
+        failed = False
+        for job in started:
+            self._emit("job", job)
+            # Spawning takes a while (a fresh interpreter), so it happens outside the lock
+            try:
+                conn = self._spawn(job)
+            except Exception as e: # e.g. kwargs that cannot be pickled
+                with self._lock:
+                    self._running -= 1
+                    job.error = f"Could not start worker: {type(e).__name__}: {e}"
+                    self._finish(job, FAILED)
+                self._emit("job", job)
+                failed = True
+                continue
+            # Monitor only after the 'running' event, so its progress events come second
+            threading.Thread(target=self._monitor, args=(job, conn), daemon=True).start()
+        if failed:
+            self._dispatch() # Hand the freed slots to the next queued jobs
+
+    def _spawn(self, job):
+        recv_conn, send_conn = self._ctx.Pipe(duplex=False)
+        kwargs = dict(job.kwargs, nthread=job.nthread)
+        # Not daemonic: jobs such as hyperparameter search start their own worker processes
+        process = self._ctx.Process(target=_job_entry, args=(send_conn, job.target, kwargs))
+        process.start()
+        send_conn.close()
+        with self._lock:
+            job.process = process
+            cancelled = job.status == CANCELLED
+        if cancelled:
+            _terminate_group(process) # Cancelled while it was starting
+        return recv_conn
+
+    def _monitor(self, job, conn):
+        outcome = None
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] != "progress":
+                    outcome = message
+                    break
+                job.progress = message[1]
+                self._emit("progress", job)
+        except (EOFError, OSError):
+            pass # Process died without reporting (terminated, crashed, OOM-killed)
+        finally:
+            conn.close()
+        job.process.join()
+
+        with self._lock:
+            self._running -= 1
+            if job.status == CANCELLED:
+                job.finished_at = time.time()
+            elif outcome and outcome[0] == "ok":
+                job.result = outcome[1]
+                self._finish(job, DONE)
+            else:
+                job.error = outcome[1] if outcome else f"Worker exited with code {job.process.exitcode}"
+                self._finish(job, FAILED)
+            job.process = None
+        self._emit("job", job)
+        self._dispatch()
+
+    def _emit(self, event_type, job):
+        if self.on_event is None: return
+        try:
+            self.on_event(event_type, job.to_dict())
+        except Exception as e:
+            print(f"Job event handler failed: {e}")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status in (DONE, FAILED, CANCELLED)]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
@@ -0,0 +1,56 @@
+import time
+from flask import Response, request, g
+from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# Request latency buckets (seconds): sub-ms scoring up to slow report/image requests
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Run stage buckets (seconds): from a quick split up to long boosting runs
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+REQUEST_LATENCY = Histogram(
+    "gridsafe_http_request_duration_seconds", "Time to produce a response (streamed bodies excluded)",
+    ["method", "endpoint"], buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter("gridsafe_http_requests", "HTTP requests", ["method", "endpoint", "status"])
+JOBS = Counter("gridsafe_jobs", "Finished background jobs", ["kind", "status"])
+JOB_DURATION = Histogram("gridsafe_job_duration_seconds", "Job run time", ["kind"], buckets=STAGE_BUCKETS)
+STAGE_SECONDS = Histogram(
+    "gridsafe_run_stage_seconds", "Wall time per training/testing stage (see instrumentation.py)",
+    ["kind", "stage"], buckets=STAGE_BUCKETS
+)
+STAGE_CPU_SECONDS = Counter("gridsafe_run_stage_cpu_seconds", "CPU time per stage", ["kind", "stage"])
+STAGE_ROWS = Counter("gridsafe_run_stage_rows", "Rows processed per stage", ["kind", "stage"])
+
+def instrument(app):
+    """Records per-endpoint latency for every request and serves GET /metrics."""
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # The URL rule (e.g. /api/jobs/<job_id>) keeps the label set small
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_LATENCY.labels(request.method, endpoint).observe(time.perf_counter() - started)
+            REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+
+def observe_job(job):
+    """Records a finished job (a Job.to_dict()), including the stage timings its run reported."""
+    JOBS.labels(job["kind"], job["status"]).inc()
+    if job["started_at"] and job["finished_at"]:
+        JOB_DURATION.labels(job["kind"]).observe(job["finished_at"] - job["started_at"])
+
+    result = job["result"] if isinstance(job["result"], dict) else {}
+    timings = result.get("timings") or {}
+    for stage in timings.get("stages", []):
+        STAGE_SECONDS.labels(job["kind"], stage["stage"]).observe(stage["wall_s"])
+        STAGE_CPU_SECONDS.labels(job["kind"], stage["stage"]).inc(stage["cpu_s"])
+        if stage.get("rows"):
+            STAGE_ROWS.labels(job["kind"], stage["stage"]).inc(stage["rows"])
@@ -0,0 +1,121 @@
+import os
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+
+# Configuration (override with environment variables)
+PREDICT_MAX_BATCH = int(os.environ.get("PREDICT_MAX_BATCH", 4096))
+PREDICT_MAX_LATENCY_MS = float(os.environ.get("PREDICT_MAX_LATENCY_MS", 5))
+
+class BatcherClosedError(RuntimeError):
+    pass
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one vectorized predict call.
+
+    The first request in an empty queue opens a batch; the worker then keeps
+    collecting requests until either `max_batch` rows are gathered or
+    `max_latency_ms` has passed, scores the stacked matrix once and hands each
+    caller its slice of the result. A request therefore waits at most the latency
+    budget plus one predict call.
+
+    Requests are shape-checked before they are queued, and if scoring a batch
+    still fails, each request in it is re-scored on its own, so one bad request
+    only fails its own caller.
+    """
+    def __init__(self, predict_fn, max_batch=PREDICT_MAX_BATCH, max_latency_ms=PREDICT_MAX_LATENCY_MS, n_features=None):
+        """
+        :param predict_fn: Callable(np.ndarray of shape (n, features)) -> array of n predictions
+        :param n_features: Expected column count, or a Callable() returning it (checked on every submit)
+        """
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+        self.closed = False
+        self._close_lock = threading.Lock() # close() can't slip between submit's check and put
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, rows):
+        """
+        Queues a (n, features) float matrix. Returns a Future with n predictions.
+        Raises ValueError for a malformed matrix and BatcherClosedError after close().
+        """
+        rows = np.asarray(rows, dtype=np.float32)
+        expected = self.n_features() if callable(self.n_features) else self.n_features
+        if rows.ndim != 2 or (expected is not None and rows.shape[1] != expected):
+            raise ValueError(f"Expected a (rows, {expected or 'features'}) matrix, got shape {rows.shape}")
+        future = Future()
+        with self._close_lock:
+            if self.closed:
+                raise BatcherClosedError("Batcher is closed")
+            self._queue.put((rows, future))
+        return future
+
+    def predict(self, rows, timeout=None):
+        return self.submit(rows).result(timeout=timeout)
+
+    def close(self):
+        """Stops the worker once the requests already queued have been scored."""
+        with self._close_lock:
+            if not self.closed:
+                self.closed = True
+                self._queue.put(None)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0,
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+    def _run(self):
+        while True:
+            item = self._queue.get() # Block until a request opens a batch
+            if item is None: return
+            batch = [item]
+            n_rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_latency
+
+            while n_rows < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0: break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None) # Finish this batch, stop on the next get()
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            self._score(batch, n_rows)
+
+    def _score(self, batch, n_rows):
+        try:
+            X = batch[0][0] if len(batch) == 1 else np.vstack([rows for rows, _ in batch])
+            preds = np.asarray(self.predict_fn(X))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # Find the request(s) at fault instead of failing the whole batch
+                for item in batch: self._score([item], len(item[0]))
+            return
+
+        self.batches += 1
+        self.rows += n_rows
+        start = 0
+        for rows, future in batch:
+            future.set_result(preds[start:start + len(rows)])
+            start += len(rows)
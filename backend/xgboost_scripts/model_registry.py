@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Default memory budget for cached models (override with MODEL_CACHE_MB)
+DEFAULT_BUDGET_MB = int(os.environ.get("MODEL_CACHE_MB", 512))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("MODEL_CACHE_ENTRIES", 16))
+LOAD_LOCK_STRIPES = 32 # Paths hash onto a fixed set of load locks, so no per-path state piles up
+
+class ModelRegistry:
+    """
+    Keeps deserialized models in memory so repeated /api/simulate and /api/test
+    calls against the same file skip the JSON parse / unpickle.
+
+    Entries are keyed by absolute path and validated against the file's
+    mtime + size, so re-saving a model on disk transparently invalidates it.
+    The cache is an LRU bounded by both entry count and a memory budget
+    (estimated from the on-disk size of the model file).
+    """
+    def __init__(self, loader, budget_mb=DEFAULT_BUDGET_MB, max_entries=DEFAULT_MAX_ENTRIES, on_evict=None):
+        """
+        :param loader: Callable(filepath) -> (model, model_type, task_type)
+        :param budget_mb: Upper bound on the estimated size of all cached models
+        :param max_entries: Upper bound on the number of cached models
+        :param on_evict: Optional Callable(abspath), called (outside the cache lock) whenever
+                         a model leaves the cache, so per-model resources can follow it out
+        """
+        self.loader = loader
+        self.on_evict = on_evict
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # abspath -> dict(loaded, mtime, size)
+        self._lock = threading.RLock()
+        self._load_locks = [threading.Lock() for _ in range(LOAD_LOCK_STRIPES)]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filepath):
+        """Returns whatever the loader returned, loading from disk only on a miss."""
+        key = os.path.abspath(filepath)
+        stat = os.stat(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['loaded']
+
+        # Load outside the global lock so a slow parse doesn't block other models.
+        # The path's load lock stops concurrent requests from loading the same file twice
+        # (two paths sharing a stripe just load one after the other).
+        with self._load_locks[hash(key) % LOAD_LOCK_STRIPES]:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry['loaded']
+
+            loaded = self.loader(key)
+
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = {
+                    'loaded': loaded,
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size
+                }
+                self._entries.move_to_end(key)
+                evicted = self._enforce_limits()
+            self._notify(evicted)
+            return loaded
+
+    def evict(self, filepath):
+        """Drops a single model from the cache. Returns True if it was cached."""
+        key = os.path.abspath(filepath)
+        with self._lock:
+            cached = self._entries.pop(key, None) is not None
+        if cached: self._notify([key])
+        return cached
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries)
+            self._entries.clear()
+        self._notify(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes(),
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "models": list(self._entries.keys())
+            }
+
+    # --- Helpers ---
+    def _total_bytes(self):
+        return sum(e['size'] for e in self._entries.values())
+
+    def _enforce_limits(self):
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._total_bytes() > self.budget_bytes
+        ):
+            evicted.append(self._entries.popitem(last=False)[0])
+        return evicted
+
+    def _notify(self, keys):
+        if self.on_evict:
+            for key in keys: self.on_evict(key)
@@ -0,0 +1,79 @@
+import json
+import queue
+import threading
+from collections import deque
+
+# Configuration
+HISTORY_SIZE = 500         # Recent events kept so reconnecting clients can catch up
+SUBSCRIBER_BUFFER = 1000   # Events a slow client may lag behind before it is dropped
+HEARTBEAT_SECONDS = 15     # SSE comment sent when there is nothing to report
+
+class EventBroker:
+    """
+    Fan-out of server events (job progress, finished results) to SSE clients.
+
+    Every event gets an increasing id. A client that reconnects with the
+    Last-Event-ID header first receives the events it missed (from a bounded
+    history), then live ones. Idle subscribers only cost a blocked thread and a
+    heartbeat every HEARTBEAT_SECONDS, instead of a report read per poll.
+    """
+    def __init__(self, history_size=HISTORY_SIZE):
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        with self._lock:
+            event = (self._next_id, event_type, data)
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Too far behind: disconnect it; the browser reconnects and replays from history
+                self._drop(q)
+
+    def subscribe(self, last_event_id=None, types=None):
+        """Generator of SSE-formatted messages, optionally limited to some event types."""
+        q = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        with self._lock:
+            backlog = [e for e in self._history if last_event_id is not None and e[0] > last_event_id]
+            self._subscribers.add(q)
+
+        try:
+            for event in backlog:
+                if not types or event[1] in types:
+                    yield _format(event)
+            while True:
+                try:
+                    event = q.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None: return # Dropped by publish()
+                if not types or event[1] in types:
+                    yield _format(event)
+        finally:
+            with self._lock:
+                self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _drop(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+        try:
+            while True: q.get_nowait() # Make room for the sentinel
+        except queue.Empty:
+            pass
+        q.put_nowait(None)
+
+def _format(event):
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
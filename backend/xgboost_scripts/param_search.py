@@ -0,0 +1,182 @@
+import os
+import math
+import time
+import itertools
+import numpy as np
+from joblib import Parallel, delayed
+
+# Parameter that acts as the "budget" for successive halving, per model type
+BUDGET_PARAMS = {
+    'xgboost': 'num_boost_round',
+    'random_forest': 'n_estimators',
+    'linear': 'max_iter'
+}
+DEFAULT_BUDGETS = {
+    'xgboost': (10, 200),
+    'random_forest': (10, 200),
+    'linear': (100, 1000)
+}
+
+# ---------------------------------------------------------
+# CANDIDATE GENERATION
+# ---------------------------------------------------------
+def grid_candidates(space):
+    """
+    Full cartesian product. Every value in `space` must be a list,
+    e.g. {"max_depth": [3, 6], "eta": [0.1, 0.3]}.
+    """
+    for name, values in space.items():
+        if not isinstance(values, (list, tuple)):
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+    names = list(space.keys())
+    return [dict(zip(names, combo)) for combo in itertools.product(*space.values())]
+
+def random_candidates(space, n_trials, seed=42):
+    """
+    Samples n_trials configs. Values may be lists (choice) or ranges:
+    {"low": 0.01, "high": 0.3, "log": true}. Ranges with int bounds sample ints.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n_trials):
+        params = {}
+        for name, spec in space.items():
+            if isinstance(spec, (list, tuple)):
+                params[name] = spec[rng.integers(len(spec))]
+            elif isinstance(spec, dict):
+                low, high = spec['low'], spec['high']
+                if spec.get('log'):
+                    value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    value = float(rng.uniform(low, high))
+                if isinstance(low, int) and isinstance(high, int):
+                    value = int(round(value))
+                params[name] = value
+            else:
+                params[name] = spec # Fixed value
+        candidates.append(params)
+    return candidates
+
+# ---------------------------------------------------------
+# TRIAL EXECUTION (runs inside joblib worker processes)
+# ---------------------------------------------------------
+def fit_and_score(model_type, task_type, params, X_train, y_train, X_val, y_val, nthread):
+    """
+    Trains one model on (X_train, y_train) and scores it on the validation rows.
+    Returns (score, metrics, eval_curve, best_iteration) where score is "higher is
+    better" and best_iteration is the booster's early-stopping pick (0-based, XGBoost
+    only). Shared by hyperparameter trials and cross-validation folds.
+    """
+    # Imported here so the worker process resolves it by module name
+    from XGridBoost import XGridBoost
+
+    bot = XGridBoost(model_type=model_type, task_type=task_type, nthread=nthread)
+    bot.fit(X_train, y_train, X_val, y_val, params)
+
+    preds = np.asarray(bot.predict(X_val))
+    score, metrics = score_predictions(task_type, y_val, preds)
+
+    curve, best_iteration = None, None
+    if bot.evals_result:
+        curve = [float(v) for v in list(bot.evals_result['eval'].values())[0]]
+        # Early stopping trains up to early_stopping_rounds past the best round
+        best_iteration = int(getattr(bot.model, 'best_iteration', len(curve) - 1))
+    return score, metrics, curve, best_iteration
+
+def score_predictions(task_type, y_true, preds):
+    """Returns (score, metrics): accuracy + macro F1, or RMSE (score = -RMSE, so higher is always better)."""
+    if task_type == 'regression':
+        rmse = float(np.sqrt(np.mean((preds - np.asarray(y_true, dtype=float)) ** 2)))
+        return -rmse, {"rmse": rmse}
+    from sklearn.metrics import f1_score
+    accuracy = float(np.mean(preds == y_true))
+    return accuracy, {"accuracy": accuracy, "f1_macro": float(f1_score(y_true, preds, average='macro'))}
+
+def _run_trial(trial_id, model_type, task_type, params, budget, X_train, y_train, X_val, y_val, nthread):
+    params = dict(params)
+    budget_param = BUDGET_PARAMS.get(model_type)
+    if budget is not None and budget_param:
+        params[budget_param] = budget
+
+    start = time.time()
+    score, metrics, curve, _ = fit_and_score(model_type, task_type, params, X_train, y_train, X_val, y_val, nthread)
+
+    return {
+        "trial": trial_id,
+        "params": params,
+        "budget": budget,
+        "score": score,
+        "metrics": metrics,
+        "eval_curve": curve,
+        "seconds": round(time.time() - start, 3)
+    }
+
+def thread_split(n_tasks, total_threads, n_jobs=None):
+    """Returns (parallel_tasks, threads_per_task) without exceeding total_threads."""
+    parallel = max(1, min(n_jobs or total_threads, n_tasks, total_threads))
+    return parallel, max(1, total_threads // parallel)
+
+# ---------------------------------------------------------
+# SEARCH STRATEGIES
+# ---------------------------------------------------------
+def run_search(model_type, task_type, candidates, X_train, y_train, X_val, y_val,
+               strategy='random', total_threads=None, n_jobs=None,
+               min_budget=None, max_budget=None, halving_factor=3):
+    """
+    Evaluates candidate configs in parallel and returns the leaderboard
+    (list of trial dicts, best first).
+
+    'grid' / 'random' train every candidate at full budget (XGBoost trials still
+    stop early on their eval curve). 'halving' runs synchronous successive halving:
+    all candidates start at min_budget, and only the top 1/halving_factor of each
+    rung is promoted to a larger budget, so poor configs are pruned early.
+    Promotion ranks trials by their validation score at the rung's budget (the
+    same score for every model type); XGBoost's per-round eval curves are kept
+    in the leaderboard but do not drive pruning.
+    """
+    total_threads = total_threads or os.cpu_count() or 1
+    requested_max = max_budget
+    default_min, default_max = DEFAULT_BUDGETS[model_type]
+    min_budget = min_budget or default_min
+    max_budget = max_budget or default_max
+    if model_type == 'linear' and task_type == 'regression':
+        min_budget = max_budget = None # LinearRegression has no iterative budget
+
+    data = (X_train, y_train, X_val, y_val)
+
+    def evaluate(trials, budget):
+        parallel, per_trial = thread_split(len(trials), total_threads, n_jobs)
+        # joblib memory-maps the large arrays, so workers share them read-only
+        return Parallel(n_jobs=parallel, max_nbytes='1M', mmap_mode='r')(
+            delayed(_run_trial)(tid, model_type, task_type, params, budget, *data, per_trial)
+            for tid, params in trials
+        )
+
+    trials = list(enumerate(candidates))
+
+    if strategy != 'halving':
+        # Without an explicit max_budget, the space (or the trainer default) decides the budget
+        results = evaluate(trials, requested_max)
+        for r in results: r["status"] = "completed"
+        return sorted(results, key=lambda r: r["score"], reverse=True)
+
+    leaderboard = {}
+    budget, rung = min_budget, 0
+    while trials:
+        results = evaluate(trials, budget)
+        results.sort(key=lambda r: r["score"], reverse=True)
+        final_rung = budget is None or budget >= max_budget or len(results) <= 1
+
+        keep = len(results) if final_rung else max(1, math.ceil(len(results) / halving_factor))
+        for i, r in enumerate(results):
+            r["rung"] = rung
+            r["status"] = "completed" if final_rung else ("promoted" if i < keep else "pruned")
+            leaderboard[r["trial"]] = r # Later rungs overwrite earlier entries
+
+        if final_rung: break
+        promoted = {r["trial"] for r in results[:keep]}
+        trials = [(tid, params) for tid, params in trials if tid in promoted]
+        budget, rung = min(budget * halving_factor, max_budget), rung + 1
+
+    # Completed trials rank above pruned ones, then by score
+    return sorted(leaderboard.values(), key=lambda r: (r["status"] == "completed", r["rung"], r["score"]), reverse=True)
@@ -0,0 +1,140 @@
+import os
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Structured plot inputs written next to each report by XGridBoost
+PLOT_DATA_FILE = "plot_data.json"
+REGRESSION_POINTS_FILE = "regression_points.npz"
+
+# Configuration
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", 1))
+RENDER_TIMEOUT = 120 # Seconds to wait for one image
+
+_pool = None
+_pool_lock = threading.Lock()
+_file_locks = {}
+
+# ---------------------------------------------------------
+# RENDERERS (run inside the render process)
+# ---------------------------------------------------------
+def _pyplot():
+    # Imported lazily: only the render process ever pays for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def render_confusion_matrix(data, folder, out_path):
+    import seaborn as sns
+    plt = _pyplot()
+    cm = data["confusion_matrix"]
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(cm["matrix"], annot=True, fmt='d', cmap='Blues',
+                xticklabels=cm["labels"], yticklabels=cm["labels"])
+    plt.title(f'Confusion Matrix ({data.get("model_type")})')
+    plt.ylabel('Actual')
+    plt.xlabel('Predicted')
+    plt.savefig(out_path)
+    plt.close()
+
+def render_training_curve(data, folder, out_path):
+    plt = _pyplot()
+    curve = data["training_curve"]
+    x_axis = range(0, len(curve["train"]))
+    fig, ax = plt.subplots()
+    ax.plot(x_axis, curve["train"], label='Train')
+    ax.plot(x_axis, curve["eval"], label='Test')
+    ax.legend()
+    plt.title('Training Loss')
+    plt.savefig(out_path)
+    plt.close()
+
+def render_feature_importance(data, folder, out_path):
+    plt = _pyplot()
+    fi = data["feature_importance"]
+    plt.figure(figsize=(10, 6))
+    plt.barh(range(len(fi["values"])), fi["values"], align='center')
+    plt.yticks(range(len(fi["names"])), fi["names"])
+    plt.xlabel(fi["xlabel"])
+    plt.title(fi["title"])
+    plt.gca().invert_yaxis()
+    plt.tight_layout()
+    plt.savefig(out_path)
+    plt.close()
+
+def render_regression_scatter(data, folder, out_path):
+    import numpy as np
+    plt = _pyplot()
+    points = np.load(os.path.join(folder, data["regression"]["points_file"]))
+    y_true, y_pred = points["y_true"], points["y_pred"]
+    plt.figure(figsize=(8, 8))
+    plt.scatter(y_true, y_pred, alpha=0.5)
+    min_val = min(y_true.min(), y_pred.min())
+    max_val = max(y_true.max(), y_pred.max())
+    plt.plot([min_val, max_val], [min_val, max_val], color='red', linestyle='--')
+    plt.xlabel('Actual Values')
+    plt.ylabel('Predicted Values')
+    plt.title('Actual vs Predicted')
+    plt.grid(True)
+    plt.savefig(out_path)
+    plt.close()
+
+# Image filename -> (plot_data key it needs, renderer)
+PLOTS = {
+    "confusion_matrix.png": ("confusion_matrix", render_confusion_matrix),
+    "training_loss_curve.png": ("training_curve", render_training_curve),
+    "feature_importance.png": ("feature_importance", render_feature_importance),
+    "regression_scatter.png": ("regression", render_regression_scatter)
+}
+
+def load_plot_data(folder):
+    path = os.path.join(folder, PLOT_DATA_FILE)
+    if not os.path.exists(path): return {}
+    with open(path) as f:
+        return json.load(f)
+
+def render(folder, filename):
+    """Draws one image from the folder's plot data. Written atomically; returns the path."""
+    key, renderer = PLOTS[filename]
+    out_path = os.path.join(folder, filename)
+    tmp = f"{out_path}.{os.getpid()}.tmp.png"
+    renderer(load_plot_data(folder), folder, tmp)
+    os.replace(tmp, out_path)
+    return out_path
+
+# ---------------------------------------------------------
+# PUBLIC API (used by the Flask app)
+# ---------------------------------------------------------
+def available_images(folder):
+    """Images already rendered plus the ones that can be rendered on request."""
+    if not os.path.isdir(folder): return []
+    images = {f for f in os.listdir(folder) if f.endswith('.png')}
+    data = load_plot_data(folder)
+    images.update(name for name, (key, _) in PLOTS.items() if key in data)
+    return sorted(images)
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 'spawn' keeps the renderer free of the web server's threads and pyplot state
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def ensure_image(folder, filename):
+    """
+    Returns True once folder/filename exists, rendering it in the render process
+    on first request. Later requests are served straight from the cached PNG.
+    """
+    path = os.path.join(folder, filename)
+    if os.path.exists(path): return True
+    if filename not in PLOTS or PLOTS[filename][0] not in load_plot_data(folder): return False
+
+    with _pool_lock:
+        lock = _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            _get_pool().submit(render, os.path.abspath(folder), filename).result(timeout=RENDER_TIMEOUT)
+    return True
@@ -0,0 +1,81 @@
+import os
+import json
+import shutil
+import time
+import threading
+import datetime
+
+POINTER_SUFFIX = ".json"
+PRUNE_MIN_AGE = 3600 # Seconds a folder must be left untouched before prune() may delete it
+
+def _pointer_path(base_dir, name):
+    return os.path.join(base_dir, f"{name}{POINTER_SUFFIX}")
+
+def publish(base_dir, name, folder):
+    """
+    Points `name` (e.g. 'latest') at a finished result folder inside base_dir.
+
+    The pointer is a tiny manifest (<base_dir>/<name>.json) written under a private
+    name and swapped in with os.replace, so publishing is O(1) no matter how big the
+    run is, and readers see either the old folder or the new one, never a partial copy.
+    """
+    manifest = {
+        "folder": os.path.relpath(folder, base_dir),
+        "published_at": datetime.datetime.now().isoformat(timespec='seconds')
+    }
+    pointer = _pointer_path(base_dir, name)
+    staging = f"{pointer}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(staging, "w") as f:
+        json.dump(manifest, f)
+    os.replace(staging, pointer)
+
+    # Trees from before the pointer kept a full copy under base_dir/<name>; it is stale now
+    legacy = os.path.join(base_dir, name)
+    if os.path.isdir(legacy) and not os.path.islink(legacy):
+        shutil.rmtree(legacy, ignore_errors=True)
+
+def resolve(base_dir, name):
+    """Returns the folder `name` currently points to, or None if nothing was published yet."""
+    try:
+        with open(_pointer_path(base_dir, name)) as f:
+            folder = os.path.join(base_dir, json.load(f)["folder"])
+    except (FileNotFoundError, ValueError, KeyError):
+        folder = os.path.join(base_dir, name) # Legacy copied folder, if any
+    return folder if os.path.isdir(folder) else None
+
+def referenced_folders(base_dir):
+    """Absolute paths of every folder some pointer in base_dir currently points to."""
+    folders = set()
+    for name in os.listdir(base_dir):
+        if not name.endswith(POINTER_SUFFIX): continue
+        try:
+            with open(os.path.join(base_dir, name)) as f:
+                folders.add(os.path.abspath(os.path.join(base_dir, json.load(f)["folder"])))
+        except (OSError, ValueError, KeyError, TypeError):
+            continue # Not a pointer (e.g. a leaderboard), or replaced while reading
+    return folders
+
+def prune(base_dir, prefix, keep, protect=None, min_age=PRUNE_MIN_AGE):
+    """
+    Deletes all but the `keep` newest folders named <prefix>*. Never deletes the
+    `protect` folder, a folder any pointer refers to, or one modified in the last
+    `min_age` seconds (it may belong to a job that is still writing it).
+    Safe to run concurrently: folders that vanish mid-way are skipped.
+    """
+    folders = []
+    for name in os.listdir(base_dir):
+        if not name.startswith(prefix): continue
+        path = os.path.join(base_dir, name)
+        try:
+            folders.append((os.path.getmtime(path), path))
+        except OSError:
+            continue # Removed by a concurrent prune
+    folders.sort(reverse=True)
+
+    keep_paths = referenced_folders(base_dir)
+    if protect: keep_paths.add(os.path.abspath(protect))
+    now = time.time()
+    for mtime, folder in folders[keep:]:
+        if os.path.abspath(folder) in keep_paths or now - mtime < min_age: continue
+        if os.path.isdir(folder):
+            shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,209 @@
+import threading
+from collections import deque
+import numpy as np
+
+# Defaults (per sensor column)
+DEFAULT_COLUMNS = ['voltage', 'current', 'temperature']
+DEFAULT_WINDOWS = [5, 20]  # Rows per rolling mean/std window
+DEFAULT_EWM_SPANS = [10]   # EWMA spans (alpha = 2 / (span + 1))
+GROUP_COL = 'substation_id' # Each substation is its own time series
+
+# NOTE: rows are taken in file order within each stream, which is how the
+# generators write them (timestamp-ascending).
+
+class RollingFeatures:
+    """
+    Rolling telemetry features: per sensor column, the change since the previous
+    reading, the mean/std over the last `w` readings and an EWMA.
+
+    Batch mode (transform) works on whole DataFrames with prefix sums, so every
+    window costs O(1) per row regardless of its length. Online mode
+    (OnlineRollingFeatures.update) keeps the same running sums per stream and
+    updates them in O(1) per reading. Both share one state layout, which is also
+    how transform() continues across chunks, so training and serving see the same
+    feature values (up to float rounding).
+    """
+    def __init__(self, columns=None, windows=None, ewm_spans=None, group_col=GROUP_COL):
+        self.columns = list(columns or DEFAULT_COLUMNS)
+        self.windows = sorted(int(w) for w in (windows or DEFAULT_WINDOWS))
+        self.ewm_spans = [int(s) for s in (ewm_spans or DEFAULT_EWM_SPANS)]
+        self.group_col = group_col
+        if not self.columns or min(self.windows, default=1) < 1 or min(self.ewm_spans, default=1) < 1:
+            raise ValueError("Rolling features need at least one column, and windows/spans >= 1")
+        self.max_window = max(self.windows, default=1)
+        self.alphas = [2.0 / (s + 1) for s in self.ewm_spans]
+
+    @classmethod
+    def from_dict(cls, config):
+        """Accepts True (defaults), a config dict, or an existing RollingFeatures."""
+        if isinstance(config, cls): return config
+        if config is True: return cls()
+        return cls(config.get('columns'), config.get('windows'), config.get('ewm_spans'),
+                   config.get('group_col', GROUP_COL))
+
+    def to_dict(self):
+        return {"columns": self.columns, "windows": self.windows,
+                "ewm_spans": self.ewm_spans, "group_col": self.group_col}
+
+    def feature_names(self):
+        names = []
+        for col in self.columns:
+            names.append(f"{col}_delta")
+            for w in self.windows:
+                names += [f"{col}_mean_{w}", f"{col}_std_{w}"]
+            names += [f"{col}_ewm_{s}" for s in self.ewm_spans]
+        return names
+
+    def input_columns(self, available):
+        """Dataset columns the features are computed from (sensors + the stream key, if present)."""
+        missing = [c for c in self.columns if c not in available]
+        if missing:
+            raise ValueError(f"Dataset is missing columns for rolling features: {missing}")
+        return self.columns + ([self.group_col] if self.group_col in available else [])
+
+    # ---------------------------------------------------------
+    # BATCH
+    # ---------------------------------------------------------
+    def transform(self, df, states=None):
+        """
+        Returns a copy of df with the feature columns appended.
+        Pass the same `states` dict for consecutive chunks of one dataset to carry
+        the windows over chunk boundaries (it is updated in place).
+        """
+        if states is None: states = {}
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        out = np.empty((len(df), len(self.feature_names())), dtype=np.float64)
+
+        if self.group_col in df.columns:
+            groups = df.groupby(self.group_col, sort=False).indices
+        else:
+            groups = {None: np.arange(len(df))}
+
+        for key, idx in groups.items():
+            key = key.item() if hasattr(key, 'item') else key
+            out[idx], states[key] = self._transform_group(values[idx], states.get(key))
+
+        result = df.copy()
+        for i, name in enumerate(self.feature_names()):
+            result[name] = out[:, i].astype(np.float32)
+        return result
+
+    def _transform_group(self, x, state):
+        n, n_cols = x.shape
+        if n == 0: return np.empty((0, len(self.feature_names()))), state
+        if state is None:
+            state = _new_state(self, x[0])
+        K = state["K"]
+
+        # Prefix sums over [carried tail + this chunk], centred on K for precision
+        tail = np.array(state["tail"], dtype=np.float64).reshape(-1, n_cols)
+        full = np.vstack([tail, x]) - K
+        s1 = np.vstack([np.zeros((1, n_cols)), np.cumsum(full, axis=0)])
+        s2 = np.vstack([np.zeros((1, n_cols)), np.cumsum(full * full, axis=0)])
+        pos = np.arange(len(tail), len(full))
+
+        prev = np.vstack([state["prev"][None, :], x[:-1]])
+        per_col = {"delta": x - prev}
+        for w in self.windows:
+            lo = np.maximum(pos - w + 1, 0) # The tail only holds real readings
+            cnt = (pos - lo + 1)[:, None]
+            mean = (s1[pos + 1] - s1[lo]) / cnt
+            var = np.maximum((s2[pos + 1] - s2[lo]) / cnt - mean * mean, 0.0)
+            per_col[f"mean_{w}"] = mean + K
+            per_col[f"std_{w}"] = np.sqrt(var)
+        for s, a in zip(self.ewm_spans, self.alphas):
+            per_col[f"ewm_{s}"] = _ewma(x, a, state["ewm"][s])
+
+        # Carry the state forward (same layout OnlineRollingFeatures uses)
+        state["seen"] += n
+        state["prev"] = x[-1].copy()
+        state["tail"] = deque((row for row in np.vstack([tail, x])[-self.max_window:]), maxlen=self.max_window)
+        for w in self.windows:
+            lo = max(len(full) - w, 0)
+            state["sums"][w] = [s1[-1] - s1[lo], s2[-1] - s2[lo]]
+        for s in self.ewm_spans:
+            state["ewm"][s] = per_col[f"ewm_{s}"][-1].copy()
+
+        return self._stack(per_col), state
+
+    def _stack(self, per_col):
+        """Orders {feature: (n, n_cols)} arrays into feature_names() column order."""
+        parts = []
+        for c in range(len(self.columns)):
+            parts.append(per_col["delta"][:, c])
+            for w in self.windows:
+                parts += [per_col[f"mean_{w}"][:, c], per_col[f"std_{w}"][:, c]]
+            parts += [per_col[f"ewm_{s}"][:, c] for s in self.ewm_spans]
+        return np.column_stack(parts)
+
+class OnlineRollingFeatures:
+    """
+    Per-stream state for live inference. update() is O(1) per reading: each window
+    keeps running sums and drops the reading that falls out of it.
+    """
+    def __init__(self, spec):
+        self.spec = RollingFeatures.from_dict(spec)
+        self.states = {}
+        self._lock = threading.Lock() # Readings of one stream must be applied in order
+
+    def update(self, reading):
+        """Returns a copy of the reading dict with the feature values added."""
+        spec = self.spec
+        key = reading.get(spec.group_col)
+        x = np.array([float(reading[c]) for c in spec.columns], dtype=np.float64)
+
+        with self._lock:
+            state = self.states.get(key)
+            if state is None:
+                state = self.states[key] = _new_state(spec, x)
+            K, tail = state["K"], state["tail"]
+            xc = x - K
+
+            per_col = {"delta": (x - state["prev"])[None, :]}
+            for w in spec.windows:
+                s1, s2 = state["sums"][w]
+                s1, s2 = s1 + xc, s2 + xc * xc
+                count = min(state["seen"], w - 1) + 1
+                if state["seen"] >= w:
+                    old = tail[-w] - K # Leaves the window
+                    s1, s2 = s1 - old, s2 - old * old
+                state["sums"][w] = [s1, s2]
+                mean = s1 / count
+                per_col[f"mean_{w}"] = (mean + K)[None, :]
+                per_col[f"std_{w}"] = np.sqrt(np.maximum(s2 / count - mean * mean, 0.0))[None, :]
+            for s, a in zip(spec.ewm_spans, spec.alphas):
+                state["ewm"][s] = a * x + (1 - a) * state["ewm"][s]
+                per_col[f"ewm_{s}"] = state["ewm"][s][None, :]
+
+            tail.append(x)
+            state["prev"] = x
+            state["seen"] += 1
+
+        row = spec._stack(per_col)[0]
+        out = dict(reading)
+        out.update({name: float(np.float32(v)) for name, v in zip(spec.feature_names(), row)})
+        return out
+
+    def reset(self, key=None):
+        with self._lock:
+            self.states.pop(key, None)
+
+# --- Helpers ---
+def _new_state(spec, first):
+    """State of a stream before its first reading (the first delta is 0, EWMAs start at it)."""
+    first = np.asarray(first, dtype=np.float64)
+    return {
+        "K": first.copy(), # Offset all sums are taken relative to (keeps them small)
+        "seen": 0,
+        "prev": first.copy(),
+        "tail": deque(maxlen=spec.max_window),
+        "sums": {w: [np.zeros_like(first), np.zeros_like(first)] for w in spec.windows},
+        "ewm": {s: first.copy() for s in spec.ewm_spans}
+    }
+
+def _ewma(x, alpha, start):
+    """e[t] = alpha * x[t] + (1 - alpha) * e[t-1], from e[-1] = start, for every column at once."""
+    from scipy.signal import lfilter
+    zi = ((1 - alpha) * start)[None, :]
+    out, _ = lfilter([alpha], [1.0, -(1 - alpha)], x, axis=0, zi=zi)
+    return out
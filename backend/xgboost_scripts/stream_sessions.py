@@ -0,0 +1,171 @@
+import json
+import time
+import uuid
+import queue
+import threading
+from streaming_metrics import MetricsAccumulator
+
+# Configuration
+MAX_PENDING_ROWS = 5000      # Rows scored-or-in-flight that the client hasn't read yet
+SESSION_IDLE_TIMEOUT = 600   # Seconds before an abandoned session is dropped
+HEARTBEAT_SECONDS = 15       # SSE comment sent when there is nothing to report
+SNAPSHOT_ROWS = 1000         # Labelled rows between 'metrics' events
+
+class BackpressureError(Exception):
+    pass
+
+class StreamSession:
+    """
+    One live telemetry stream: the client POSTs readings and reads predictions
+    back from a Server-Sent Events channel.
+
+    Readings are handed to the model's MicroBatcher, so rows from this stream
+    (and from any other stream on the same model) are scored together. A session
+    accepts at most `max_pending` rows that the client has not consumed yet;
+    beyond that push() raises BackpressureError so producers slow down instead of
+    growing server memory.
+
+    Readings pushed with their true labels (e.g. a replayed log) also feed a
+    MetricsAccumulator: its snapshot is sent as a 'metrics' event every
+    SNAPSHOT_ROWS labelled rows and is available from metrics() at any time.
+    """
+    def __init__(self, model_path, submit, max_pending=MAX_PENDING_ROWS, task_type=None):
+        """
+        :param submit: Callable(rows) -> Future of predictions, e.g. MicroBatcher.submit
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.model_path = model_path
+        self.submit = submit
+        self.max_pending = max_pending
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.closed = False
+        self._events = queue.Queue()
+        self._pending = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.features = None # OnlineRollingFeatures, for models trained with rolling features
+        self.rows_scored = 0
+        self.messages_scored = 0
+        self.latency_total_ms = 0.0
+        self.task_type = task_type
+        self.accumulator = None # Created with the first labelled message
+        self._next_snapshot = SNAPSHOT_ROWS
+
+    def push(self, rows, message_id=None, labels=None):
+        """
+        Queues a matrix of readings (plus their true labels, if known).
+        Returns the sequence number of this message.
+        """
+        if labels is not None and len(labels) != len(rows):
+            raise ValueError(f"Got {len(labels)} labels for {len(rows)} readings")
+        received = time.perf_counter()
+        with self._lock:
+            if self.closed:
+                raise BackpressureError("Session is closed")
+            if self._pending + len(rows) > self.max_pending:
+                raise BackpressureError(f"Too many unread predictions ({self._pending} pending)")
+            self._pending += len(rows)
+            self._seq += 1
+            seq = self._seq
+            self.last_seen = time.time()
+
+        try:
+            future = self.submit(rows)
+        except Exception:
+            with self._lock:
+                self._pending -= len(rows)
+            raise
+        future.add_done_callback(lambda f: self._on_scored(f, seq, message_id, len(rows), received, labels))
+        return seq
+
+    def _on_scored(self, future, seq, message_id, n_rows, received, labels=None):
+        latency_ms = round((time.perf_counter() - received) * 1000, 3)
+        event = {"seq": seq, "id": message_id, "latency_ms": latency_ms}
+        if future.exception() is not None:
+            event["error"] = str(future.exception())
+        else:
+            event["predictions"] = future.result().tolist()
+            snapshot = None
+            with self._lock:
+                self.rows_scored += n_rows
+                self.messages_scored += 1
+                self.latency_total_ms += latency_ms
+                if labels is not None:
+                    if self.accumulator is None:
+                        self.accumulator = MetricsAccumulator(self.task_type)
+                    self.accumulator.update(labels, future.result())
+                    if self.accumulator.rows >= self._next_snapshot:
+                        self._next_snapshot = self.accumulator.rows + SNAPSHOT_ROWS
+                        snapshot = self.accumulator.snapshot()
+        self._events.put((n_rows, "prediction", event))
+        if snapshot is not None:
+            self._events.put((0, "metrics", snapshot))
+
+    def events(self):
+        """Generator of SSE-formatted messages; runs until the session is closed."""
+        while not self.closed:
+            try:
+                n_rows, name, event = self._events.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                self.last_seen = time.time() # A connected reader keeps the session alive
+                yield ": keep-alive\n\n"
+                continue
+            with self._lock:
+                self._pending -= n_rows
+                self.last_seen = time.time()
+            yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+    def close(self):
+        self.closed = True
+
+    def metrics(self):
+        """Snapshot of the running metrics over all labelled rows (None before the first one)."""
+        with self._lock:
+            return self.accumulator.snapshot() if self.accumulator else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "model_path": self.model_path,
+                "pending_rows": self._pending,
+                "messages": self._seq,
+                "rows_scored": self.rows_scored,
+                "avg_latency_ms": round(self.latency_total_ms / self.messages_scored, 3) if self.messages_scored else None,
+                "labelled_rows": self.accumulator.rows if self.accumulator else 0,
+                "closed": self.closed
+            }
+
+class SessionManager:
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, model_path, submit, task_type=None):
+        session = StreamSession(model_path, submit, task_type=task_type)
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session: session.close()
+        return session is not None
+
+    def list(self):
+        with self._lock:
+            return [s.stats() for s in self._sessions.values()]
+
+    def _expire(self):
+        now = time.time()
+        for sid in [sid for sid, s in self._sessions.items() if now - s.last_seen > self.idle_timeout]:
+            self._sessions.pop(sid).close()
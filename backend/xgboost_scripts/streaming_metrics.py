@@ -0,0 +1,157 @@
+import numpy as np
+
+# Configuration
+WINDOW_ROWS = 1000   # Rows behind the sliding-window accuracy / miss rate
+NEGATIVE_CLASS = 0   # Label of normal traffic: every other class counts as an attack
+
+class MetricsAccumulator:
+    """
+    Evaluation metrics updated one batch of (labels, predictions) at a time, so
+    chunked evaluations and live/replay streams never hold all predictions.
+
+    Classification keeps a confusion matrix (per-class precision / recall / F1
+    are derived from it on demand) and regression keeps running error sums.
+    Both also keep the last `window` rows in a ring buffer, which gives the
+    sliding-window accuracy and miss rate (share of actual attacks predicted as
+    normal traffic), or RMSE for regression.
+
+    An update costs O(batch) and never revisits earlier rows; a snapshot costs
+    O(classes^2 + window), independent of how many rows were seen. Labels may
+    appear at any point: the confusion matrix grows when a new class shows up.
+    """
+    def __init__(self, task_type, window=WINDOW_ROWS, negative_class=NEGATIVE_CLASS):
+        self.task_type = task_type
+        self.window = window
+        self.negative_class = negative_class
+        self.rows = 0
+        self.labels = np.empty(0, dtype=np.int64)
+        self.matrix = np.zeros((0, 0), dtype=np.int64) # [actual, predicted]
+        self.sq_error = 0.0
+        self.abs_error = 0.0
+        # Classification: (correct, missed attack, actual attack) per row; regression: squared error
+        self._ring = np.zeros((1 if self.regression else 3, window))
+        self._ring_sums = np.zeros(len(self._ring))
+        self._ring_pos = 0
+        self._ring_rows = 0
+
+    @property
+    def regression(self):
+        return self.task_type == 'regression'
+
+    # ---------------------------------------------------------
+    # UPDATE
+    # ---------------------------------------------------------
+    def update(self, y_true, y_pred):
+        """Adds one batch of labels and predictions (array-likes of the same length)."""
+        y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"Got {len(y_true)} labels for {len(y_pred)} predictions")
+        if len(y_true) == 0: return
+        self.rows += len(y_true)
+
+        if self.regression:
+            error = y_pred.astype(float) - y_true.astype(float)
+            self.sq_error += float(np.dot(error, error))
+            self.abs_error += float(np.abs(error).sum())
+            self._push((error ** 2,))
+            return
+
+        y_true, y_pred = y_true.astype(np.int64), y_pred.astype(np.int64)
+        self._add_labels(np.union1d(y_true, y_pred))
+        k = len(self.labels)
+        cells = np.searchsorted(self.labels, y_true) * k + np.searchsorted(self.labels, y_pred)
+        self.matrix += np.bincount(cells, minlength=k * k).reshape(k, k)
+
+        attack = y_true != self.negative_class
+        self._push((y_true == y_pred, attack & (y_pred == self.negative_class), attack))
+
+    def _add_labels(self, seen):
+        new = np.setdiff1d(seen, self.labels)
+        if not len(new): return
+        labels = np.union1d(self.labels, new)
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        old = np.searchsorted(labels, self.labels)
+        matrix[np.ix_(old, old)] = self.matrix
+        self.labels, self.matrix = labels, matrix
+
+    def _push(self, columns):
+        # Only the last `window` rows of a batch can still be inside the window
+        values = np.vstack(columns).astype(float)[:, -self.window:]
+        idx = (self._ring_pos + np.arange(values.shape[1])) % self.window
+        self._ring_sums += values.sum(axis=1) - self._ring[:, idx].sum(axis=1)
+        self._ring[:, idx] = values
+        self._ring_pos = (self._ring_pos + values.shape[1]) % self.window
+        self._ring_rows = min(self._ring_rows + values.shape[1], self.window)
+
+    # ---------------------------------------------------------
+    # READ
+    # ---------------------------------------------------------
+    def snapshot(self):
+        """The current metrics as a JSON-able dict."""
+        n = self._ring_rows
+        if self.regression:
+            return {
+                "task_type": self.task_type,
+                "rows": self.rows,
+                "rmse": float(np.sqrt(self.sq_error / self.rows)) if self.rows else None,
+                "mae": self.abs_error / self.rows if self.rows else None,
+                "window": {"rows": n, "rmse": float(np.sqrt(self._ring_sums[0] / n)) if n else None}
+            }
+
+        correct, missed, attacks = self._ring_sums
+        return {
+            "task_type": self.task_type,
+            "rows": self.rows,
+            "accuracy": float(np.trace(self.matrix) / self.rows) if self.rows else None,
+            **self._attack_counts(),
+            "confusion_matrix": {"labels": self.labels.tolist(), "matrix": self.matrix.tolist()},
+            "per_class": self.per_class(),
+            "window": {
+                "rows": n,
+                "accuracy": float(correct / n) if n else None,
+                "miss_rate": float(missed / attacks) if attacks else None
+            }
+        }
+
+    def _attack_counts(self):
+        safe_row = safe_col = correct_safe = 0
+        if self.negative_class in self.labels:
+            i = int(np.searchsorted(self.labels, self.negative_class))
+            safe_row, safe_col, correct_safe = int(self.matrix[i].sum()), int(self.matrix[:, i].sum()), int(self.matrix[i, i])
+        actual_attacks, missed = self.rows - safe_row, safe_col - correct_safe
+        return {
+            "predicted_attacks": self.rows - safe_col,
+            "predicted_safe": safe_col,
+            "actual_attacks": actual_attacks,
+            "missed_attacks": missed,
+            "miss_rate": missed / actual_attacks if actual_attacks else None
+        }
+
+    def per_class(self):
+        """Precision, recall, F1 and support per label (from the confusion matrix)."""
+        tp = np.diag(self.matrix).astype(float)
+        predicted, support = self.matrix.sum(axis=0), self.matrix.sum(axis=1)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        total = precision + recall
+        f1 = np.divide(2 * precision * recall, total, out=np.zeros_like(tp), where=total > 0)
+        return [
+            {"label": int(label), "precision": float(p), "recall": float(r), "f1": float(f), "support": int(s)}
+            for label, p, r, f, s in zip(self.labels, precision, recall, f1, support)
+        ]
+
+    def report_lines(self):
+        """The headline metrics and per-class table for evaluation_report.txt."""
+        s = self.snapshot()
+        if self.regression:
+            return [f"RMSE: {s['rmse']:.4f}", f"MAE: {s['mae']:.4f}"]
+
+        lines = [f"Accuracy: {s['accuracy']:.4f}", "", "Classification Report:",
+                 f"{'label':>10}{'precision':>11}{'recall':>10}{'f1-score':>10}{'support':>10}"]
+        for c in s["per_class"]:
+            lines.append(f"{c['label']:>10}{c['precision']:>11.2f}{c['recall']:>10.2f}{c['f1']:>10.2f}{c['support']:>10}")
+        macro = {k: np.mean([c[k] for c in s["per_class"]]) for k in ("precision", "recall", "f1")}
+        lines.append(f"{'macro avg':>10}{macro['precision']:>11.2f}{macro['recall']:>10.2f}{macro['f1']:>10.2f}{self.rows:>10}")
+        if s["miss_rate"] is not None:
+            lines.append(f"\nMissed attacks: {s['missed_attacks']} of {s['actual_attacks']} ({s['miss_rate']:.2%})")
+        return lines
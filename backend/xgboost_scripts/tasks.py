@@ -0,0 +1,118 @@
+import os
+from XGridBoost import XGridBoost
+from generate_logs import generate_multiclass_data, generate_scenario_data
+from job_queue import report_progress
+
+# Job targets for the JobQueue (see job_queue.py). They run in freshly spawned worker
+# processes, which import this module (app.py hands it to them as their __main__), so
+# they live here rather than in app.py: importing this module must not start the web
+# server's threads, caches or Flask app.
+
+DATASETS_DIR = "datasets"
+
+# ---------------------------------------------------------
+# HELPER: Background Training Job
+# ---------------------------------------------------------
+def run_training_task(filename, label_col, model_type, task_type, params, streaming=False, chunksize=100_000,
+                      search=None, cv=None, rolling_features=None, base_model=None, nthread=None,
+                      external_memory=False):
+    """
+    Runs the EasyModel training inside a job-queue worker process.
+    With streaming=True the CSV is read in chunks (out-of-core, XGBoost only), and
+    with external_memory=True as well the quantized pages are cached on disk.
+    With a `search` config, runs a hyperparameter search instead of a single fit.
+    With a `cv` config, cross-validates before the standard holdout fit.
+    With `rolling_features`, the model also sees rolling-window stats of the readings.
+    With a `base_model` path, training continues from that saved model (warm start).
+    Errors are re-raised so the job is reported as 'failed'.
+    """
+    try:
+        print(f"--- Background Task Started: {model_type} on {filename} ---")
+        
+        # 1. Initialize the library with the user's choices
+        bot = XGridBoost(model_type=model_type, task_type=task_type, nthread=nthread, features=rolling_features)
+        bot.progress = report_progress # Per-round metrics show up as 'progress' events
+        if base_model:
+            # Adopts the base model's type, task and rolling features (before the data is loaded)
+            bot.load_base_model(base_model)
+        
+        # 2. Construct full path
+        filepath = os.path.join(DATASETS_DIR, filename)
+
+        if streaming:
+            run_folder = bot.train_streaming(filepath, label_col, params=params, chunksize=chunksize,
+                                             external_memory=external_memory)
+            print(f"--- Background Task Complete: Results in /latest ---")
+            return {"run_folder": run_folder, "timings": bot.timings}
+
+        # 3. Load Data
+        # We wrap this in try/except to catch CSV errors early
+        try:
+            X, y = bot.load_data(filepath, label_col)
+        except Exception as e:
+            print(f"Data Load Error: {e}")
+            raise
+
+        # 4. Train
+        # The library handles the logic for different model types internally
+        if search:
+            run_folder = bot.search(
+                X, y, search.get('space', {}),
+                strategy=search.get('strategy', 'random'),
+                n_trials=int(search.get('n_trials', 20)),
+                min_budget=search.get('min_budget'),
+                max_budget=search.get('max_budget'),
+                halving_factor=int(search.get('halving_factor', 3))
+            )
+        elif cv:
+            run_folder = bot.cross_validate(
+                X, y, params=params,
+                n_splits=int(cv.get('n_splits', 5)),
+                strategy=cv.get('strategy', 'stratified')
+            )
+        else:
+            run_folder = bot.train(X, y, params=params)
+        
+        print(f"--- Background Task Complete: Results in /latest ---")
+        return {"run_folder": run_folder, "timings": bot.timings}
+        
+    except Exception as e:
+        print(f"CRITICAL WORKER ERROR: {e}")
+        raise
+
+def run_generation_task(mode='samples', nthread=None, **options):
+    """Runs the log generator ('samples' or 'scenario') inside a job-queue worker process."""
+    # Without an explicit n_jobs, use the threads the queue granted this job
+    if not options.get('n_jobs'):
+        options['n_jobs'] = nthread or 1
+    if mode == 'scenario':
+        return generate_scenario_data(**options)
+    return generate_multiclass_data(**options)
+
+# ---------------------------------------------------------
+# BACKGROUND WORKER: Test
+# ---------------------------------------------------------
+def run_testing_task(model_path, dataset_file, label_col, chunksize=None, nthread=None):
+    try:
+        # We don't need model_type here, the load_model method detects it
+        bot = XGridBoost(nthread=nthread) 
+        bot.progress = report_progress # Chunked tests send running metric snapshots as 'progress' events
+        data_path = os.path.join(DATASETS_DIR, dataset_file)
+        test_dir = bot.evaluate_saved_model(model_path, data_path, label_col, chunksize=chunksize)
+        return {"test_folder": test_dir, "timings": bot.timings}
+    except Exception as e:
+        print(f"TESTING ERROR: {e}")
+        raise
+
+# ---------------------------------------------------------
+# BACKGROUND WORKER: Batch Evaluation
+# ---------------------------------------------------------
+def run_evaluation_task(model_paths, dataset_file, label_col, nthread=None):
+    try:
+        bot = XGridBoost(nthread=nthread)
+        data_path = os.path.join(DATASETS_DIR, dataset_file)
+        eval_dir = bot.evaluate_models(model_paths, data_path, label_col)
+        return {"eval_folder": eval_dir, "eval_id": os.path.basename(eval_dir)[len("eval_"):], "timings": bot.timings}
+    except Exception as e:
+        print(f"EVALUATION ERROR: {e}")
+        raise
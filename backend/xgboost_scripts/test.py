@@ -18,8 +18,7 @@ try:
     # This automatically detects you have 3 classes and sets the params
     grid_model.train(X, y)
 
-    # 5. Save the trained model
-    grid_model.save("grid_security_model")
+    # 5. The trained model is saved by train() (see test_results/latest.json)
     
     # 6. Test on a fake manual entry (simulating a DoS attack)
     # Voltage drop (100), High Current (45), High Temp (80) -> Should be Class 2
@@ -0,0 +1,12 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other by name (as app.py does), so put their folder on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    """XGridBoost creates test_results/ in the working directory: keep it out of the checkout."""
+    monkeypatch.chdir(tmp_path)
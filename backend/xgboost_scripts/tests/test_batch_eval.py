@@ -0,0 +1,26 @@
+import numpy as np
+import xgboost as xgb
+
+from batch_eval import run_batch, UNKNOWN_TASK
+from XGridBoost import infer_task_type
+
+def _booster(objective, X, y):
+    return xgb.train({"objective": objective, "max_depth": 2}, xgb.DMatrix(X, label=y), num_boost_round=3)
+
+def test_models_of_an_unknown_task_are_ranked_with_the_rest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3)).astype(np.float32)
+    y = rng.integers(0, 2, size=100).astype(np.float32)
+    columns = [f"f{i}" for i in range(X.shape[1])]
+
+    tasks = []
+    for name, objective in [("binary", "binary:logistic"), ("poisson", "count:poisson")]:
+        model = _booster(objective, X, y)
+        tasks.append((name, (model, 'xgboost', infer_task_type(model, 'xgboost')), 0.0, X, y, columns))
+    assert tasks[1][1][2] is None # count:poisson maps to no known task
+
+    board = run_batch(tasks, total_threads=1, n_jobs=1)
+    by_path = {r["model_path"]: r for r in board}
+    assert by_path["binary"]["task_type"] == "classification"
+    assert by_path["poisson"]["task_type"] == UNKNOWN_TASK
+    assert all(r["status"] == "ok" and r["rank"] == 1 for r in board)
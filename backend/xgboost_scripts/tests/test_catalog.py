@@ -0,0 +1,30 @@
+import os
+
+from catalog import RunCatalog
+
+def _catalog_with_models(tmp_path, n=3):
+    catalog = RunCatalog(str(tmp_path / "test_results"))
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"model_{i}.json"
+        path.write_text("{}")
+        catalog.record_run(f"r{i}", str(tmp_path), "xgboost", "classification", created_at=f"2026-01-0{i + 1}")
+        catalog.record_model(f"r{i}", str(path))
+        paths.append(str(path))
+    return catalog, paths
+
+def test_query_flags_missing_models_without_deleting_them(tmp_path):
+    catalog, paths = _catalog_with_models(tmp_path)
+    os.remove(paths[1])
+
+    runs, _ = catalog.query()
+    assert {r["run_id"]: r["missing"] for r in runs} == {"r0": False, "r1": True, "r2": False}
+    assert catalog.count() == 3
+
+def test_prune_missing_removes_only_runs_without_a_model_file(tmp_path):
+    catalog, paths = _catalog_with_models(tmp_path)
+    os.remove(paths[1])
+
+    assert [r["run_id"] for r in catalog.prune_missing()] == ["r1"]
+    runs, _ = catalog.query()
+    assert sorted(r["run_id"] for r in runs) == ["r0", "r2"]
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from XGridBoost import XGridBoost
+
+def _unused_last_feature(n_rows=400, seed=0):
+    """Readings where the label only depends on the first column; the last one is constant."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "voltage": rng.normal(120, 5, n_rows),
+        "current": rng.normal(15, 2, n_rows),
+        "constant": np.zeros(n_rows)
+    }).astype(np.float32)
+    y = (X["voltage"] > 120).astype(np.int64)
+    return X, y
+
+@pytest.mark.parametrize("model_type", ["xgboost", "random_forest"])
+def test_compile_keeps_width_of_never_split_trailing_feature(model_type):
+    X, y = _unused_last_feature()
+    bot = XGridBoost(model_type=model_type, task_type="classification")
+    if model_type == "xgboost":
+        bot.fit(X, y, X, y, {"num_boost_round": 5, "max_depth": 2})
+    else:
+        bot.fit(X, y, params={"n_estimators": 5, "max_depth": 2})
+
+    report = bot.compile(verify=True)
+
+    assert bot.compiled.n_features == X.shape[1]
+    assert int(bot.compiled.feature.max()) < X.shape[1] - 1 # The last column is never split on
+    assert report["ok"]
+    np.testing.assert_array_equal(bot.predict_rows(X.to_numpy()[:10]), np.asarray(bot.predict(X[:10])))
@@ -0,0 +1,28 @@
+import numpy as np
+
+from cross_validation import run_cv
+from param_search import fit_and_score
+
+EARLY_STOPPING_ROUNDS = 10 # As passed to xgb.train in XGridBoost._boost
+
+def _noisy_regression(n_rows=300, seed=0):
+    """Mostly noise, so deep trees with a large step overfit after a few rounds."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=3.0, size=n_rows)).astype(np.float32)
+    return X, y
+
+OVERFIT = {"num_boost_round": 200, "max_depth": 8, "eta": 1.0}
+
+def test_best_iteration_is_the_early_stopping_pick():
+    X, y = _noisy_regression()
+    _, _, curve, best = fit_and_score('xgboost', 'regression', OVERFIT, X[:200], y[:200], X[200:], y[200:], 1)
+    assert len(curve) < OVERFIT["num_boost_round"] # Early stopping kicked in
+    assert best == int(np.argmin(curve))
+    assert len(curve) == best + 1 + EARLY_STOPPING_ROUNDS
+
+def test_cv_folds_report_best_iteration_not_rounds_trained():
+    X, y = _noisy_regression()
+    cv = run_cv('xgboost', 'regression', OVERFIT, X, y, n_splits=3, strategy='kfold', total_threads=1, n_jobs=1)
+    for fold in cv["folds"]:
+        assert fold["rounds_trained"] == fold["best_iteration"] + 1 + EARLY_STOPPING_ROUNDS
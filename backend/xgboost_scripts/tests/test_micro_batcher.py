@@ -0,0 +1,45 @@
+import queue
+import threading
+import numpy as np
+import pytest
+
+import micro_batcher
+from micro_batcher import MicroBatcher, BatcherClosedError
+
+def _sum_rows(X):
+    if (X < 0).any(): raise ValueError("negative reading")
+    return X.sum(axis=1)
+
+def test_bad_request_only_fails_its_own_future():
+    batcher = MicroBatcher(_sum_rows, max_latency_ms=50, n_features=3)
+    with pytest.raises(ValueError):
+        batcher.submit(np.zeros((2, 4)))
+    good, bad, other = batcher.submit(np.ones((2, 3))), batcher.submit(-np.ones((1, 3))), batcher.submit(np.ones((1, 3)))
+    np.testing.assert_array_equal(good.result(timeout=5), [3, 3])
+    np.testing.assert_array_equal(other.result(timeout=5), [3])
+    assert isinstance(bad.exception(timeout=5), ValueError)
+    batcher.close()
+
+def test_close_during_submit_still_scores_the_request(monkeypatch):
+    entered = threading.Event()
+    class SlowPutQueue(queue.Queue):
+        def put(self, item, *args, **kwargs):
+            if item is not None: # Hold a request between submit's closed check and the put
+                entered.set()
+                threading.Event().wait(0.2)
+            super().put(item, *args, **kwargs)
+    monkeypatch.setattr(micro_batcher.queue, "Queue", SlowPutQueue)
+
+    batcher = MicroBatcher(_sum_rows, max_latency_ms=1, n_features=3)
+    futures = []
+    submitter = threading.Thread(target=lambda: futures.append(batcher.submit(np.ones((1, 3)))))
+    submitter.start()
+    entered.wait(timeout=5)
+    batcher.close()
+    submitter.join(timeout=5)
+
+    np.testing.assert_array_equal(futures[0].result(timeout=5), [3])
+    batcher._worker.join(timeout=5)
+    assert not batcher._worker.is_alive()
+    with pytest.raises(BatcherClosedError):
+        batcher.submit(np.ones((1, 3)))